@@ -1,35 +1,159 @@
 from flask import Flask, render_template, request, jsonify
+from flask.json.provider import DefaultJSONProvider
 import os
-from parser import parse_product_data
-from search import search_slang, get_search_suggestions
-from filters import filter_biryani_spots, get_unique_areas, get_unique_vibes, get_filter_stats
+import math
+import time
+import atexit
+import argparse
+import threading
+from concurrent.futures import CancelledError
+from dataset import DataStore
+from parser import DEDUPE_KEYS
+from records import Record
+from sqlite_backend import SQLiteBackend
+from search import get_search_suggestions, fold, DEFAULT_SUGGESTION_DISTANCE
+from cache import ResultCache, SingleFlight
+from querylog import QueryLog, top_queries, warm_up
+from batch import SearchPool
+from autocomplete import MAX_COMPLETIONS
+from filters import filter_biryani_spots, SpotQuery
 from time_converter import convert_time_format, get_current_time_context, format_time_display
 
+class RecordJSONProvider(DefaultJSONProvider):
+    """JSON provider that converts compact records to dicts only when serializing"""
+    
+    @staticmethod
+    def default(o):
+        if isinstance(o, Record):
+            return o.to_dict()
+        return DefaultJSONProvider.default(o)
+
 app = Flask(__name__)
+app.json = RecordJSONProvider(app)
+
+def parse_search_weights(value):
+    """Parse a 'field=weight,...' list such as 'term=1.0,usage=0.8'"""
+    if not value:
+        return None
+    pairs = (item.split('=', 1) for item in value.split(',') if '=' in item)
+    return {field.strip(): float(weight) for field, weight in pairs}
+
+def parse_dedupe_keys(value):
+    """Parse a 'section=field,...' list such as 'slang_data=term,biryani_data=name'"""
+    if value is None:
+        return DEDUPE_KEYS
+    pairs = (item.split('=', 1) for item in value.split(',') if '=' in item)
+    return {section.strip(): field.strip() for section, field in pairs}
+
+# Data source and hot reload configuration; PRODUCT_DATA_FILE may be a file,
+# a directory of *.md shards or a glob
+DATA_FILE = os.environ.get('PRODUCT_DATA_FILE', 'product.md')
+RELOAD_INTERVAL = float(os.environ.get('PRODUCT_RELOAD_INTERVAL', '2'))
+PARSE_WORKERS = int(os.environ.get('PRODUCT_PARSE_WORKERS', '0')) or None
+DEDUPE_BY = parse_dedupe_keys(os.environ.get('PRODUCT_DEDUPE_KEYS'))
+# 'eager' parses every section at startup; 'lazy' parses each section on first use
+LOADING = os.environ.get('PRODUCT_LOADING', 'eager')
+# Query backend: 'memory' scans the parsed lists, 'sqlite' queries an indexed database
+BACKEND = os.environ.get('PRODUCT_BACKEND', 'memory')
+DB_FILE = os.environ.get('PRODUCT_DB_FILE', 'product.sqlite')
+DB_POOL_SIZE = int(os.environ.get('PRODUCT_DB_POOL_SIZE', '4'))
+# Per-field multipliers for slang search scores, e.g. 'term=1.0,usage=0.8'
+SEARCH_WEIGHTS = parse_search_weights(os.environ.get('SEARCH_WEIGHTS'))
+# Batch slang search: worker processes holding the prepared corpus, batch size cap
+# and default overall deadline
+SEARCH_WORKERS = int(os.environ.get('SEARCH_BATCH_WORKERS', '4'))
+MAX_BATCH_QUERIES = int(os.environ.get('SEARCH_BATCH_MAX_QUERIES', '200'))
+BATCH_DEADLINE_MS = float(os.environ.get('SEARCH_BATCH_DEADLINE_MS', '2000'))
+# Slang search result cache: memory budget in bytes (0 disables) and time to live in seconds
+CACHE_BYTES = int(os.environ.get('SEARCH_CACHE_BYTES', str(16 * 1024 * 1024)))
+CACHE_TTL = float(os.environ.get('SEARCH_CACHE_TTL', '300'))
+# Opt-in query log of slang searches and biryani filters (JSON lines), the fraction
+# of queries logged, the size at which it is rotated, and how many of the most
+# frequent logged queries to replay at startup
+QUERY_LOG_FILE = os.environ.get('QUERY_LOG_FILE', '')
+QUERY_LOG_SAMPLE = float(os.environ.get('QUERY_LOG_SAMPLE', '1.0'))
+QUERY_LOG_MAX_BYTES = int(os.environ.get('QUERY_LOG_MAX_BYTES', str(8 * 1024 * 1024)))
+WARMUP_QUERIES = int(os.environ.get('WARMUP_QUERIES', '100'))
+# Default minimum score per slang search mode; vector similarities run lower than fuzzy scores
+DEFAULT_THRESHOLDS = {'fuzzy': 60, 'vector': 10}
 
-# Global data storage
-slang_data = []
-biryani_data = []
-time_data = []
+# Global data storage; each request reads one immutable DataVersion from here
+data_store = DataStore(DATA_FILE, max_workers=PARSE_WORKERS, dedupe_keys=DEDUPE_BY,
+                       lazy=LOADING == 'lazy')
+sqlite_backend = SQLiteBackend(DB_FILE, pool_size=DB_POOL_SIZE) if BACKEND == 'sqlite' else None
+if sqlite_backend:
+    # Compile each version on the loading thread, before requests can use it
+    data_store.add_publish_hook(sqlite_backend.sync)
+result_cache = ResultCache(max_bytes=CACHE_BYTES, ttl=CACHE_TTL)
+# Identical searches already running are shared rather than repeated
+search_flights = SingleFlight()
+query_log = (QueryLog(QUERY_LOG_FILE, sample_rate=QUERY_LOG_SAMPLE, max_bytes=QUERY_LOG_MAX_BYTES)
+             if QUERY_LOG_FILE else None)
+if query_log:
+    atexit.register(query_log.close)
+# Set once startup warm-up has finished and the worker can take traffic
+ready = threading.Event()
+search_pool = SearchPool(workers=SEARCH_WORKERS)
+atexit.register(search_pool.close)
+# Once batches have started the workers, each new version gets its own before it is served
+data_store.add_publish_hook(search_pool.replace)
 
 def load_data():
-    """Load data from product.md on startup"""
-    global slang_data, biryani_data, time_data
-    
+    """Load data from product.md on startup and watch it for changes"""
     try:
-        data = parse_product_data()
-        slang_data = data['slang_data']
-        biryani_data = data['biryani_data']
-        time_data = data['time_data']
+        data = data_store.load()
         
-        print(f"✅ Data loaded successfully:")
-        print(f"   - {len(slang_data)} slang terms")
-        print(f"   - {len(biryani_data)} biryani spots")
-        print(f"   - {len(time_data)} time mappings")
+        if data_store.lazy:
+            print(f"✅ Data scanned successfully (version {data.version}); sections load on first use")
+        else:
+            print(f"✅ Data loaded successfully (version {data.version}):")
+            print(f"   - {len(data.slang_data)} slang terms")
+            print(f"   - {len(data.biryani_data)} biryani spots")
+            print(f"   - {len(data.time_data)} time mappings")
         
+        if sqlite_backend:
+            print(f"   - serving queries from {sqlite_backend.db_path}")
+    
     except Exception as e:
         print(f"❌ Error loading data: {str(e)}")
         # Continue with empty data
+    
+    start_warm_up(data_store.current)
+    
+    if RELOAD_INTERVAL > 0:
+        data_store.start_watching(RELOAD_INTERVAL)
+
+def replay_query(data, endpoint, params):
+    """Run one logged query against a data version, filling the result cache"""
+    if endpoint == 'slang':
+        search_slang_query(data, params.get('q', ''), threshold=params.get('threshold', 60),
+                           limit=params.get('limit', 10), exact=params.get('exact', False),
+                           max_distance=params.get('max_distance', DEFAULT_SUGGESTION_DISTANCE),
+                           mode=params.get('mode', 'fuzzy'))
+    elif endpoint == 'biryani':
+        filter_biryani_query(data, SpotQuery(params.get('area'), params.get('vibe'),
+                                             params.get('exclude_area'), params.get('exclude_vibe'),
+                                             params.get('min_rating'), params.get('max_rating'),
+                                             params.get('q')))
+    else:
+        raise ValueError(f"Unknown endpoint '{endpoint}'")
+
+def start_warm_up(data):
+    """Replay the most frequent logged queries in the background, then report ready"""
+    if not (QUERY_LOG_FILE and WARMUP_QUERIES > 0 and
+            (os.path.exists(QUERY_LOG_FILE) or os.path.exists(QUERY_LOG_FILE + '.1'))):
+        ready.set()
+        return
+    
+    def run():
+        try:
+            warm_up(top_queries(QUERY_LOG_FILE, WARMUP_QUERIES, max_bytes=QUERY_LOG_MAX_BYTES),
+                    lambda endpoint, params: replay_query(data, endpoint, params))
+        finally:
+            ready.set()
+    
+    ready.clear()
+    threading.Thread(target=run, name='cache-warm-up', daemon=True).start()
 
 @app.route('/')
 def home():
@@ -51,47 +175,261 @@ def time_converter():
     """Time converter page"""
     return render_template('time.html')
 
+def cached_search(data, key, compute):
+    """
+    Return a cached result, or compute it once however many requests want it at the same time.
+    
+    Args:
+        data (DataVersion): Data version the request is using
+        key (tuple): Normalized query parameters
+        compute (callable): Produces the result on a cache miss
+    
+    Returns:
+        tuple: (result, 'cached', 'coalesced' or None for a fresh computation)
+    """
+    value = result_cache.get(data.version, key)
+    if value is not None:
+        return value, 'cached'
+    
+    def compute_and_cache():
+        result = compute()
+        result_cache.put(data.version, key, result)
+        return result
+    
+    value, shared = search_flights.do((data.version, *key), compute_and_cache)
+    return value, 'coalesced' if shared else None
+
+def search_slang_query(data, query, threshold=60, limit=10, exact=False,
+                       max_distance=DEFAULT_SUGGESTION_DISTANCE, mode='fuzzy'):
+    """Run one slang search against a data version and build its response fields"""
+    def search():
+        stats = {}
+        if mode == 'vector':
+            # Cosine similarity of character n-gram vectors, for phrase-like queries
+            results = data.index('slang_vectors').search(query, threshold=threshold, limit=limit)
+        elif sqlite_backend:
+            results = sqlite_backend.search_slang(data, query, threshold=threshold, limit=limit,
+                                                  weights=SEARCH_WEIGHTS, stats=stats)
+        else:
+            results = data.index('slang_corpus').search(query, threshold=threshold, limit=limit,
+                                                        weights=SEARCH_WEIGHTS, exact=exact, stats=stats)
+        return results, stats.get('pruned', 0), stats.get('fast_path', False)
+    
+    found, source = cached_search(data, search_cache_key(query, threshold, limit, exact, mode), search)
+    return slang_response(data, query, found, source, max_distance=max_distance)
+
+def search_cache_key(query, threshold, limit, exact=False, mode='fuzzy'):
+    """Result cache key of a slang search"""
+    # Searches only see the folded query, so spelling variants share cached results
+    return ('search', mode, fold(query), threshold, limit, exact)
+
+def slang_response(data, query, found, source, max_distance=DEFAULT_SUGGESTION_DISTANCE):
+    """
+    Build the response fields of one slang search.
+    
+    Args:
+        data (DataVersion): Data version that was searched
+        query (str): Search query
+        found (tuple): (results, pruned, fast_path) of the search
+        source (str): 'cached', 'coalesced' or None for a fresh search
+        max_distance (int): Edit distance for suggestions when nothing matched
+    
+    Returns:
+        dict: results, suggestions, total, pruned, fast_path, cached and coalesced
+    """
+    results, pruned, fast_path = found
+    
+    # If no results and query is not empty, provide suggestions
+    suggestions = []
+    if not results and query:
+        suggestions, _ = cached_search(
+            data, ('suggestions', fold(query), max_distance),
+            lambda: get_search_suggestions(query, data.slang_data, tree=data.index('slang_terms'),
+                                           max_distance=max_distance))
+    
+    return {
+        'results': results,
+        'suggestions': suggestions,
+        'total': len(results),
+        'pruned': pruned,
+        'fast_path': fast_path,
+        'cached': source == 'cached',
+        'coalesced': source == 'coalesced'
+    }
+
 @app.route('/api/search/slang')
 def api_search_slang():
     """API endpoint for slang search"""
     query = request.args.get('q', '').strip()
-    threshold = int(request.args.get('threshold', 60))
+    mode = request.args.get('mode', 'fuzzy').lower()
+    
+    if mode not in DEFAULT_THRESHOLDS:
+        return jsonify({
+            'success': False,
+            'error': 'Invalid mode. Use "fuzzy" or "vector"',
+            'mode': mode,
+            'query': query,
+            'results': [],
+            'total': 0
+        }), 400
+    
+    threshold = int(request.args.get('threshold', DEFAULT_THRESHOLDS[mode]))
     limit = int(request.args.get('limit', 10))
+    exact = request.args.get('exact', '').lower() in ('1', 'true', 'yes')
+    max_distance = int(request.args.get('max_distance', DEFAULT_SUGGESTION_DISTANCE))
+    data = data_store.current
+    
+    if query_log:
+        query_log.record('slang', {'q': query, 'threshold': threshold, 'limit': limit, 'exact': exact,
+                                   'max_distance': max_distance, 'mode': mode})
     
     try:
-        results = search_slang(query, slang_data, threshold=threshold, limit=limit)
-        
-        # If no results and query is not empty, provide suggestions
-        suggestions = []
-        if not results and query:
-            suggestions = get_search_suggestions(query, slang_data)
-        
         return jsonify({
             'success': True,
             'query': query,
-            'results': results,
-            'suggestions': suggestions,
-            'total': len(results)
+            'mode': mode,
+            **search_slang_query(data, query, threshold=threshold, limit=limit, exact=exact,
+                                 max_distance=max_distance, mode=mode)
         })
-        
+    
     except Exception as e:
         return jsonify({
             'success': False,
             'error': str(e),
             'query': query,
+            'mode': mode,
             'results': [],
             'suggestions': [],
+            'total': 0,
+            'pruned': 0,
+            'fast_path': False,
+            'cached': False,
+            'coalesced': False
+        }), 500
+
+@app.route('/api/search/slang/batch', methods=['POST'])
+def api_search_slang_batch():
+    """
+    API endpoint searching many slang queries at once.
+    
+    The body is {"queries": [...], "mode": "fuzzy", "threshold": 60, "limit": 10,
+    "deadline_ms": 2000}; each query is a string or {"q": ..., "threshold": ..., "limit": ...}
+    overriding the batch defaults. Identical queries are searched once, cached ones are
+    answered from the result cache and the rest in parallel across the search worker
+    processes, and all are answered in input order. Queries not started by the
+    deadline are reported as timed out.
+    """
+    started = time.perf_counter()
+    body = request.get_json(silent=True) or {}
+    
+    queries = body.get('queries')
+    if not isinstance(queries, list):
+        return jsonify({'success': False, 'error': "'queries' must be a list", 'results': [], 'total': 0}), 400
+    if len(queries) > MAX_BATCH_QUERIES:
+        return jsonify({'success': False, 'error': f"At most {MAX_BATCH_QUERIES} queries per batch",
+                        'results': [], 'total': 0}), 400
+    
+    mode = str(body.get('mode', 'fuzzy')).lower()
+    if mode not in DEFAULT_THRESHOLDS:
+        return jsonify({'success': False, 'error': 'Invalid mode. Use "fuzzy" or "vector"',
+                        'results': [], 'total': 0}), 400
+    try:
+        threshold = int(body.get('threshold', DEFAULT_THRESHOLDS[mode]))
+        limit = int(body.get('limit', 10))
+        deadline = float(body.get('deadline_ms', BATCH_DEADLINE_MS)) / 1000
+        if not math.isfinite(deadline):
+            raise ValueError(f"Deadline must be finite: {deadline}")
+    except (TypeError, ValueError):
+        return jsonify({'success': False, 'error': 'Invalid batch parameters. "threshold" and "limit" '
+                                                   'must be integers and "deadline_ms" a number',
+                        'results': [], 'total': 0}), 400
+    
+    # Every item is checked before anything is searched, so one bad item fails the batch cleanly
+    keys = []
+    for number, item in enumerate(queries):
+        if not isinstance(item, dict):
+            item = {'q': item}
+        try:
+            keys.append((str(item.get('q') or '').strip(), int(item.get('threshold', threshold)),
+                         int(item.get('limit', limit))))
+        except (TypeError, ValueError):
+            return jsonify({'success': False, 'error': f'Invalid query {number}. "threshold" and "limit" '
+                                                       'must be integers',
+                            'results': [], 'total': 0}), 400
+    
+    try:
+        # Every query of the batch reads the same data version
+        data = data_store.current
+        deadline_at = time.time() + max(0.0, deadline - (time.perf_counter() - started))
+        responses = {}
+        futures = {}
+        for key in dict.fromkeys(keys):
+            query, query_threshold, query_limit = key
+            found = result_cache.get(data.version, search_cache_key(query, query_threshold, query_limit, mode=mode))
+            if found is not None:
+                responses[key] = {'success': True, 'timed_out': False, 'elapsed_ms': 0.0,
+                                  **slang_response(data, query, found, 'cached')}
+            else:
+                futures[key] = search_pool.submit(data, query, query_threshold, query_limit, mode,
+                                                  SEARCH_WEIGHTS, deadline_at)
+        
+        # Searches past the deadline return at once, so waiting for every future is bounded;
+        # one the pool dropped while shutting down counts as not started in time
+        for key, future in futures.items():
+            query, query_threshold, query_limit = key
+            try:
+                outcome = future.result()
+            except CancelledError:
+                outcome = None
+            if outcome is None:
+                responses[key] = {'success': False, 'timed_out': True, 'results': [], 'suggestions': [], 'total': 0}
+                continue
+            *found, elapsed_ms = outcome
+            found = tuple(found)
+            result_cache.put(data.version, search_cache_key(query, query_threshold, query_limit, mode=mode), found)
+            responses[key] = {'success': True, 'timed_out': False, 'elapsed_ms': elapsed_ms,
+                              **slang_response(data, query, found, None)}
+        
+        results = [{'query': query, 'threshold': query_threshold, 'limit': query_limit,
+                    **responses[(query, query_threshold, query_limit)]}
+                   for query, query_threshold, query_limit in keys]
+        
+        return jsonify({
+            'success': True,
+            'results': results,
+            'total': len(results),
+            'unique': len(responses),
+            'timed_out': sum(response['timed_out'] for response in responses.values()),
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 3)
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'results': [],
             'total': 0
         }), 500
 
+@app.route('/api/cache/stats')
+def api_cache_stats():
+    """API endpoint reporting slang search cache hit rate, evictions and memory use"""
+    return jsonify({
+        'success': True,
+        **result_cache.stats(),
+        'singleflight': search_flights.stats()
+    })
+
 @app.route('/api/slang/all')
 def api_get_all_slang():
     """API endpoint to get all slang terms"""
+    data = data_store.current
+    
     try:
         return jsonify({
             'success': True,
-            'data': slang_data,
-            'total': len(slang_data)
+            'data': data.slang_data,
+            'total': len(data.slang_data)
         })
     except Exception as e:
         return jsonify({
@@ -101,34 +439,127 @@ def api_get_all_slang():
             'total': 0
         }), 500
 
+@app.route('/api/slang/autocomplete')
+def api_autocomplete_slang():
+    """API endpoint completing a typed prefix to slang terms"""
+    prefix = request.args.get('prefix', '').strip()
+    limit = int(request.args.get('limit', MAX_COMPLETIONS))
+    data = data_store.current
+    
+    try:
+        completions = data.index('slang_autocomplete').complete(prefix, limit=limit)
+        return jsonify({
+            'success': True,
+            'prefix': prefix,
+            'completions': completions,
+            'total': len(completions)
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'prefix': prefix,
+            'completions': [],
+            'total': 0
+        }), 500
+
+@app.route('/api/slang/reverse')
+def api_reverse_slang():
+    """API endpoint finding slang terms for English words"""
+    query = request.args.get('q', '').strip()
+    limit = int(request.args.get('limit', 10))
+    data = data_store.current
+    
+    try:
+        results = data.index('slang_reverse').search(query, limit=limit)
+        return jsonify({
+            'success': True,
+            'query': query,
+            'results': results,
+            'total': len(results)
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'query': query,
+            'results': [],
+            'total': 0
+        }), 500
+
+def filter_biryani_query(data, query):
+    """Filter biryani spots of a data version by a SpotQuery, sharing results through the result cache"""
+    def run_filter():
+        if sqlite_backend:
+            return sqlite_backend.filter_biryani(data, query=query)
+        return filter_biryani_spots(data.biryani_data, query=query, index=data.index('biryani_facets'))
+    
+    # SpotQuery ignores case and value order, so equivalent filters share cached results
+    return cached_search(data, ('biryani',) + query.key(), run_filter)[0]
+
+def parse_rating(value):
+    """Parse an optional rating bound; blank means unbounded"""
+    if value is None or not value.strip():
+        return None
+    rating = float(value)
+    if not math.isfinite(rating):
+        raise ValueError(f"Rating must be finite: {value}")
+    return rating
+
 @app.route('/api/biryani/filter')
 def api_filter_biryani():
     """API endpoint for filtering biryani spots"""
-    area = request.args.get('area', '').strip()
-    vibe = request.args.get('vibe', '').strip()
+    # Every facet parameter may repeat, e.g. area=Charminar&area=Abids
+    areas, vibes, exclude_areas, exclude_vibes = (
+        [value.strip() for value in request.args.getlist(name) if value.strip()]
+        for name in ('area', 'vibe', 'exclude_area', 'exclude_vibe')
+    )
+    # Words that must all appear in a spot's description
+    text = request.args.get('q', '').strip() or None
+    # A single area or vibe is reported as before; several as a list
+    filters = {
+        'area': areas[0] if len(areas) == 1 else areas or None,
+        'vibe': vibes[0] if len(vibes) == 1 else vibes or None,
+        'exclude_area': exclude_areas,
+        'exclude_vibe': exclude_vibes,
+        'q': text
+    }
     
     try:
-        # Convert empty strings to None for filtering
-        area_filter = area if area else None
-        vibe_filter = vibe if vibe else None
-        
-        filtered_spots = filter_biryani_spots(biryani_data, area_filter, vibe_filter)
+        min_rating = parse_rating(request.args.get('min_rating'))
+        max_rating = parse_rating(request.args.get('max_rating'))
+    except ValueError:
+        return jsonify({
+            'success': False,
+            'error': 'Invalid rating. "min_rating" and "max_rating" must be numbers',
+            'filters': filters,
+            'results': [],
+            'total': 0
+        }), 400
+    filters.update(min_rating=min_rating, max_rating=max_rating)
+    data = data_store.current
+    
+    if query_log:
+        query_log.record('biryani', {'area': areas, 'vibe': vibes, 'exclude_area': exclude_areas,
+                                     'exclude_vibe': exclude_vibes, 'min_rating': min_rating,
+                                     'max_rating': max_rating, 'q': text})
+    
+    try:
+        query = SpotQuery(areas, vibes, exclude_areas, exclude_vibes, min_rating, max_rating, text)
+        filtered_spots = filter_biryani_query(data, query)
         
         return jsonify({
             'success': True,
-            'filters': {
-                'area': area_filter,
-                'vibe': vibe_filter
-            },
+            'filters': filters,
             'results': filtered_spots,
             'total': len(filtered_spots)
         })
-        
+    
     except Exception as e:
         return jsonify({
             'success': False,
             'error': str(e),
-            'filters': {'area': area, 'vibe': vibe},
+            'filters': filters,
             'results': [],
             'total': 0
         }), 500
@@ -136,11 +567,13 @@ def api_filter_biryani():
 @app.route('/api/biryani/all')
 def api_get_all_biryani():
     """API endpoint to get all biryani spots"""
+    data = data_store.current
+    
     try:
         return jsonify({
             'success': True,
-            'data': biryani_data,
-            'total': len(biryani_data)
+            'data': data.biryani_data,
+            'total': len(data.biryani_data)
         })
     except Exception as e:
         return jsonify({
@@ -153,8 +586,10 @@ def api_get_all_biryani():
 @app.route('/api/biryani/filters')
 def api_get_biryani_filters():
     """API endpoint to get available filter options"""
+    data = data_store.current
+    
     try:
-        stats = get_filter_stats(biryani_data)
+        stats = data.index('filter_stats')
         
         return jsonify({
             'success': True,
@@ -164,7 +599,7 @@ def api_get_biryani_filters():
             'vibe_counts': stats['vibe_counts'],
             'total_spots': stats['total_spots']
         })
-        
+    
     except Exception as e:
         return jsonify({
             'success': False,
@@ -189,8 +624,10 @@ def api_convert_time():
             'times': []
         }), 400
     
+    data = data_store.current
+    
     try:
-        converted_times = convert_time_format(time_data, mode)
+        converted_times = convert_time_format(data.time_data, mode)
         
         # Format for display
         formatted_times = [format_time_display(entry) for entry in converted_times]
@@ -201,7 +638,7 @@ def api_convert_time():
             'times': formatted_times,
             'total': len(formatted_times)
         })
-        
+    
     except Exception as e:
         return jsonify({
             'success': False,
@@ -214,8 +651,10 @@ def api_convert_time():
 @app.route('/api/time/current')
 def api_get_current_time():
     """API endpoint to get current time context"""
+    data = data_store.current
+    
     try:
-        current_context = get_current_time_context(time_data)
+        current_context = get_current_time_context(data.time_data)
         
         if current_context:
             return jsonify({
@@ -228,7 +667,7 @@ def api_get_current_time():
                 'current_time': None,
                 'message': 'No matching time context found'
             })
-        
+    
     except Exception as e:
         return jsonify({
             'success': False,
@@ -239,11 +678,13 @@ def api_get_current_time():
 @app.route('/api/time/all')
 def api_get_all_times():
     """API endpoint to get all time mappings"""
+    data = data_store.current
+    
     try:
         return jsonify({
             'success': True,
-            'data': time_data,
-            'total': len(time_data)
+            'data': data.time_data,
+            'total': len(data.time_data)
         })
     except Exception as e:
         return jsonify({
@@ -253,6 +694,30 @@ def api_get_all_times():
             'total': 0
         }), 500
 
+@app.route('/api/data/version')
+def api_get_data_version():
+    """API endpoint describing the data version currently being served"""
+    try:
+        return jsonify({
+            'success': True,
+            **data_store.current.describe()
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/ready')
+def api_ready():
+    """Readiness check; not ready until startup cache warm-up has finished"""
+    is_ready = ready.is_set()
+    return jsonify({
+        'success': True,
+        'ready': is_ready,
+        'data_version': data_store.current.version
+    }), 200 if is_ready else 503
+
 # Error handlers
 @app.errorhandler(404)
 def not_found_error(error):
@@ -274,6 +739,12 @@ def handle_exception(e):
     return render_template('500.html'), 500
 
 if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(description='Hyderabad Culture Navigator')
+    arg_parser.add_argument('--loading', choices=['eager', 'lazy'], default=LOADING,
+                            help='parse all sections at startup or each section on first use')
+    args = arg_parser.parse_args()
+    data_store.lazy = args.loading == 'lazy'
+    
     # Parse product.md data on startup
     load_data()
     
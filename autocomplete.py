@@ -0,0 +1,164 @@
+import re
+import logging
+
+from search import INDEXED_FIELDS, TRANSLITERATION_FOLDS, fold
+
+logger = logging.getLogger(__name__)
+
+# Completions kept at every trie node; lookups never return more than this
+MAX_COMPLETIONS = 10
+
+# Completion quality: a term match outranks a translation word match, and
+# among those, entries with more fields filled in rank first
+FIELD_PRIORITY = {'term': 100, 'translation': 50}
+FILLED_FIELD_BONUS = 10
+
+WORD = re.compile(r'\w+')
+
+def completion_score(entry, field):
+    """
+    Precomputed quality of completing to an entry through one of its fields.
+    
+    Args:
+        entry (dict): Slang entry (dictionary or compact record)
+        field (str): 'term' or 'translation'
+    
+    Returns:
+        int: Higher is better
+    """
+    filled = sum(1 for name in INDEXED_FIELDS if entry.get(name))
+    return FIELD_PRIORITY[field] + FILLED_FIELD_BONUS * filled
+
+def completion_keys(entry):
+    """
+    Folded keys an entry can be completed from, with their field.
+    
+    The whole term is one key; every word of the translation is another.
+    
+    Args:
+        entry (dict): Slang entry (dictionary or compact record)
+    
+    Returns:
+        list: (key, field) pairs
+    """
+    keys = []
+    term = fold(entry.get('term', ''))
+    if term:
+        keys.append((term, 'term'))
+    keys.extend((word, 'translation') for word in WORD.findall(fold(entry.get('translation', ''))))
+    return keys
+
+class SlangAutocomplete:
+    """
+    Compressed (radix) trie over folded slang terms and translation words.
+    
+    Built once per data version. Every node stores the best completions of
+    its whole subtree, ranked by completion_score, so a lookup only walks
+    the prefix and copies a short list, whatever the size of the corpus.
+    """
+    
+    __slots__ = ('entries', 'root')
+    
+    def __init__(self, slang_data):
+        # Nodes are [{first char: [edge label, child]}, {position: score}, top completions]
+        self.entries = tuple(slang_data)
+        self.root = [{}, {}, []]
+        for position, entry in enumerate(self.entries):
+            for key, field in completion_keys(entry):
+                self._insert(key, position, completion_score(entry, field))
+        self._rank(self.root)
+    
+    def __eq__(self, other):
+        return isinstance(other, SlangAutocomplete) and (self.entries, self.root) == (other.entries, other.root)
+    
+    def __len__(self):
+        return len(self.entries)
+    
+    def _insert(self, key, position, score):
+        node = self.root
+        while key:
+            edge = node[0].get(key[0])
+            if edge is None:
+                child = [{}, {}, []]
+                node[0][key[0]] = [key, child]
+                node = child
+                break
+            
+            label, child = edge
+            common = 0
+            while common < min(len(label), len(key)) and label[common] == key[common]:
+                common += 1
+            if common < len(label):
+                # Split the edge where the key leaves it
+                middle = [{label[common]: [label[common:], child]}, {}, []]
+                edge[0], edge[1] = label[:common], middle
+                child = middle
+            node = child
+            key = key[common:]
+        
+        if score > node[1].get(position, -1):
+            node[1][position] = score
+    
+    def _rank(self, root):
+        """Store the best completions of every subtree at its root, children first."""
+        stack, order = [root], []
+        while stack:
+            node = stack.pop()
+            order.append(node)
+            stack.extend(child for _, child in node[0].values())
+        
+        for node in reversed(order):
+            scores = dict(node[1])
+            for _, child in node[0].values():
+                for score, position in child[2]:
+                    if score > scores.get(position, -1):
+                        scores[position] = score
+            node[2] = sorted(((score, position) for position, score in scores.items()),
+                             key=lambda item: (-item[0], item[1]))[:MAX_COMPLETIONS]
+    
+    def _find(self, prefix):
+        """Return the node whose subtree holds every key starting with ``prefix``, or None."""
+        node = self.root
+        while prefix:
+            edge = node[0].get(prefix[0])
+            if edge is None:
+                return None
+            label, child = edge
+            if prefix.startswith(label):
+                prefix = prefix[len(label):]
+            elif not label.startswith(prefix):
+                return None
+            else:
+                prefix = ''
+            node = child
+        return node
+    
+    def complete(self, prefix, limit=MAX_COMPLETIONS):
+        """
+        Complete a prefix to slang entries.
+        
+        Args:
+            prefix (str): Typed prefix (folded before lookup)
+            limit (int): Maximum number of completions (at most MAX_COMPLETIONS)
+        
+        Returns:
+            list: Completions with the entry and its quality score, best first
+        """
+        prefix = (prefix or '').strip()
+        if not fold(prefix):
+            return []
+        
+        # A prefix ending halfway through a folded pair ('nako' of 'nakoo')
+        # folds differently from the whole word, so look up the completed pair too
+        prefixes = {fold(prefix)}
+        prefixes.update(fold(prefix + pair[1:]) for pair, _ in TRANSLITERATION_FOLDS
+                        if len(pair) > 1 and fold(prefix[-1:]) == fold(pair[0]))
+        
+        scores = {}
+        for folded in prefixes:
+            node = self._find(folded)
+            for score, position in node[2] if node is not None else ():
+                if score > scores.get(position, -1):
+                    scores[position] = score
+        best = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:max(limit, 0)]
+        return [{'entry': self.entries[position], 'score': score} for position, score in best]
@@ -0,0 +1,115 @@
+import time
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# Search indexes of the data version a worker process serves, set by init_worker
+_indexes = {}
+
+def init_worker(indexes):
+    """Keep the search indexes of one data version in a worker process"""
+    _indexes.update(indexes)
+
+def run_search(query, threshold, limit, mode, weights, deadline):
+    """
+    Run one batch slang search in a worker process.
+    
+    Args:
+        query (str): Search query
+        threshold (int): Minimum score
+        limit (int): Maximum number of results
+        mode (str): 'fuzzy' or 'vector'
+        weights (dict): Per-field score multipliers, or None
+        deadline (float): time.time() after which the search is not started
+    
+    Returns:
+        tuple: (results, pruned, fast_path, elapsed_ms), or None if the deadline had passed
+    """
+    if time.time() >= deadline:
+        return None
+    started = time.perf_counter()
+    stats = {}
+    if mode == 'vector':
+        results = _indexes['slang_vectors'].search(query, threshold=threshold, limit=limit)
+    else:
+        results = _indexes['slang_corpus'].search(query, threshold=threshold, limit=limit,
+                                                  weights=weights, stats=stats)
+    elapsed_ms = round((time.perf_counter() - started) * 1000, 3)
+    return results, stats.get('pruned', 0), stats.get('fast_path', False), elapsed_ms
+
+class SearchPool:
+    """
+    Process pool running batch slang searches against one data version.
+    
+    Fuzzy scoring holds the GIL, so threads in one process cannot search in
+    parallel; worker processes can. Workers are spawned rather than forked,
+    since the server already runs threads, and receive the corpus and vector
+    index once when they start. The pool is started by the first batch, and
+    once running it is replaced from the data store's publish hook, so a
+    new version gets its workers before any request sees it. Searches
+    already queued in the old pool finish there. Each search checks the
+    batch deadline before it starts, so queued work past the deadline costs
+    nothing and at most one search per worker runs over it.
+    """
+    
+    def __init__(self, workers=4):
+        self.workers = workers
+        self._version = None
+        self._executor = None
+        self._lock = threading.Lock()
+    
+    def _start(self, data):
+        """Start a pool for a data version in place of the current one; needs _lock"""
+        indexes = {name: data.index(name) for name in ('slang_corpus', 'slang_vectors')}
+        previous = self._executor
+        self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                             mp_context=multiprocessing.get_context('spawn'),
+                                             initializer=init_worker, initargs=(indexes,))
+        self._version = data.version
+        # Workers are spawned on demand; a few no-op tasks spawn them all now
+        for _ in range(self.workers):
+            self._executor.submit(time.time)
+        if previous is not None:
+            previous.shutdown(wait=False)
+        logger.info(f"Started {self.workers} search workers for data version {data.version}")
+    
+    def _executor_for(self, data):
+        """Return the pool serving data, starting it for the first batch or a newer version"""
+        with self._lock:
+            if self._executor is None or data.version > self._version:
+                self._start(data)
+            return self._executor
+    
+    def submit(self, data, query, threshold, limit, mode, weights, deadline):
+        """
+        Queue one search of a data version.
+        
+        Args:
+            data (DataVersion): Data version to search; an older one is served by the current pool
+            query, threshold, limit, mode, weights, deadline: As for run_search
+        
+        Returns:
+            Future: Resolves to the run_search result
+        """
+        return self._executor_for(data).submit(run_search, query, threshold, limit, mode, weights, deadline)
+    
+    def replace(self, data):
+        """
+        Move a running pool to a new data version; a pool not started yet is left to the first batch.
+        
+        Args:
+            data (DataVersion): Data version about to be published
+        """
+        with self._lock:
+            if self._executor is not None and data.version > self._version:
+                self._start(data)
+    
+    def close(self):
+        """Stop the worker processes"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,220 @@
+import sys
+import time
+import logging
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
+
+logger = logging.getLogger(__name__)
+
+def estimate_size(value, seen=None):
+    """
+    Approximate the memory held by a cached value, following containers.
+    
+    Objects reachable twice are counted once. Entries shared with the data
+    version are counted too, so the estimate errs on the high side.
+    
+    Args:
+        value: Value to measure
+        seen (set): Ids of objects already counted
+    
+    Returns:
+        int: Size in bytes
+    """
+    if seen is None:
+        seen = set()
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    
+    size = sys.getsizeof(value)
+    if isinstance(value, Mapping):
+        size += sum(estimate_size(key, seen) + estimate_size(value[key], seen) for key in value)
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(estimate_size(item, seen) for item in value)
+    return size
+
+class ResultCache:
+    """
+    Thread-safe LRU cache of query results for one data version at a time.
+    
+    The cache is bounded by the estimated memory of its values rather than
+    their number; the least recently used results are evicted first, and
+    results older than ``ttl`` seconds are treated as missing. Every lookup
+    carries the data version it was computed from: a newer version clears
+    the cache, and results for an older one are neither served nor stored.
+    """
+    
+    def __init__(self, max_bytes=16 * 1024 * 1024, ttl=300):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.version = None
+        self._items = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.expirations = 0
+    
+    def _switch(self, version):
+        """Clear the cache for a newer data version; return False for an older one."""
+        if version == self.version:
+            return True
+        if self.version is not None and version < self.version:
+            return False
+        if self._items:
+            logger.info(f"Clearing {len(self._items)} cached results for data version {version}")
+        self._items.clear()
+        self._bytes = 0
+        self.version = version
+        return True
+    
+    def get(self, version, key):
+        """
+        Look up a cached result.
+        
+        Args:
+            version (int): Data version the request is using
+            key (tuple): Normalized query parameters
+        
+        Returns:
+            The cached value, or None on a miss
+        """
+        with self._lock:
+            if not self._switch(version) or key not in self._items:
+                self.misses += 1
+                return None
+            
+            value, size, stored = self._items[key]
+            if self.ttl and time.monotonic() - stored > self.ttl:
+                del self._items[key]
+                self._bytes -= size
+                self.expirations += 1
+                self.misses += 1
+                return None
+            
+            self._items.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    def put(self, version, key, value):
+        """
+        Store a result, evicting least recently used ones to stay within budget.
+        
+        Args:
+            version (int): Data version the value was computed from
+            key (tuple): Normalized query parameters
+            value: Result to cache; callers must not mutate it afterwards
+        """
+        if self.max_bytes <= 0:
+            return
+        size = estimate_size(key) + estimate_size(value)
+        
+        with self._lock:
+            if not self._switch(version) or size > self.max_bytes:
+                return
+            if key in self._items:
+                self._bytes -= self._items.pop(key)[1]
+            while self._items and self._bytes + size > self.max_bytes:
+                _, (_, evicted_size, _) = self._items.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+            self._items[key] = (value, size, time.monotonic())
+            self._bytes += size
+    
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._bytes = 0
+    
+    def stats(self):
+        """
+        Report cache effectiveness and memory use.
+        
+        Returns:
+            dict: Hit and miss counts, hit rate, evictions, expirations, size and budget
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'version': self.version,
+                'entries': len(self._items),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations
+            }
+
+class _Call:
+    """One in-flight computation and the requests waiting for it."""
+    
+    __slots__ = ('done', 'value', 'error')
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent computations.
+    
+    The first caller for a key runs the computation; callers arriving with
+    the same key while it is running wait for it and share its result (or
+    its exception) instead of computing it again. Nothing is kept once the
+    computation finishes; caching results is left to ResultCache.
+    """
+    
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.calls = self.coalesced = 0
+    
+    def do(self, key, compute):
+        """
+        Run ``compute`` unless an identical computation is already running.
+        
+        Args:
+            key (tuple): Identifies the computation, including the data version
+            compute (callable): Function of no arguments producing the result
+        
+        Returns:
+            tuple: (result, True if it was shared from another caller's computation)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.calls += 1
+            else:
+                self.coalesced += 1
+        
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value, True
+        
+        try:
+            call.value = compute()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.value, False
+    
+    def stats(self):
+        """
+        Report how many computations ran and how many callers shared one.
+        
+        Returns:
+            dict: Computations run, callers coalesced and computations in flight
+        """
+        with self._lock:
+            return {'calls': self.calls, 'coalesced': self.coalesced, 'in_flight': len(self._calls)}
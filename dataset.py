@@ -0,0 +1,473 @@
+import os
+import time
+import hashlib
+import logging
+import threading
+from datetime import datetime
+
+from parser import (SECTION_KEYS, DEDUPE_KEYS, iter_markdown_tables, is_multi_source,
+                    resolve_sources, parse_shards, merge_sections)
+from records import compact_row
+from snapshot import load_compiled_data, snapshot_path, snapshot_key, write_snapshot
+from filters import get_filter_stats, FacetIndex
+from search import SearchCorpus, BKTree
+from autocomplete import SlangAutocomplete
+from reverse import ReverseIndex
+from vectors import VectorIndex
+
+logger = logging.getLogger(__name__)
+
+# Section key -> section name, for loading sections by key
+SECTION_NAMES = {key: name for name, key in SECTION_KEYS.items()}
+
+# Derived indexes built for every data version: name -> (section key, builder)
+INDEX_BUILDERS = {
+    'filter_stats': ('biryani_data', get_filter_stats),
+    'biryani_facets': ('biryani_data', FacetIndex),
+    'slang_corpus': ('slang_data', SearchCorpus),
+    'slang_terms': ('slang_data', BKTree),
+    'slang_autocomplete': ('slang_data', SlangAutocomplete),
+    'slang_reverse': ('slang_data', ReverseIndex),
+    'slang_vectors': ('slang_data', VectorIndex)
+}
+
+# Bump whenever an index builder changes so compiled snapshots are rebuilt
+INDEX_VERSION = 14
+
+class SectionSpan:
+    """Byte range and content digest of one ``## `` section in the source file."""
+    
+    __slots__ = ('name', 'start', 'end', 'digest', 'first_line')
+    
+    def __init__(self, name, start, end, digest, first_line=1):
+        self.name = name
+        self.start = start
+        self.end = end
+        self.digest = digest
+        self.first_line = first_line
+
+def scan_sections(file_path):
+    """
+    Scan the source file once, recording the byte span and digest of each
+    known section without parsing any tables.
+    
+    Args:
+        file_path (str): Path to the product.md file
+    
+    Returns:
+        tuple: (SHA-256 hex digest of the whole file, dict of section name to SectionSpan)
+    """
+    file_digest = hashlib.sha256()
+    headings = {name: f"## {name}".encode('utf-8') for name in SECTION_KEYS}
+    spans = {}
+    current = None
+    section_digest = None
+    start = 0
+    start_line = 1
+    position = 0
+    
+    def close_section():
+        if current is not None:
+            spans[current] = SectionSpan(current, start, position, section_digest.hexdigest(), start_line)
+    
+    with open(file_path, 'rb') as file:
+        for line_number, line in enumerate(file, start=1):
+            if line.startswith(b'## ') or line.startswith(b'# '):
+                close_section()
+                current = None
+                for name, heading in headings.items():
+                    if name not in spans and line.startswith(heading):
+                        current = name
+                        section_digest = hashlib.sha1()
+                        start = position
+                        start_line = line_number
+                        break
+            if current is not None:
+                section_digest.update(line)
+            file_digest.update(line)
+            position += len(line)
+        close_section()
+    
+    return file_digest.hexdigest(), spans
+
+def parse_section(file_path, span):
+    """
+    Parse a single section by seeking straight to its byte span.
+    
+    The bytes read are checked against the digest recorded by the scan; if
+    the file changed in between, the section is re-read from the start of
+    the file instead.
+    
+    Args:
+        file_path (str): Path to the product.md file
+        span (SectionSpan): Span recorded by scan_sections
+    
+    Returns:
+        tuple: Parsed table rows for the section, as compact records
+    """
+    section_key = SECTION_KEYS[span.name]
+    digest = hashlib.sha1()
+    
+    def span_lines(file):
+        file.seek(span.start)
+        remaining = span.end - span.start
+        while remaining > 0:
+            line = file.readline(remaining)
+            if not line:
+                break
+            remaining -= len(line)
+            digest.update(line)
+            yield line.decode('utf-8', errors='replace')
+    
+    with open(file_path, 'rb') as file:
+        rows = tuple(compact_row(section_key, row)
+                     for _, row in iter_markdown_tables(span_lines(file), [span.name],
+                                                        first_line=span.first_line))
+    
+    if digest.hexdigest() != span.digest:
+        logger.warning(f"Section '{span.name}' changed since {file_path} was scanned; re-reading it")
+        with open(file_path, 'r', encoding='utf-8') as file:
+            rows = tuple(compact_row(section_key, row)
+                         for _, row in iter_markdown_tables(file, [span.name]))
+    return rows
+
+def build_section_indexes(section_key, rows):
+    """
+    Build the derived indexes over one section.
+    
+    Args:
+        section_key (str): Section key such as 'slang_data'
+        rows (tuple): Rows of that section
+    
+    Returns:
+        dict: Index name -> index
+    """
+    return {name: builder(rows) for name, (key, builder) in INDEX_BUILDERS.items() if key == section_key}
+
+def build_indexes(data, sections=None, previous=None):
+    """
+    Build derived indexes for a data version.
+    
+    Args:
+        data (dict): Section key -> rows
+        sections (set): Section keys that changed; indexes over other sections
+            are reused from ``previous``. None rebuilds everything.
+        previous (dict): Indexes of the previous version
+    
+    Returns:
+        dict: Index name -> index
+    """
+    indexes = {}
+    for section_key, rows in data.items():
+        if sections is not None and section_key not in sections and previous is not None:
+            indexes.update((name, previous[name]) for name, (key, _) in INDEX_BUILDERS.items()
+                           if key == section_key and name in previous)
+        else:
+            indexes.update(build_section_indexes(section_key, rows))
+    return indexes
+
+class DataVersion:
+    """
+    Immutable version of the product data and its derived indexes.
+    
+    Request handlers grab ``DataStore.current`` once and read everything from
+    that object, so a reload swapping in a new version never changes the data
+    under an in-flight request.
+    
+    In lazy mode a version starts with only some (or none) of its sections;
+    the rest are parsed and indexed by ``loader`` on first access. Each
+    section has its own lock, so concurrent first requests parse it once and
+    requests for other sections are not blocked.
+    """
+    
+    __slots__ = ('version', 'loaded_at', 'digest', 'sections', 'indexes', 'section_digests', 'shards',
+                 '_loader', '_locks')
+    
+    def __init__(self, version, sections, indexes, digest=None, section_digests=None,
+                 shards=(), loaded_at=None, loader=None):
+        self.version = version
+        self.sections = sections
+        self.indexes = indexes
+        self.digest = digest
+        self.section_digests = section_digests or {}
+        self.shards = shards
+        self.loaded_at = loaded_at if loaded_at is not None else time.time()
+        self._loader = loader
+        self._locks = {key: threading.Lock() for key in SECTION_KEYS.values()} if loader else None
+    
+    def is_loaded(self, section_key):
+        return section_key in self.sections
+    
+    def section(self, section_key):
+        """Return the rows of a section, loading it first if needed."""
+        rows = self.sections.get(section_key)
+        if rows is not None:
+            return rows
+        if self._loader is None:
+            raise KeyError(section_key)
+        
+        with self._locks[section_key]:
+            rows = self.sections.get(section_key)
+            if rows is None:
+                started = time.perf_counter()
+                rows = self._loader(section_key)
+                # Publish the indexes before the rows: a reader that sees the rows sees the indexes
+                self.indexes.update(build_section_indexes(section_key, rows))
+                self.sections[section_key] = rows
+                logger.info(f"Loaded section '{section_key}' of data version {self.version} "
+                            f"on first access in {time.perf_counter() - started:.3f}s")
+        return rows
+    
+    def index(self, name):
+        """Return a derived index, loading its section first if needed."""
+        self.section(INDEX_BUILDERS[name][0])
+        return self.indexes[name]
+    
+    @property
+    def slang_data(self):
+        return self.section('slang_data')
+    
+    @property
+    def biryani_data(self):
+        return self.section('biryani_data')
+    
+    @property
+    def time_data(self):
+        return self.section('time_data')
+    
+    def describe(self):
+        """Return version metadata for the API, without loading lazy sections."""
+        description = {
+            'version': self.version,
+            'loaded_at': datetime.fromtimestamp(self.loaded_at).isoformat(),
+            'digest': self.digest,
+            'loading': 'lazy' if self._loader else 'eager',
+            'sections': {key: len(self.sections[key]) if key in self.sections else None
+                         for key in SECTION_KEYS.values()}
+        }
+        if self.shards:
+            description['shards'] = list(self.shards)
+        return description
+
+def _empty_version():
+    sections = {key: () for key in SECTION_KEYS.values()}
+    return DataVersion(0, sections, build_indexes(sections))
+
+class DataStore:
+    """
+    Owns the current DataVersion and swaps in new versions when product.md changes.
+    
+    Changes are detected by polling the file's mtime and size. Only sections
+    whose bytes changed are re-parsed, and only indexes over those sections
+    are rebuilt; everything is built on the watcher thread before the new
+    version is published with a single reference assignment.
+    
+    With ``lazy=True`` a load only scans the file for section offsets, and
+    each section is parsed and indexed on first access instead (single files
+    only; snapshots are not used in this mode).
+    
+    ``file_path`` may also be a directory or glob of shards. Shards are parsed
+    in parallel processes and merged with ``dedupe_keys``; on reload only the
+    shards whose mtime or size changed are re-parsed. Snapshots are only used
+    for single files.
+    
+    Publish hooks let other components prepare for a new version (compile
+    a database, start worker processes) on the loading thread, before any
+    request can see it.
+    """
+    
+    def __init__(self, file_path='product.md', max_workers=None, dedupe_keys=DEDUPE_KEYS, lazy=False):
+        self.file_path = file_path
+        self.max_workers = max_workers
+        self.dedupe_keys = dedupe_keys
+        self.lazy = lazy
+        self._current = _empty_version()
+        self._stat = None
+        self._shards = {}
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher = None
+        self._publish_hooks = []
+    
+    @property
+    def current(self):
+        """The DataVersion new requests should use."""
+        return self._current
+    
+    def _file_stat(self):
+        try:
+            stat = os.stat(self.file_path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+    
+    def _section_loader(self, spans):
+        """Return a loader parsing sections of the current file by their scanned spans."""
+        file_path = self.file_path
+        
+        def load(section_key):
+            span = spans.get(SECTION_NAMES[section_key])
+            return parse_section(file_path, span) if span else ()
+        
+        return load
+    
+    def load(self):
+        """
+        Load the data for the first time, using the compiled snapshot when current.
+        
+        Returns:
+            DataVersion: The newly published version
+        """
+        with self._reload_lock:
+            if is_multi_source(self.file_path):
+                if self.lazy:
+                    logger.info("Lazy loading is only supported for single files; loading shards eagerly")
+                self._load_shards()
+                return self._current
+            
+            stat = self._file_stat()
+            if stat is None:
+                logger.error(f"File {self.file_path} not found")
+                return self._current
+            
+            digest, spans = scan_sections(self.file_path)
+            if self.lazy:
+                self._publish({}, {}, digest, spans, loader=self._section_loader(spans))
+                self._stat = stat
+                return self._current
+            
+            data = load_compiled_data(self.file_path, build_indexes=build_indexes,
+                                      digest=digest, compact=True, index_version=INDEX_VERSION)
+            indexes = data.pop('indexes')
+            sections = {key: tuple(data.get(key, ())) for key in SECTION_KEYS.values()}
+            
+            self._publish(sections, indexes, digest, spans)
+            self._stat = stat
+            return self._current
+    
+    def reload_if_changed(self):
+        """
+        Re-parse changed sections if the source file changed since the last load.
+        
+        In lazy mode changed (and never-loaded) sections are left for the new
+        version to load on first access.
+        
+        Returns:
+            bool: True if a new version was published
+        """
+        with self._reload_lock:
+            if is_multi_source(self.file_path):
+                return self._load_shards()
+            
+            stat = self._file_stat()
+            if stat is None or stat == self._stat:
+                return False
+            
+            previous = self._current
+            digest, spans = scan_sections(self.file_path)
+            self._stat = stat
+            if digest == previous.digest:
+                return False
+            
+            sections = {}
+            changed = set()
+            for name, key in SECTION_KEYS.items():
+                span = spans.get(name)
+                if (span is not None and previous.is_loaded(key)
+                        and span.digest == previous.section_digests.get(name)):
+                    sections[key] = previous.sections[key]
+                    continue
+                if not self.lazy:
+                    sections[key] = parse_section(self.file_path, span) if span else ()
+                changed.add(key)
+            
+            indexes = build_indexes(sections, sections=changed, previous=previous.indexes)
+            loader = self._section_loader(spans) if self.lazy else None
+            self._publish(sections, indexes, digest, spans, loader=loader)
+            
+            if not self.lazy:
+                write_snapshot(snapshot_path(self.file_path), snapshot_key(digest, compact=True, index_version=INDEX_VERSION),
+                               dict(sections, indexes=indexes))
+            logger.info(f"Reloaded {self.file_path} as data version {self._current.version}; "
+                        f"{'deferred' if self.lazy else 're-parsed'} sections: {sorted(changed) or 'none'}")
+            return True
+    
+    def _load_shards(self):
+        """
+        Parse new or changed shards and publish the merged data.
+        
+        Returns:
+            bool: True if a new version was published
+        """
+        stats = {}
+        for path in resolve_sources(self.file_path):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            stats[path] = (stat.st_mtime_ns, stat.st_size)
+        
+        if stats == self._stat:
+            return False
+        
+        changed = [path for path, stat in stats.items()
+                   if path not in self._shards or self._shards[path][0] != stat]
+        for (data, timing), path in zip(parse_shards(changed, compact=True, max_workers=self.max_workers), changed):
+            self._shards[path] = (stats[path], data, timing)
+        for path in set(self._shards) - set(stats):
+            del self._shards[path]
+        self._stat = stats
+        
+        ordered = [self._shards[path] for path in sorted(self._shards)]
+        merged = merge_sections([data for _, data, _ in ordered], self.dedupe_keys)
+        sections = {key: tuple(rows) for key, rows in merged.items()}
+        self._publish(sections, build_indexes(sections), None, {},
+                      shards=tuple(timing for _, _, timing in ordered))
+        logger.info(f"Loaded {len(ordered)} shards from {self.file_path} as data version "
+                    f"{self._current.version}; re-parsed {len(changed)}")
+        return True
+    
+    def add_publish_hook(self, hook):
+        """
+        Call a function with every later version before it is published.
+        
+        Args:
+            hook (callable): Called as hook(data) with the new DataVersion; an
+                exception is logged and does not stop the version being published
+        """
+        self._publish_hooks.append(hook)
+    
+    def _publish(self, sections, indexes, digest, spans, shards=(), loader=None):
+        section_digests = {name: span.digest for name, span in spans.items()}
+        data = DataVersion(self._current.version + 1, sections, indexes,
+                           digest=digest, section_digests=section_digests,
+                           shards=shards, loader=loader)
+        for hook in self._publish_hooks:
+            try:
+                hook(data)
+            except Exception as e:
+                logger.error(f"Error preparing data version {data.version}: {str(e)}")
+        self._current = data
+    
+    def start_watching(self, interval=2.0):
+        """Start a daemon thread polling the source file for changes."""
+        if self._watcher is not None:
+            return
+        
+        def watch():
+            while not self._stop.wait(interval):
+                try:
+                    self.reload_if_changed()
+                except Exception as e:
+                    logger.error(f"Error reloading {self.file_path}: {str(e)}")
+        
+        self._watcher = threading.Thread(target=watch, name='product-data-watcher', daemon=True)
+        self._watcher.start()
+    
+    def stop_watching(self):
+        """Stop the watcher thread."""
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+        self._stop.clear()
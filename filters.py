@@ -1,15 +1,270 @@
+import re
 import logging
+import unicodedata
+from bisect import bisect_left, bisect_right
 
 logger = logging.getLogger(__name__)
 
-def filter_biryani_spots(biryani_data, area_filter=None, vibe_filter=None):
+# Spot fields indexed by FacetIndex
+FACET_FIELDS = ('area', 'vibe')
+
+def rating_order(biryani_data):
+    """Return spots sorted by rating (highest first), keeping source order for ties."""
+    return sorted(biryani_data, key=lambda x: x.get('rating') or 0, reverse=True)
+
+def is_rated(spot):
+    """Return True if a spot has a numeric rating."""
+    rating = spot.get('rating')
+    return isinstance(rating, (int, float)) and not isinstance(rating, bool)
+
+def facet_values(values):
+    """
+    Normalize the values of one facet filter.
+    
+    Args:
+        values: A value, a list of values, or None
+    
+    Returns:
+        frozenset: Stripped, lowercased values, blanks dropped
+    """
+    if values is None:
+        return frozenset()
+    if isinstance(values, str):
+        values = [values]
+    return frozenset(value.strip().lower() for value in values if value and value.strip())
+
+def description_words(text):
+    """
+    Split text into the words a description search matches.
+    
+    Args:
+        text (str): Description or search text
+    
+    Returns:
+        frozenset: Lowercased words of letters and digits, accents stripped
+    """
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    stripped = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return frozenset(re.findall(r'[^\W_]+', stripped.lower()))
+
+class SpotQuery:
+    """
+    Normalized criteria of a biryani filter.
+    
+    A spot matches when its area is one of ``areas`` and its vibe one of
+    ``vibes`` (either is unrestricted when empty), neither is excluded, and
+    its rating lies within the inclusive rating range, and its description
+    contains every word of ``text``. Areas and vibes compare
+    case-insensitively, description words also ignoring accents; spots
+    without a rating never match a range.
+    """
+    
+    __slots__ = ('include', 'exclude', 'min_rating', 'max_rating', 'words')
+    
+    def __init__(self, areas=None, vibes=None, exclude_areas=None, exclude_vibes=None,
+                 min_rating=None, max_rating=None, text=None):
+        self.include = dict(zip(FACET_FIELDS, (facet_values(areas), facet_values(vibes))))
+        self.exclude = dict(zip(FACET_FIELDS, (facet_values(exclude_areas), facet_values(exclude_vibes))))
+        self.min_rating = min_rating
+        self.max_rating = max_rating
+        self.words = description_words(text)
+    
+    def key(self):
+        """Return a hashable form of the criteria, equal for equivalent queries."""
+        return (tuple(tuple(sorted(self.include[field])) for field in FACET_FIELDS),
+                tuple(tuple(sorted(self.exclude[field])) for field in FACET_FIELDS),
+                self.min_rating, self.max_rating, tuple(sorted(self.words)))
+    
+    def __eq__(self, other):
+        return isinstance(other, SpotQuery) and self.key() == other.key()
+    
+    def __hash__(self):
+        return hash(self.key())
+    
+    def has_rating_range(self):
+        return self.min_rating is not None or self.max_rating is not None
+    
+    def matches(self, spot):
+        """Return True if a spot meets every criterion."""
+        for field in FACET_FIELDS:
+            value = (spot.get(field) or '').lower()
+            if self.include[field] and value not in self.include[field]:
+                return False
+            if value in self.exclude[field]:
+                return False
+        
+        if self.has_rating_range():
+            if not is_rated(spot):
+                return False
+            rating = spot.get('rating')
+            if self.min_rating is not None and rating < self.min_rating:
+                return False
+            if self.max_rating is not None and rating > self.max_rating:
+                return False
+        
+        if self.words and not self.words <= description_words(spot.get('description')):
+            return False
+        return True
+
+class FacetIndex:
+    """
+    Per-value bitmaps of biryani spots for area and vibe, built once per data version.
+    
+    Spots are sorted by rating once when the index is built, and bit ``i`` of
+    a bitmap stands for the ``i``-th spot in that order. That order doubles
+    as the rating index: the spots within a rating range are a contiguous
+    run of positions found by binary search. A query is planned as a list of
+    bitmap predicates, most selective first, and evaluated by ANDing them;
+    reading out the set bits lowest first yields the matching spots already
+    sorted by rating. Description words have bitmaps of their own.
+    """
+    
+    __slots__ = ('spots', 'bitmaps', 'counts', 'ratings', 'rated', 'words')
+    
+    def __init__(self, biryani_data):
+        self.spots = tuple(rating_order(biryani_data))
+        # Field -> lowercased value -> bitmap of the spots having it, and their number
+        self.bitmaps = {field: {} for field in FACET_FIELDS}
+        self.counts = {field: {} for field in FACET_FIELDS}
+        self.rated = 0
+        # Description word -> bitmap of the spots whose description has it
+        self.words = {}
+        for position, spot in enumerate(self.spots):
+            for field in FACET_FIELDS:
+                value = (spot.get(field) or '').lower()
+                values = self.bitmaps[field]
+                values[value] = values.get(value, 0) | (1 << position)
+                self.counts[field][value] = self.counts[field].get(value, 0) + 1
+            if is_rated(spot):
+                self.rated |= 1 << position
+            for word in description_words(spot.get('description')):
+                self.words[word] = self.words.get(word, 0) | (1 << position)
+        # Negated sort keys, ascending, for binary searching rating ranges
+        self.ratings = tuple(-(spot.get('rating') or 0) for spot in self.spots)
+    
+    def __eq__(self, other):
+        return isinstance(other, FacetIndex) and (self.spots, self.bitmaps) == (other.spots, other.bitmaps)
+    
+    def __len__(self):
+        return len(self.spots)
+    
+    def bitmap(self, field, value):
+        """Return the bitmap of spots whose ``field`` equals ``value`` case-insensitively."""
+        return self.bitmaps[field].get(value.strip().lower(), 0)
+    
+    def any_of(self, field, values):
+        """Return the bitmap of spots whose ``field`` is any of the normalized ``values``."""
+        bits = 0
+        for value in values:
+            bits |= self.bitmaps[field].get(value, 0)
+        return bits
+    
+    def rating_range(self, min_rating=None, max_rating=None):
+        """
+        Find the run of positions whose rating sort key lies in a range.
+        
+        Args:
+            min_rating (float): Lowest rating, inclusive
+            max_rating (float): Highest rating, inclusive
+        
+        Returns:
+            tuple: (first position, position after the last)
+        """
+        start = bisect_left(self.ratings, -max_rating) if max_rating is not None else 0
+        stop = bisect_right(self.ratings, -min_rating) if min_rating is not None else len(self.spots)
+        return start, max(start, stop)
+    
+    def plan(self, query):
+        """
+        Turn a query into bitmap predicates, most selective first.
+        
+        Area, vibe and description word estimates are exact counts; a rating
+        range is estimated by the length of its run, which may include
+        unrated spots.
+        
+        Args:
+            query (SpotQuery): Filter criteria
+        
+        Returns:
+            list: (estimated matches, predicate name, function returning its bitmap)
+        """
+        everything = (1 << len(self.spots)) - 1
+        steps = []
+        for field in FACET_FIELDS:
+            values = query.include[field]
+            if values:
+                estimate = sum(self.counts[field].get(value, 0) for value in values)
+                steps.append((estimate, field, lambda field=field, values=values: self.any_of(field, values)))
+            values = query.exclude[field]
+            if values:
+                estimate = len(self.spots) - sum(self.counts[field].get(value, 0) for value in values)
+                steps.append((estimate, f"not {field}",
+                              lambda field=field, values=values: everything & ~self.any_of(field, values)))
+        
+        if query.has_rating_range():
+            start, stop = self.rating_range(query.min_rating, query.max_rating)
+            steps.append((stop - start, 'rating',
+                          lambda: self.rated & ((1 << stop) - 1) & ~((1 << start) - 1)))
+        
+        for word in sorted(query.words):
+            bits = self.words.get(word, 0)
+            steps.append((bin(bits).count('1'), f"word {word}", lambda bits=bits: bits))
+        
+        steps.sort(key=lambda step: step[0])
+        return steps
+    
+    def spots_in(self, bits):
+        """Return the spots of a bitmap, in rating order."""
+        digits = bin(bits)[:1:-1]
+        spots = []
+        position = digits.find('1')
+        while position != -1:
+            spots.append(self.spots[position])
+            position = digits.find('1', position + 1)
+        return spots
+    
+    def filter(self, query, stats=None):
+        """
+        Filter spots by intersecting the bitmaps of a query's predicates.
+        
+        Predicates are evaluated most selective first, and evaluation stops
+        as soon as no spot is left.
+        
+        Args:
+            query (SpotQuery): Filter criteria
+            stats (dict): Optional dict filled with the planned predicates
+                ('plan') and how many were evaluated ('evaluated')
+        
+        Returns:
+            list: Matching spots, highest rating first
+        """
+        steps = self.plan(query)
+        if stats is not None:
+            stats['plan'] = [name for _, name, _ in steps]
+            stats['evaluated'] = 0
+        if not steps:
+            return list(self.spots)
+        
+        bits = (1 << len(self.spots)) - 1
+        for _, _, bitmap in steps:
+            if not bits:
+                break
+            bits &= bitmap()
+            if stats is not None:
+                stats['evaluated'] += 1
+        return self.spots_in(bits)
+
+def filter_biryani_spots(biryani_data, area_filter=None, vibe_filter=None, index=None, query=None):
     """
-    Filter biryani spots by area and vibe criteria.
+    Filter biryani spots by area, vibe and rating criteria.
     
     Args:
-        biryani_data (list): List of biryani spot dictionaries
-        area_filter (str): Area to filter by (case-insensitive)
-        vibe_filter (str): Vibe to filter by (case-insensitive)
+        biryani_data (list): Biryani spots (dictionaries or compact records)
+        area_filter (str or list): Area(s) to filter by (case-insensitive)
+        vibe_filter (str or list): Vibe(s) to filter by (case-insensitive)
+        index (FacetIndex): Prebuilt index of biryani_data; filtering then
+            intersects its bitmaps instead of scanning and sorting
+        query (SpotQuery): Full criteria, used instead of area_filter and vibe_filter
     
     Returns:
         list: Filtered list of biryani spots
@@ -18,32 +273,22 @@ def filter_biryani_spots(biryani_data, area_filter=None, vibe_filter=None):
         return []
     
     try:
-        filtered_spots = biryani_data.copy()
-        
-        # Apply area filter
-        if area_filter and area_filter.strip():
-            area_filter = area_filter.strip().lower()
-            filtered_spots = [
-                spot for spot in filtered_spots 
-                if spot.get('area', '').lower() == area_filter
-            ]
-            logger.info(f"Applied area filter '{area_filter}': {len(filtered_spots)} spots remaining")
-        
-        # Apply vibe filter
-        if vibe_filter and vibe_filter.strip():
-            vibe_filter = vibe_filter.strip().lower()
-            filtered_spots = [
-                spot for spot in filtered_spots 
-                if spot.get('vibe', '').lower() == vibe_filter
-            ]
-            logger.info(f"Applied vibe filter '{vibe_filter}': {len(filtered_spots)} spots remaining")
-        
-        # Sort by rating (highest first) if rating exists
-        filtered_spots.sort(key=lambda x: x.get('rating', 0), reverse=True)
+        if query is None:
+            query = SpotQuery(area_filter, vibe_filter)
+        
+        if index is not None:
+            stats = {}
+            filtered_spots = index.filter(query, stats=stats)
+            logger.info(f"Filter results: {len(filtered_spots)} spots match criteria "
+                        f"(plan: {', '.join(stats['plan']) or 'none'})")
+            return filtered_spots
+        
+        # Single pass over the spots, then sort by rating (highest first)
+        filtered_spots = rating_order(spot for spot in biryani_data if query.matches(spot))
         
         logger.info(f"Filter results: {len(filtered_spots)} spots match criteria")
         return filtered_spots
-        
+    
     except Exception as e:
         logger.error(f"Error filtering biryani spots: {str(e)}")
         return biryani_data  # Return original data on error
@@ -53,7 +298,7 @@ def get_unique_areas(biryani_data):
     Get list of unique areas from biryani data.
     
     Args:
-        biryani_data (list): List of biryani spot dictionaries
+        biryani_data (list): Biryani spots (dictionaries or compact records)
     
     Returns:
         list: Sorted list of unique areas
@@ -69,7 +314,7 @@ def get_unique_areas(biryani_data):
                 areas.add(area)
         
         return sorted(list(areas))
-        
+    
     except Exception as e:
         logger.error(f"Error getting unique areas: {str(e)}")
         return []
@@ -79,7 +324,7 @@ def get_unique_vibes(biryani_data):
     Get list of unique vibes from biryani data.
     
     Args:
-        biryani_data (list): List of biryani spot dictionaries
+        biryani_data (list): Biryani spots (dictionaries or compact records)
     
     Returns:
         list: Sorted list of unique vibes
@@ -95,7 +340,7 @@ def get_unique_vibes(biryani_data):
                 vibes.add(vibe)
         
         return sorted(list(vibes))
-        
+    
     except Exception as e:
         logger.error(f"Error getting unique vibes: {str(e)}")
         return []
@@ -105,7 +350,7 @@ def get_filter_stats(biryani_data):
     Get statistics about available filters.
     
     Args:
-        biryani_data (list): List of biryani spot dictionaries
+        biryani_data (list): Biryani spots (dictionaries or compact records)
     
     Returns:
         dict: Statistics including unique areas, vibes, and counts
@@ -135,7 +380,7 @@ def get_filter_stats(biryani_data):
             'area_counts': area_counts,
             'vibe_counts': vibe_counts
         }
-        
+    
     except Exception as e:
         logger.error(f"Error getting filter stats: {str(e)}")
         return {
@@ -1,11 +1,293 @@
-import re
 import os
+import io
+import csv
+import glob
+import time
 import logging
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from records import compact_row
+from schemas import SCHEMAS, INFERENCE_SAMPLE_SIZE, RowError, SchemaError, infer_converter
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Bump whenever the parsed output changes so compiled snapshots are rebuilt
+PARSER_VERSION = 5
+
+# Section headers in product.md and the keys they are returned under
+SECTION_KEYS = {
+    'Lingo Section': 'slang_data',
+    'Biryani Spots': 'biryani_data',
+    'Time Tables': 'time_data'
+}
+
+# Field used to de-duplicate rows when merging shards, per section key
+DEDUPE_KEYS = {
+    'slang_data': 'term',
+    'biryani_data': 'name',
+    'time_data': 'standard_time'
+}
+
+def _empty_product_data():
+    """Return the empty result shape used when parsing fails."""
+    return {key: [] for key in SECTION_KEYS.values()}
+
+def _header_key(header):
+    """Convert a table header to a dictionary key (lowercase, underscores)."""
+    return header.lower().replace(' ', '_')
+
+class RejectedRow:
+    """A table row that was dropped while parsing."""
+    
+    __slots__ = ('section', 'line_number', 'reason', 'text')
+    
+    def __init__(self, section, line_number, reason, text):
+        self.section = section
+        self.line_number = line_number
+        self.reason = reason
+        self.text = text
+    
+    def __repr__(self):
+        return f"RejectedRow({self.section!r}, line {self.line_number}: {self.reason})"
+
+class ParseReport:
+    """Collects rows rejected while parsing, with their line numbers."""
+    
+    def __init__(self):
+        self.rejected = []
+    
+    def reject(self, section, line_number, reason, text):
+        self.rejected.append(RejectedRow(section, line_number, reason, text))
+    
+    def for_section(self, section):
+        """Return the rejected rows of one section."""
+        return [row for row in self.rejected if row.section == section]
+    
+    def log_section(self, section):
+        """Log one summary line for the rejected rows of a section."""
+        rejected = self.for_section(section)
+        if rejected:
+            details = '; '.join(f"line {row.line_number}: {row.reason}" for row in rejected)
+            logger.warning(f"Rejected {len(rejected)} rows in '{section}' section ({details})")
+
+# Stands in for an escaped pipe while the row is split; a private-use character
+ESCAPED_PIPE = '\ue000'
+
+class RowTokenizer:
+    """
+    Single-pass, quote-aware splitter for markdown table rows.
+    
+    Rows are fed one at a time through the C ``csv`` state machine with
+    ``|`` as the delimiter, so no intermediate split lists are built:
+    
+    - a cell whose first non-space character is ``"`` is quoted, pipes
+      inside it are literal and doubled quotes (``""``) collapse to one quote
+    - ``\\|`` is a literal pipe; any other backslash is an ordinary character
+    - a quote anywhere else in a cell is an ordinary character
+    
+    Cells are returned without their leading spaces but otherwise unstripped.
+    Rows the csv machine rejects (an unterminated quote or a stray carriage
+    return) fall back to a plain split on ``|``, as do rows whose quotes
+    would give the wrong number of cells for their table, so a lone ``"``
+    cell is read as a literal quote.
+    """
+    
+    __slots__ = ('_pending', '_reader')
+    
+    def __init__(self):
+        # The reader pulls lines straight from the deque, without a Python-level iterator
+        self._pending = deque()
+        self._reader = csv.reader(iter(self._pending.popleft, None), delimiter='|', quotechar='"',
+                                  doublequote=True, skipinitialspace=True, strict=False)
+    
+    def split(self, line, width=None):
+        """
+        Split a table row into its cells.
+        
+        Args:
+            line (str): Stripped row starting and ending with ``|``
+            width (int): Number of columns the row should have, if known
+        
+        Returns:
+            list: Raw cells, followed by the empty text after the closing pipe
+        """
+        # Drop the leading pipe so the first cell can start with a quote
+        line = line[1:]
+        escaped = '\\|' in line
+        if escaped:
+            line = line.replace('\\|', ESCAPED_PIPE)
+        
+        self._pending.append(line)
+        try:
+            cells = next(self._reader)
+        except (csv.Error, IndexError):
+            # IndexError: the row ended inside a quoted cell and the reader asked for more
+            self._pending.clear()
+            cells = line.split('|')
+        if width is not None and len(cells) - 1 != width and '"' in line:
+            cells = line.split('|')
+        if escaped:
+            cells = [cell.replace(ESCAPED_PIPE, '|') for cell in cells]
+        return cells
+
+class _TableReader:
+    """
+    Parses the table of one section row by row.
+    
+    Declared tables use the converter compiled from their schema as soon as
+    the header is read. Undeclared tables buffer their first rows, infer a
+    converter from that sample and then stream the rest.
+    """
+    
+    def __init__(self, section, report):
+        self.section = section
+        self.report = report
+        self.tokenizer = RowTokenizer()
+        self.keys = None
+        self.converter = None
+        self.sample = []
+        self.table_lines = 0
+        self.rows = 0
+        self.done = False
+    
+    def set_header(self, line):
+        self.keys = [_header_key(cell.strip()) for cell in self.tokenizer.split(line)[:-1]]
+        schema = SCHEMAS.get(self.section)
+        if schema is None:
+            return
+        try:
+            self.converter = schema.compile(self.keys)
+        except SchemaError as e:
+            logger.warning(f"{str(e)}; inferring column types instead")
+    
+    def add(self, line_number, line):
+        """Consume a table line and return the rows that are ready."""
+        self.table_lines += 1
+        if self.table_lines == 1:
+            self.set_header(line)
+            return ()
+        if self.table_lines == 2:
+            # Separator row
+            return ()
+        
+        cells = self.tokenizer.split(line, len(self.keys))
+        if len(cells) - 1 != len(self.keys):
+            self.report.reject(self.section, line_number,
+                               f"{len(cells) - 1} cells, expected {len(self.keys)}", line)
+            return ()
+        
+        if self.converter is None:
+            self.sample.append((line_number, line, cells))
+            if len(self.sample) < INFERENCE_SAMPLE_SIZE:
+                return ()
+            return self.flush()
+        return self.convert(line_number, line, cells)
+    
+    def convert(self, line_number, line, cells):
+        try:
+            row = self.converter(cells)
+        except RowError as e:
+            self.report.reject(self.section, line_number, str(e), line)
+            return ()
+        self.rows += 1
+        return (row,)
+    
+    def flush(self):
+        """Convert any rows buffered for type inference."""
+        if not self.sample:
+            return ()
+        if self.converter is None:
+            self.converter = infer_converter(self.keys, [cells for _, _, cells in self.sample])
+        sample, self.sample = self.sample, []
+        return [row for buffered in sample for row in self.convert(*buffered)]
+    
+    def finish(self):
+        if self.table_lines < 2:
+            logger.warning(f"No valid table found in section '{self.section}'")
+        else:
+            logger.info(f"Successfully parsed {self.rows} rows from '{self.section}' section")
+        self.report.log_section(self.section)
+
+def iter_markdown_tables(stream, section_names, report=None, first_line=1):
+    """
+    Stream table rows out of markdown, reading each line exactly once.
+    
+    A section starts at a ``## <name>`` heading and ends at the next ``## ``
+    or ``# `` heading. The first table inside the section is parsed and
+    rows are yielded as soon as they are read, so the raw file is never
+    held in memory. Cells are typed by the section's declared schema (see
+    schemas.py); rows that do not fit are recorded in ``report`` with
+    their line numbers and skipped.
+    
+    Args:
+        stream (iterable): File-like object (or any iterable of lines)
+        section_names (list): Section headers to look for
+        report (ParseReport): Collects rejected rows, if given
+        first_line (int): Line number of the first line in ``stream``
+    
+    Yields:
+        tuple: (section_name, row_dict) for every parsed table row
+    """
+    if report is None:
+        report = ParseReport()
+    pending = list(section_names)
+    table = None
+    
+    for line_number, raw_line in enumerate(stream, start=first_line):
+        if raw_line.startswith('## ') or raw_line.startswith('# '):
+            if table is not None:
+                for row in table.flush():
+                    yield table.section, row
+                table.finish()
+            table = None
+            for name in pending:
+                if raw_line.startswith(f"## {name}"):
+                    table = _TableReader(name, report)
+                    pending.remove(name)
+                    break
+            continue
+        
+        if table is None or table.done:
+            continue
+        
+        line = raw_line.strip()
+        if line.startswith('|') and line.endswith('|'):
+            for row in table.add(line_number, line):
+                yield table.section, row
+        elif table.table_lines:
+            # A blank or non-table line ends the table
+            table.done = True
+    
+    if table is not None:
+        for row in table.flush():
+            yield table.section, row
+        table.finish()
+    for name in pending:
+        logger.warning(f"Section '{name}' not found")
+
+def parse_stream(stream, handlers, report=None):
+    """
+    Parse markdown from a file-like object in a single pass, sending each
+    row to the handler registered for its section.
+    
+    Args:
+        stream (iterable): File-like object (or any iterable of lines)
+        handlers (dict): Mapping of section name to a callable taking a row
+        report (ParseReport): Collects rejected rows, if given
+    
+    Returns:
+        dict: Number of rows parsed per section name
+    """
+    counts = {name: 0 for name in handlers}
+    for section_name, row in iter_markdown_tables(stream, handlers, report=report):
+        handlers[section_name](row)
+        counts[section_name] += 1
+    return counts
+
 def parse_markdown_table(content, section_name):
     """
     Parse a markdown table from content under a specific section.
@@ -18,125 +300,199 @@ def parse_markdown_table(content, section_name):
         list: List of dictionaries representing table rows
     """
     try:
-        # Find the section
-        section_pattern = rf"## {re.escape(section_name)}.*?\n\n(.*?)(?=\n## |\n# |$)"
-        section_match = re.search(section_pattern, content, re.DOTALL)
-        
-        if not section_match:
-            logger.warning(f"Section '{section_name}' not found")
-            return []
-        
-        section_content = section_match.group(1).strip()
-        
-        # Find table in the section
-        lines = section_content.split('\n')
-        table_lines = []
-        in_table = False
-        
-        for line in lines:
-            line = line.strip()
-            if line.startswith('|') and line.endswith('|'):
-                table_lines.append(line)
-                in_table = True
-            elif in_table and not line:
-                break
-            elif in_table and not line.startswith('|'):
-                break
-        
-        if len(table_lines) < 2:
-            logger.warning(f"No valid table found in section '{section_name}'")
-            return []
-        
-        # Parse header row
-        header_line = table_lines[0]
-        headers = [cell.strip() for cell in header_line.split('|')[1:-1]]
-        
-        # Skip separator line (second line with dashes)
-        data_lines = table_lines[2:]
-        
-        # Parse data rows
-        result = []
-        for line in data_lines:
-            if not line.strip():
-                continue
-                
-            cells = [cell.strip() for cell in line.split('|')[1:-1]]
-            
-            # Ensure we have the right number of cells
-            if len(cells) != len(headers):
-                logger.warning(f"Row has {len(cells)} cells but expected {len(headers)}: {line}")
-                continue
-            
-            # Create dictionary for this row
-            row_dict = {}
-            for i, header in enumerate(headers):
-                # Convert header to lowercase and replace spaces with underscores
-                key = header.lower().replace(' ', '_')
-                value = cells[i] if i < len(cells) else ""
-                
-                # Try to convert numeric values
-                if value.replace('.', '').replace('-', '').isdigit():
-                    try:
-                        if '.' in value:
-                            row_dict[key] = float(value)
-                        else:
-                            row_dict[key] = int(value)
-                    except ValueError:
-                        row_dict[key] = value
-                else:
-                    row_dict[key] = value
-            
-            result.append(row_dict)
-        
-        logger.info(f"Successfully parsed {len(result)} rows from '{section_name}' section")
-        return result
+        return [row for _, row in iter_markdown_tables(io.StringIO(content), [section_name])]
         
     except Exception as e:
         logger.error(f"Error parsing section '{section_name}': {str(e)}")
         return []
 
-def parse_product_data(file_path='product.md'):
+def _section_handler(rows, section_key, compact):
+    """Return a row handler appending to ``rows``, optionally as compact records."""
+    if not compact:
+        return rows.append
+    return lambda row: rows.append(compact_row(section_key, row))
+
+def parse_product_stream(stream, compact=False, report=None):
+    """
+    Parse all sections from a file-like object containing product.md data.
+    
+    Args:
+        stream (iterable): File-like object (or any iterable of lines)
+        compact (bool): Store rows as compact records instead of dictionaries
+        report (ParseReport): Collects rejected rows, if given
+    
+    Returns:
+        dict: Dictionary containing parsed data for all sections
+    """
+    data = _empty_product_data()
+    handlers = {name: _section_handler(data[key], key, compact) for name, key in SECTION_KEYS.items()}
+    parse_stream(stream, handlers, report=report)
+    return data
+
+def parse_product_data(file_path='product.md', compact=False, report=None):
     """
     Parse all sections from the product.md file.
     
     Args:
-        file_path (str): Path to the product.md file
+        file_path (str): Path to the product.md file, or a directory or glob
+            of shards (see parse_sources)
+        compact (bool): Store rows as compact records instead of dictionaries
+        report (ParseReport): Collects rejected rows, if given (single files only)
     
     Returns:
         dict: Dictionary containing parsed data for all sections
     """
+    if is_multi_source(file_path):
+        return parse_sources(file_path, compact=compact)
+    
     if not os.path.exists(file_path):
         logger.error(f"File {file_path} not found")
-        return {
-            'slang_data': [],
-            'biryani_data': [],
-            'time_data': []
-        }
+        return _empty_product_data()
     
     try:
         with open(file_path, 'r', encoding='utf-8') as file:
-            content = file.read()
+            data = parse_product_stream(file, compact=compact, report=report)
         
-        # Parse each section
-        slang_data = parse_markdown_table(content, "Lingo Section")
-        biryani_data = parse_markdown_table(content, "Biryani Spots")
-        time_data = parse_markdown_table(content, "Time Tables")
+        slang_data = data['slang_data']
+        biryani_data = data['biryani_data']
+        time_data = data['time_data']
         
         logger.info(f"Parsed data: {len(slang_data)} slang terms, {len(biryani_data)} biryani spots, {len(time_data)} time mappings")
         
-        return {
-            'slang_data': slang_data,
-            'biryani_data': biryani_data,
-            'time_data': time_data
-        }
+        return data
         
     except Exception as e:
         logger.error(f"Error reading file {file_path}: {str(e)}")
-        return {
-            'slang_data': [],
-            'biryani_data': [],
-            'time_data': []
-        }
+        return _empty_product_data()
+
+def is_multi_source(source):
+    """Return True if ``source`` names a directory or glob of shards rather than one file."""
+    if os.path.isfile(source):
+        return False
+    return os.path.isdir(source) or glob.has_magic(source)
+
+def resolve_sources(source):
+    """
+    Expand a data source to the list of markdown files it covers.
+    
+    Args:
+        source (str): A file, a directory (all ``*.md`` files in it) or a glob
+    
+    Returns:
+        list: Sorted file paths
+    """
+    if os.path.isdir(source):
+        return sorted(glob.glob(os.path.join(source, '*.md')))
+    if glob.has_magic(source):
+        return sorted(path for path in glob.glob(source) if os.path.isfile(path))
+    return [source]
+
+def _parse_shard(path, compact):
+    """Parse one shard and time it; runs in a worker process."""
+    started = time.perf_counter()
+    report = ParseReport()
+    data = parse_product_data(path, compact=compact, report=report)
+    timing = {
+        'path': path,
+        'seconds': round(time.perf_counter() - started, 6),
+        'rows': {key: len(rows) for key, rows in data.items()},
+        'rejected': len(report.rejected)
+    }
+    return data, timing
+
+def parse_shards(paths, compact=False, max_workers=None):
+    """
+    Parse several shard files, in parallel across processes when there is
+    more than one.
+    
+    Args:
+        paths (list): Shard file paths
+        compact (bool): Store rows as compact records instead of dictionaries
+        max_workers (int): Process pool size (defaults to the number of CPUs);
+            1 parses in the current process
+    
+    Returns:
+        list: (data, timing) tuples in the same order as ``paths``
+    """
+    if len(paths) <= 1 or max_workers == 1:
+        results = [_parse_shard(path, compact) for path in paths]
+    else:
+        workers = min(len(paths), max_workers or os.cpu_count() or 1)
+        # Shards are also parsed from the reload watcher thread of a multi-threaded
+        # server; forked children could inherit locks held by other threads
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+            results = list(pool.map(_parse_shard, paths, [compact] * len(paths)))
+    
+    for _, timing in results:
+        logger.info(f"Parsed shard {timing['path']} in {timing['seconds']:.3f}s "
+                    f"({sum(timing['rows'].values())} rows, {timing['rejected']} rejected)")
+    return results
+
+def _dedupe_value(value):
+    return value.strip().lower() if isinstance(value, str) else value
+
+def merge_sections(shards, dedupe_keys=DEDUPE_KEYS):
+    """
+    Merge the sections of several shards in order.
+    
+    Rows whose de-duplication field matches (case-insensitively) a row of an
+    earlier shard replace that row in place, so later shards override
+    earlier ones. Sections without a key in ``dedupe_keys`` are concatenated.
+    
+    Args:
+        shards (list): Parsed data dictionaries, in merge order
+        dedupe_keys (dict): Section key -> field to de-duplicate by
+    
+    Returns:
+        dict: Merged data for all sections
+    """
+    merged = _empty_product_data()
+    for key, rows in merged.items():
+        field = (dedupe_keys or {}).get(key)
+        positions = {}
+        for shard in shards:
+            for row in shard.get(key, ()):
+                if field is None:
+                    rows.append(row)
+                    continue
+                identity = _dedupe_value(row.get(field))
+                if identity is None or identity == '':
+                    rows.append(row)
+                elif identity in positions:
+                    rows[positions[identity]] = row
+                else:
+                    positions[identity] = len(rows)
+                    rows.append(row)
+    return merged
+
+def parse_sources(source, compact=False, max_workers=None, dedupe_keys=DEDUPE_KEYS, timings=None):
+    """
+    Parse product data spread over a directory or glob of markdown shards.
+    
+    Args:
+        source (str): A file, a directory (all ``*.md`` files in it) or a glob
+        compact (bool): Store rows as compact records instead of dictionaries
+        max_workers (int): Process pool size (defaults to the number of CPUs)
+        dedupe_keys (dict): Section key -> field to de-duplicate by when merging
+        timings (list): Receives one timing dictionary per shard, if given
+    
+    Returns:
+        dict: Dictionary containing merged data for all sections
+    """
+    paths = resolve_sources(source)
+    if not paths:
+        logger.error(f"No data files match {source}")
+        return _empty_product_data()
+    
+    try:
+        results = parse_shards(paths, compact=compact, max_workers=max_workers)
+    except Exception as e:
+        logger.error(f"Error parsing shards of {source}: {str(e)}")
+        return _empty_product_data()
+    
+    if timings is not None:
+        timings.extend(timing for _, timing in results)
+    return merge_sections([data for data, _ in results], dedupe_keys)
 
 if __name__ == "__main__":
     # Test the parser
@@ -0,0 +1,168 @@
+import os
+import json
+import time
+import random
+import logging
+import threading
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+# Size at which the query log is rotated, and how much of each log file top_queries reads
+DEFAULT_MAX_BYTES = 8 * 1024 * 1024
+
+class QueryLog:
+    """
+    Sampled, buffered log of API queries in a local JSON-lines file.
+    
+    Recording a query only appends to an in-memory buffer; a background
+    thread writes the buffer out every ``flush_interval`` seconds, so request
+    threads never wait on the disk. When the buffer is full new queries are
+    dropped rather than blocking.
+    
+    Once the file reaches ``max_bytes`` it is renamed to ``<path>.1``,
+    replacing the previous one, and a new file is started, so the log never
+    holds much more than twice ``max_bytes``. A ``max_bytes`` of 0 never rotates.
+    """
+    
+    def __init__(self, path, sample_rate=1.0, flush_interval=1.0, max_buffer=10000,
+                 max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.sample_rate = sample_rate
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.recorded = self.dropped = 0
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._writer = None
+    
+    def record(self, endpoint, params):
+        """
+        Log one query, subject to sampling.
+        
+        Args:
+            endpoint (str): Endpoint name, e.g. 'slang' or 'biryani'
+            params (dict): Query parameters needed to replay the query
+        """
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            return
+        line = json.dumps({'ts': round(time.time(), 3), 'endpoint': endpoint, 'params': params},
+                          ensure_ascii=False, sort_keys=True)
+        
+        with self._lock:
+            if len(self._buffer) >= self.max_buffer:
+                self.dropped += 1
+                return
+            self._buffer.append(line)
+            self.recorded += 1
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, name='query-log', daemon=True)
+                self._writer.start()
+    
+    def flush(self):
+        """Write buffered queries to the log file."""
+        with self._lock:
+            lines, self._buffer = self._buffer, []
+        if not lines:
+            return
+        try:
+            with open(self.path, 'a', encoding='utf-8') as file:
+                file.write('\n'.join(lines) + '\n')
+                size = file.tell()
+            if self.max_bytes and size >= self.max_bytes:
+                os.replace(self.path, self.path + '.1')
+        except OSError as e:
+            logger.error(f"Error writing query log {self.path}: {str(e)}")
+    
+    def _write_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+        self.flush()
+    
+    def close(self):
+        """Stop the writer thread after writing everything buffered."""
+        self._stop.set()
+        writer = self._writer
+        if writer is not None:
+            writer.join()
+        self.flush()
+
+def read_tail(path, max_bytes):
+    """
+    Read the complete lines in the last max_bytes of a file.
+    
+    Args:
+        path (str): File to read
+        max_bytes (int): Maximum number of bytes to read; 0 reads the whole file
+    
+    Returns:
+        list: Lines, oldest first
+    """
+    with open(path, 'rb') as file:
+        size = file.seek(0, os.SEEK_END)
+        start = max(0, size - max_bytes) if max_bytes else 0
+        file.seek(start)
+        data = file.read()
+    if start:
+        # The first line was cut by the seek
+        data = data[data.find(b'\n') + 1:] if b'\n' in data else b''
+    return data.decode('utf-8', errors='replace').splitlines()
+
+def top_queries(path, limit=100, max_bytes=DEFAULT_MAX_BYTES):
+    """
+    Read the most frequent queries from a query log and its rotated predecessor.
+    
+    Only the last ``max_bytes`` of each file are read, so startup time does not
+    grow with the log. Unreadable lines are skipped.
+    
+    Args:
+        path (str): Query log file
+        limit (int): Maximum number of queries to return
+        max_bytes (int): Bytes read from the end of each file; 0 reads them whole
+    
+    Returns:
+        list: (endpoint, params) pairs, most frequent first
+    """
+    counts = Counter()
+    for log_path in (path + '.1', path):
+        if log_path != path and not os.path.exists(log_path):
+            continue
+        try:
+            lines = read_tail(log_path, max_bytes)
+        except OSError as e:
+            logger.warning(f"Could not read query log {log_path}: {str(e)}")
+            continue
+        for line in lines:
+            try:
+                record = json.loads(line)
+                counts[(record['endpoint'], json.dumps(record['params'], sort_keys=True))] += 1
+            except (ValueError, KeyError, TypeError):
+                continue
+    return [(endpoint, json.loads(params)) for (endpoint, params), _ in counts.most_common(limit)]
+
+def warm_up(queries, replay):
+    """
+    Replay logged queries, e.g. to fill result caches for a new data version.
+    
+    A query that fails is logged and skipped.
+    
+    Args:
+        queries (list): (endpoint, params) pairs from top_queries
+        replay (callable): Runs one query given its endpoint and params
+    
+    Returns:
+        int: Number of queries replayed successfully
+    """
+    started = time.perf_counter()
+    replayed = 0
+    for endpoint, params in queries:
+        try:
+            replay(endpoint, params)
+            replayed += 1
+        except Exception as e:
+            logger.warning(f"Could not replay {endpoint} query {params}: {str(e)}")
+    logger.info(f"Warmed up {replayed} of {len(queries)} logged queries "
+                f"in {time.perf_counter() - started:.3f}s")
+    return replayed
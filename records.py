@@ -0,0 +1,109 @@
+import sys
+from collections.abc import Mapping
+
+class Record(Mapping):
+    """
+    Compact, read-only table row.
+    
+    Rows are stored in ``__slots__`` instead of a per-row dict, and
+    categorical columns are interned so repeated values share one string.
+    Records implement the read-only mapping interface (``get``, ``[]``,
+    ``in``, ``keys``), so code written against row dictionaries works on
+    them unchanged; ``to_dict`` is only needed when serializing.
+    """
+    
+    __slots__ = ()
+    
+    # Column names, in table order
+    FIELDS = ()
+    # Low-cardinality columns whose values are interned
+    INTERNED = ()
+    
+    def __init__(self, *values):
+        for field, value in zip(self.FIELDS, values):
+            if field in self.INTERNED and isinstance(value, str):
+                value = sys.intern(value)
+            object.__setattr__(self, field, value)
+    
+    @classmethod
+    def from_dict(cls, row):
+        """Build a record from a parsed row dictionary."""
+        return cls(*(row[field] for field in cls.FIELDS))
+    
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is read-only")
+    
+    def __getitem__(self, key):
+        if key in self.FIELDS:
+            return getattr(self, key)
+        raise KeyError(key)
+    
+    def get(self, key, default=None):
+        if key in self.FIELDS:
+            return getattr(self, key)
+        return default
+    
+    def __contains__(self, key):
+        return key in self.FIELDS
+    
+    def __iter__(self):
+        return iter(self.FIELDS)
+    
+    def __len__(self):
+        return len(self.FIELDS)
+    
+    def __reduce__(self):
+        return (type(self), tuple(getattr(self, field) for field in self.FIELDS))
+    
+    def to_dict(self):
+        """Convert to a plain dictionary for serialization."""
+        return {field: getattr(self, field) for field in self.FIELDS}
+    
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+class SlangRecord(Record):
+    """Row of the Lingo Section table."""
+    
+    __slots__ = ('term', 'translation', 'category', 'usage')
+    FIELDS = __slots__
+    INTERNED = frozenset({'category'})
+
+class BiryaniRecord(Record):
+    """Row of the Biryani Spots table."""
+    
+    __slots__ = ('name', 'area', 'vibe', 'description', 'rating')
+    FIELDS = __slots__
+    INTERNED = frozenset({'area', 'vibe'})
+
+class TimeRecord(Record):
+    """Row of the Time Tables table."""
+    
+    __slots__ = ('standard_time', 'hyderabadi_time', 'context')
+    FIELDS = __slots__
+    INTERNED = frozenset()
+
+# Record type used for each section key
+RECORD_TYPES = {
+    'slang_data': SlangRecord,
+    'biryani_data': BiryaniRecord,
+    'time_data': TimeRecord
+}
+
+def compact_row(section_key, row):
+    """
+    Convert a parsed row to its compact record type.
+    
+    Args:
+        section_key (str): Section key such as 'slang_data'
+        row (dict): Parsed row dictionary
+    
+    Returns:
+        Record or dict: The compact record, or the original dict if the
+        section is unknown or its columns differ from the record layout
+    """
+    record_type = RECORD_TYPES.get(section_key)
+    if record_type is None or len(row) != len(record_type.FIELDS) or any(
+            field not in row for field in record_type.FIELDS):
+        return row
+    return record_type.from_dict(row)
@@ -0,0 +1,123 @@
+import re
+import math
+import heapq
+import logging
+import unicodedata
+from collections import Counter, defaultdict
+
+logger = logging.getLogger(__name__)
+
+# English words too common to say anything about a translation
+STOP_WORDS = frozenset("""
+    a an and are as at be but by for from in is it its me my of on or so that the this to
+    up was what whats with you your
+""".split())
+
+# Suffixes stripped by stem(), longest first: (suffix, replacement, minimum stem length)
+SUFFIXES = (
+    ('sses', 'ss', 2), ('ness', '', 3), ('ies', 'y', 2), ('ied', 'y', 2),
+    ('ing', '', 3), ('ed', '', 3), ('ly', '', 3), ('s', '', 3),
+)
+
+TOKEN = re.compile(r'[a-z0-9]+')
+
+def stem(word):
+    """
+    Reduce an English word to a crude stem so inflections share a posting.
+    
+    Args:
+        word (str): Lowercased word
+    
+    Returns:
+        str: Stem, e.g. 'worry' for 'worried' and 'slow' for 'slowly'
+    """
+    for suffix, replacement, minimum in SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= minimum:
+            if suffix == 's' and word.endswith('ss'):
+                break
+            word = word[:-len(suffix)] + replacement
+            # 'stopped' -> 'stop', but 'messed' keeps its 'ss'
+            if suffix in ('ing', 'ed') and len(word) > 2 and word[-1] == word[-2] and word[-1] not in 'lsz':
+                word = word[:-1]
+            break
+    if len(word) > 3 and word.endswith('e'):
+        word = word[:-1]
+    return word
+
+def tokenize(text):
+    """
+    Split English text into stemmed tokens, dropping stop words.
+    
+    Text is split on '/', whitespace and punctuation; apostrophes are
+    removed first so "don't" is one word.
+    
+    Args:
+        text (str): English text such as a slang translation
+    
+    Returns:
+        list: Stemmed tokens in text order
+    """
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(char for char in text if not unicodedata.combining(char)).lower()
+    text = text.replace("'", '').replace('’', '')
+    return [stem(word) for word in TOKEN.findall(text) if word not in STOP_WORDS]
+
+class ReverseIndex:
+    """
+    Inverted index from English translation tokens to slang entries.
+    
+    Built once per data version. Every token maps to a postings list of
+    (position, term frequency); a lookup only walks the postings of the
+    query's tokens and ranks the entries found by TF-IDF.
+    """
+    
+    __slots__ = ('entries', 'postings', 'idf')
+    
+    def __init__(self, slang_data):
+        self.entries = tuple(slang_data)
+        postings = defaultdict(list)
+        for position, entry in enumerate(self.entries):
+            tokens = tokenize(entry.get('translation', ''))
+            for token, count in Counter(tokens).items():
+                postings[token].append((position, count / len(tokens)))
+        
+        self.postings = {token: tuple(items) for token, items in postings.items()}
+        # Smoothed inverse document frequency; rarer tokens weigh more
+        total = len(self.entries)
+        self.idf = {token: math.log((1 + total) / (1 + len(items))) + 1 for token, items in self.postings.items()}
+    
+    def __eq__(self, other):
+        return isinstance(other, ReverseIndex) and (self.entries, self.postings) == (other.entries, other.postings)
+    
+    def __len__(self):
+        return len(self.entries)
+    
+    def search(self, query, limit=10):
+        """
+        Find slang entries whose translation matches English words.
+        
+        Args:
+            query (str): English words, e.g. 'cool friend'
+            limit (int): Maximum number of results to return
+        
+        Returns:
+            list: Matching entries with their TF-IDF score and the query tokens
+                they matched, best first
+        """
+        scores = defaultdict(float)
+        matched = defaultdict(list)
+        for token in dict.fromkeys(tokenize(query)):
+            idf = self.idf.get(token)
+            if idf is None:
+                continue
+            for position, frequency in self.postings[token]:
+                scores[position] += frequency * idf
+                matched[position].append(token)
+        
+        best = heapq.nsmallest(max(limit, 0), scores, key=lambda position: (-scores[position], position))
+        logger.info(f"Reverse lookup for '{query}' matched {len(scores)} entries")
+        return [{
+            'entry': self.entries[position],
+            'score': round(scores[position], 4),
+            'matched': matched[position]
+        } for position in best]
@@ -0,0 +1,169 @@
+import re
+
+# Number of data rows sampled to infer column types for undeclared tables
+INFERENCE_SAMPLE_SIZE = 16
+
+INT_PATTERN = re.compile(r'[-+]?\d+', re.ASCII)
+FLOAT_PATTERN = re.compile(r'[-+]?(?:\d+(?:\.\d*)?|\.\d+)', re.ASCII)
+
+class RowError(ValueError):
+    """Raised when a table row does not satisfy its table schema."""
+
+class SchemaError(ValueError):
+    """Raised when a table's header does not satisfy its declared schema."""
+
+def parse_int(value):
+    """Strictly parse an integer cell (ASCII digits with an optional sign)."""
+    if not INT_PATTERN.fullmatch(value):
+        raise ValueError(f"not an integer: {value!r}")
+    return int(value)
+
+def parse_float(value):
+    """Strictly parse a decimal cell (no exponents, NaN or infinity)."""
+    if not FLOAT_PATTERN.fullmatch(value):
+        raise ValueError(f"not a number: {value!r}")
+    return float(value)
+
+class Column:
+    """Declared column of a table schema."""
+    
+    __slots__ = ('name', 'key', 'parse', 'required', 'normalize', 'default')
+    
+    def __init__(self, name, parse=str, required=True, normalize=None, default=None):
+        self.name = name
+        self.key = name.lower().replace(' ', '_')
+        self.parse = parse
+        self.required = required
+        self.normalize = normalize
+        self.default = '' if parse is str and default is None else default
+    
+    def compile(self):
+        """Build the single-cell converter for this column."""
+        key = self.key
+        parse = self.parse
+        required = self.required
+        normalize = self.normalize
+        default = self.default
+        
+        def convert(value):
+            value = value.strip()
+            if normalize is not None:
+                value = normalize(value)
+            if not value:
+                if required:
+                    raise RowError(f"missing required value for '{key}'")
+                return default
+            if parse is str:
+                return value
+            try:
+                return parse(value)
+            except ValueError:
+                raise RowError(f"invalid value {value!r} for '{key}'")
+        
+        return convert
+
+class TableSchema:
+    """Declared layout of a known markdown table."""
+    
+    def __init__(self, section_name, columns):
+        self.section_name = section_name
+        self.columns = {column.key: column for column in columns}
+    
+    def compile(self, keys):
+        """
+        Build a row converter for a table with the given header keys.
+        
+        Args:
+            keys (list): Header keys in table order
+        
+        Returns:
+            TableConverter: Converter for data rows
+        
+        Raises:
+            SchemaError: If a required column is missing from the header
+        """
+        missing = [key for key, column in self.columns.items() if column.required and key not in keys]
+        if missing:
+            raise SchemaError(f"table '{self.section_name}' is missing columns: {', '.join(missing)}")
+        
+        converters = []
+        for key in keys:
+            column = self.columns.get(key)
+            converters.append(column.compile() if column else _text)
+        return TableConverter(keys, converters)
+
+class TableConverter:
+    """
+    Converts the cells of a data row to a typed row dictionary.
+    
+    Cells are passed unstripped, straight from the tokenizer; extra trailing
+    cells beyond the header are ignored.
+    """
+    
+    __slots__ = ('keys', 'converters')
+    
+    def __init__(self, keys, converters):
+        self.keys = keys
+        self.converters = converters
+    
+    def __call__(self, cells):
+        return {key: convert(cell) for key, convert, cell in zip(self.keys, self.converters, cells)}
+
+_text = str.strip
+
+def _lenient(parse):
+    """Converter for inferred columns: values that do not fit stay as text."""
+    def convert(value):
+        value = value.strip()
+        try:
+            return parse(value)
+        except ValueError:
+            return value
+    return convert
+
+def infer_converter(keys, sample):
+    """
+    Infer column types for an undeclared table from a sample of its rows.
+    
+    A column is numeric only if every non-empty sampled value is; inferred
+    columns keep non-matching values later in the table as text.
+    
+    Args:
+        keys (list): Header keys in table order
+        sample (list): Unstripped cell lists of the first data rows
+    
+    Returns:
+        TableConverter: Converter for data rows
+    """
+    converters = []
+    for index in range(len(keys)):
+        values = [value for value in (cells[index].strip() for cells in sample) if value]
+        if values and all(INT_PATTERN.fullmatch(value) for value in values):
+            converters.append(_lenient(parse_int))
+        elif values and all(FLOAT_PATTERN.fullmatch(value) for value in values):
+            converters.append(_lenient(parse_float))
+        else:
+            converters.append(_text)
+    return TableConverter(keys, converters)
+
+# Schemas of the tables in product.md, keyed by section name
+SCHEMAS = {
+    'Lingo Section': TableSchema('Lingo Section', [
+        Column('Term'),
+        Column('Translation'),
+        Column('Category', required=False),
+        Column('Usage', required=False)
+    ]),
+    'Biryani Spots': TableSchema('Biryani Spots', [
+        Column('Name'),
+        Column('Area'),
+        Column('Vibe'),
+        Column('Description', required=False),
+        Column('Rating', parse=parse_float, required=False)
+    ]),
+    'Time Tables': TableSchema('Time Tables', [
+        Column('Standard Time'),
+        Column('Hyderabadi Time'),
+        Column('Context', required=False)
+    ])
+}
@@ -0,0 +1,239 @@
+import os
+import logging
+
+try:
+    from rapidfuzz import process as rapidfuzz_process
+    from rapidfuzz import fuzz as rapidfuzz_fuzz
+    from rapidfuzz.distance import Indel, Levenshtein
+except ImportError:
+    rapidfuzz_process = None
+
+logger = logging.getLogger(__name__)
+
+def lcs_length(a, b):
+    """
+    Length of the longest common subsequence of two strings.
+    
+    Uses the bit-parallel algorithm (Hyyrö), one big-int step per character of ``b``.
+    
+    Args:
+        a (str): First string
+        b (str): Second string
+    
+    Returns:
+        int: LCS length
+    """
+    if not a or not b:
+        return 0
+    masks = {}
+    for i, char in enumerate(a):
+        masks[char] = masks.get(char, 0) | (1 << i)
+    
+    full = (1 << len(a)) - 1
+    v = full
+    for char in b:
+        u = v & masks.get(char, 0)
+        v = ((v + u) | (v - u)) & full
+    return len(a) - bin(v).count('1')
+
+def levenshtein(a, b):
+    """
+    Edit distance (insertions, deletions, substitutions) between two strings.
+    
+    Uses the bit-parallel algorithm (Myers/Hyyrö), one big-int step per character of ``b``.
+    
+    Args:
+        a (str): First string
+        b (str): Second string
+    
+    Returns:
+        int: Number of single-character edits turning ``a`` into ``b``
+    """
+    if not a or not b:
+        return len(a) + len(b)
+    masks = {}
+    for i, char in enumerate(a):
+        masks[char] = masks.get(char, 0) | (1 << i)
+    
+    full = (1 << len(a)) - 1
+    last = 1 << (len(a) - 1)
+    positive, negative = full, 0
+    distance = len(a)
+    for char in b:
+        match = masks.get(char, 0)
+        diagonal = ((((match & positive) + positive) ^ positive) | match | negative) & full
+        up = (negative | ~(diagonal | positive)) & full
+        down = positive & diagonal
+        if up & last:
+            distance += 1
+        elif down & last:
+            distance -= 1
+        up = ((up << 1) | 1) & full
+        down = (down << 1) & full
+        positive = (down | ~(diagonal | up)) & full
+        negative = up & diagonal
+    return distance
+
+def similarity(matches, total_length):
+    """Turn an LCS length into a 0-100 score (2 * LCS / total length), rounding halves up exactly."""
+    if not total_length:
+        return 0
+    return (400 * matches + total_length) // (2 * total_length)
+
+def ratio(query, choice):
+    """
+    Indel similarity of two strings: 2 * LCS / total length, as 0-100.
+    
+    Args:
+        query (str): Query string
+        choice (str): String to compare against
+    
+    Returns:
+        int: Similarity score (0-100); 0 if either string is empty
+    """
+    if not query or not choice:
+        return 0
+    return similarity(lcs_length(query, choice), len(query) + len(choice))
+
+def _best_window(needle, haystack):
+    """Best ratio of ``needle`` against every alignment of it in ``haystack``."""
+    length = len(needle)
+    chars = set(needle)
+    best = 0
+    # Windows of the needle's length, plus the shorter windows at both edges;
+    # a window whose edge character is not in the needle cannot beat its neighbour
+    for end in range(1, len(haystack) + length):
+        start = max(0, end - length)
+        window_end = min(end, len(haystack))
+        if start >= window_end:
+            continue
+        if end <= len(haystack):
+            if haystack[end - 1] not in chars:
+                continue
+        elif haystack[start] not in chars:
+            continue
+        score = similarity(lcs_length(needle, haystack[start:window_end]), length + window_end - start)
+        if score > best:
+            best = score
+            if best == 100:
+                break
+    return best
+
+def partial_ratio(query, choice):
+    """
+    Best ratio of the shorter string against any same-length window of the longer one.
+    
+    Windows overhanging either end of the longer string are included.
+    
+    Args:
+        query (str): Query string
+        choice (str): String to compare against
+    
+    Returns:
+        int: Similarity score (0-100); 0 if either string is empty
+    """
+    if not query or not choice:
+        return 0
+    if len(query) > len(choice):
+        query, choice = choice, query
+    best = _best_window(query, choice)
+    if best != 100 and len(query) == len(choice):
+        best = max(best, _best_window(choice, query))
+    return best
+
+class ReferenceScorer:
+    """
+    Pure-Python scorer; slow but always available and the definition of the scores.
+    
+    Column scorers take a ``score_cutoff``: a scorer may report any score
+    below it as 0, while scores reaching it are always exact. This one
+    always reports exact scores.
+    """
+    
+    name = 'reference'
+    
+    def ratio(self, query, choices, score_cutoff=0):
+        """Score one query against a column of strings with ``ratio``."""
+        return [ratio(query, choice) for choice in choices]
+    
+    def partial_ratio(self, query, choices, score_cutoff=0):
+        """Score one query against a column of strings with ``partial_ratio``."""
+        return [partial_ratio(query, choice) for choice in choices]
+    
+    def distance(self, a, b):
+        """Levenshtein distance between two strings."""
+        return levenshtein(a, b)
+
+class RapidFuzzScorer:
+    """
+    Scorer scoring whole columns in one rapidfuzz call; same scores as ReferenceScorer.
+    
+    Choices that cannot reach ``score_cutoff`` are skipped inside rapidfuzz
+    and reported as 0.
+    """
+    
+    name = 'rapidfuzz'
+    
+    @staticmethod
+    def _score_column(query, choices, scorer, score_cutoff):
+        scores = [0] * len(choices)
+        if query:
+            for _, score, index in rapidfuzz_process.extract(query, choices, scorer=scorer, limit=None,
+                                                             score_cutoff=score_cutoff):
+                scores[index] = score
+        return scores
+    
+    def ratio(self, query, choices, score_cutoff=0):
+        """Score one query against a column of strings with ``ratio``."""
+        # Indel similarity is 1 - distance / total length; half a point of slack covers the rounding
+        similarities = self._score_column(query, choices, Indel.normalized_similarity,
+                                          max(0.0, (score_cutoff - 0.5) / 100 - 1e-9))
+        scores = []
+        for choice, normalized in zip(choices, similarities):
+            total = len(query) + len(choice)
+            if query and choice and normalized:
+                scores.append(similarity((total - round((1 - normalized) * total)) // 2, total))
+            else:
+                scores.append(0)
+        return scores
+    
+    def partial_ratio(self, query, choices, score_cutoff=0):
+        """Score one query against a column of strings with ``partial_ratio``."""
+        scores = self._score_column(query, choices, rapidfuzz_fuzz.partial_ratio,
+                                    max(0.0, score_cutoff - 0.5 - 1e-7))
+        # rapidfuzz reports exact halves with float error; round them up like the reference
+        return [int(score + 0.5 + 1e-7) if choice else 0 for choice, score in zip(choices, scores)]
+    
+    def distance(self, a, b):
+        """Levenshtein distance between two strings."""
+        return Levenshtein.distance(a, b)
+
+SCORERS = {'reference': ReferenceScorer}
+if rapidfuzz_process is not None:
+    SCORERS['rapidfuzz'] = RapidFuzzScorer
+
+_default_scorer = None
+
+def get_scorer(name=None):
+    """
+    Return a scorer backend.
+    
+    Args:
+        name (str): 'reference', 'rapidfuzz' or None to pick the fastest
+            available (overridable with the SEARCH_SCORER environment variable)
+    
+    Returns:
+        ReferenceScorer or RapidFuzzScorer: Scorer instance
+    """
+    global _default_scorer
+    if name is None:
+        if _default_scorer is None:
+            name = os.environ.get('SEARCH_SCORER') or ('rapidfuzz' if 'rapidfuzz' in SCORERS else 'reference')
+            _default_scorer = get_scorer(name)
+            logger.info(f"Using the {_default_scorer.name} fuzzy scorer")
+        return _default_scorer
+    
+    if name not in SCORERS:
+        logger.warning(f"Scorer '{name}' is not available; using the reference scorer")
+        name = 'reference'
+    return SCORERS[name]()
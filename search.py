@@ -1,17 +1,638 @@
-from fuzzywuzzy import fuzz, process
+from array import array
+from collections import Counter, defaultdict
+import re
+import heapq
+import unicodedata
 import logging
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from scoring import get_scorer, similarity
+
 logger = logging.getLogger(__name__)
 
-def search_slang(query, slang_data, threshold=60, limit=10):
+# Slang fields searched; only 'term' is scored with ratio, the others with partial_ratio
+INDEXED_FIELDS = ('term', 'translation', 'category', 'usage')
+
+# Queries shorter than this have no trigrams and are scored against every entry
+MIN_INDEXED_QUERY_LENGTH = 3
+
+# Trigram candidates scored per requested result, and at least this many in all
+CANDIDATES_PER_RESULT = 20
+MIN_CANDIDATES = 200
+
+# Candidates are scored in batches of this size, one scorer call per field each
+SCORE_BATCH_SIZE = 4096
+
+# Score of a term spelt with the query's phonetic key; a likely match, but not an exact one
+PHONETIC_SCORE = 90
+
+# Default maximum edit distance between a query and a "did you mean" suggestion
+DEFAULT_SUGGESTION_DISTANCE = 3
+
+# Spelling variants of romanized Hindi/Urdu folded together, so that e.g.
+# 'zabardast'/'jabardast' and 'nakko'/'nako' compare equal
+TRANSLITERATION_FOLDS = (('ee', 'i'), ('oo', 'u'), ('ph', 'f'), ('w', 'v'), ('z', 'j'), ('q', 'k'))
+REPEATED_LETTERS = re.compile(r'([^\W\d_])\1+')
+WHITESPACE = re.compile(r'\s+')
+
+# Punctuation is a word break in lookup keys, so 'Kaiku?' and 'kaiku' share a key
+PUNCTUATION = re.compile(r'[^\w\s]|_')
+
+# Rewrites applied after normalize_key() to get a phonetic key for romanized
+# Dakhni/Urdu: aspirated consonants lose their 'h' (khali/kali),
+# a word-final 'h' after a vowel is dropped (yeh/ye), 'ai'/'ay'/'ei'/'ey' merge
+# (kaiku/kayku), 'au' becomes 'o' and a hard 'c' is spelt 'k'
+PHONETIC_RULES = (
+    (re.compile(r'([bdgjkptv])h'), r'\1'),
+    (re.compile(r'(?<=[aeiou])h\b'), ''),
+    (re.compile(r'[ae][iy](?![aeiou])'), 'e'),
+    (re.compile(r'au'), 'o'),
+    (re.compile(r'ck|c(?!h)'), 'k'),
+)
+
+def fold(text):
+    """
+    Normalize text for matching: strip accents, lowercase, fold transliteration variants.
+    
+    Args:
+        text (str): Text to normalize
+    
+    Returns:
+        str: Folded text
+    """
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(char for char in text if not unicodedata.combining(char)).lower()
+    for variant, folded in TRANSLITERATION_FOLDS:
+        text = text.replace(variant, folded)
+    text = REPEATED_LETTERS.sub(r'\1', text)
+    return WHITESPACE.sub(' ', text).strip()
+
+def normalize_key(text):
+    """
+    Fold text and drop punctuation, for exact lookups of terms and translation words.
+    
+    Args:
+        text (str): Text to normalize, e.g. 'Kaiku?'
+    
+    Returns:
+        str: Lookup key ('kaiku')
+    """
+    return WHITESPACE.sub(' ', PUNCTUATION.sub(' ', fold(text))).strip()
+
+def phonetic_key(text):
+    """
+    Encode text so that common romanized spellings of one word share a key.
+    
+    Args:
+        text (str): Text to encode, e.g. 'Nakko', 'naako' or 'nako'
+    
+    Returns:
+        str: Phonetic key ('nako' for all three)
+    """
+    text = normalize_key(text)
+    for pattern, replacement in PHONETIC_RULES:
+        text = pattern.sub(replacement, text)
+    text = REPEATED_LETTERS.sub(r'\1', text)
+    return WHITESPACE.sub(' ', text).strip()
+
+def trigrams(text):
+    """Return the set of character trigrams in a string."""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+# Set bits of each byte value, to count the bits of NumPy mask arrays
+POPCOUNT = numpy.array([bin(byte).count('1') for byte in range(256)], dtype=numpy.uint8) if numpy is not None else None
+
+
+def char_mask(text):
+    """Bitmask of the characters in a string, each character folded onto one of 64 bits."""
+    mask = 0
+    for char in set(text):
+        mask |= 1 << (ord(char) & 63)
+    return mask
+
+def field_shapes(fields):
+    """
+    Lengths and character masks of normalized field values, for ScoreBounds.
+    
+    Args:
+        fields (list): Normalized field values of each entry, in INDEXED_FIELDS order
+    
+    Returns:
+        tuple: (lengths, masks), each one array per field indexed by entry position
+    """
+    lengths = tuple(array('I', (len(values[i]) for values in fields)) for i in range(len(INDEXED_FIELDS)))
+    masks = tuple(array('Q', (char_mask(values[i]) for values in fields)) for i in range(len(INDEXED_FIELDS)))
+    return lengths, masks
+
+class ScoreBounds:
+    """
+    Upper bounds of the weighted score a query can reach on each entry.
+    
+    ``ratio`` is 2 * LCS / total length and ``partial_ratio`` the same for
+    the best window of the shorter string, so with ``m`` the characters a
+    field shares with the query (capped at the shorter length) a term can
+    score at most ``similarity(m, len(query) + len(term))`` and any other
+    field ``similarity(m, min(len(query), len(field)) + m)``. Shared
+    characters are counted on 64-bit character masks, which can only
+    overcount, so a bound is never below the real score. With NumPy the
+    bounds of a batch are checked as array operations, otherwise entry by
+    entry.
+    """
+    
+    __slots__ = ('length', 'layers', 'weights', 'lengths', 'masks', '_needed')
+    
+    def __init__(self, query, lengths, masks, weights=None):
+        """
+        Args:
+            query (str): Normalized query
+            lengths, masks: Field lengths and character masks from field_shapes
+            weights (dict): Field -> multiplier applied to that field's score
+        """
+        # Layer k holds the mask bits of more than k query characters, so the
+        # characters a field can share are the sum over layers of its bits in each
+        counts = Counter(1 << (ord(char) & 63) for char in query)
+        layers = []
+        while counts:
+            layer = 0
+            for bit in counts:
+                layer |= bit
+            layers.append(layer)
+            counts = Counter({bit: count - 1 for bit, count in counts.items() if count > 1})
+        self.length = len(query)
+        self.layers = tuple(layers)
+        self.weights = tuple(weights.get(field, 1.0) if weights else 1.0 for field in INDEXED_FIELDS)
+        if numpy is not None:
+            lengths = tuple(numpy.asarray(column) for column in lengths)
+            masks = tuple(numpy.asarray(column) for column in masks)
+        self.lengths = lengths
+        self.masks = masks
+        self._needed = {}
+    
+    def needed(self, field, length, floor):
+        """
+        Fewest shared characters with which a field value could score ``floor``.
+        
+        Args:
+            field (int): Index of the field in INDEXED_FIELDS
+            length (int): Length of the field value
+            floor (int): Weighted score to reach
+        
+        Returns:
+            int: Shared characters needed; more than the query has if the floor is out of reach
+        """
+        shortest = min(self.length, length)
+        weight = self.weights[field]
+        for shared in range(shortest + 1):
+            if INDEXED_FIELDS[field] == 'term':
+                bound = similarity(shared, self.length + length)
+            else:
+                bound = similarity(shared, shortest + shared)
+            if weight != 1.0:
+                bound = min(100, int(bound * weight + 0.5))
+            if bound >= floor:
+                return shared
+        return self.length + 1
+    
+    def filter(self, positions, floor):
+        """
+        Keep the entries that could reach a weighted score on some field.
+        
+        Args:
+            positions (list): Entry positions
+            floor (int): Weighted score to reach
+        
+        Returns:
+            list: The positions whose bound reaches ``floor``, in order
+        """
+        # Field length -> shared characters needed, per field, for this floor
+        tables = self._needed.get(floor)
+        if tables is None:
+            tables = self._needed[floor] = tuple({} for _ in INDEXED_FIELDS)
+        if numpy is not None:
+            return self._filter_arrays(positions, floor, tables)
+        columns = list(zip(range(len(INDEXED_FIELDS)), tables, self.lengths, self.masks))
+        layers = self.layers
+        out_of_reach = self.length + 1
+        kept = []
+        for position in positions:
+            for field, table, lengths, masks in columns:
+                length = lengths[position]
+                needed = table.get(length)
+                if needed is None:
+                    needed = table[length] = self.needed(field, length, floor)
+                if needed == out_of_reach:
+                    continue
+                if needed:
+                    mask = masks[position]
+                    shared = 0
+                    for layer in layers:
+                        shared += bin(layer & mask).count('1')
+                        if shared >= needed:
+                            break
+                    if shared < needed:
+                        continue
+                kept.append(position)
+                break
+        return kept
+    
+    def _filter_arrays(self, positions, floor, tables):
+        """filter() over NumPy arrays of a whole batch at once"""
+        index = numpy.asarray(positions, dtype=numpy.intp)
+        kept = numpy.zeros(len(index), dtype=bool)
+        for field, table in enumerate(tables):
+            lengths, inverse = numpy.unique(self.lengths[field][index], return_inverse=True)
+            for length in lengths.tolist():
+                if length not in table:
+                    table[length] = self.needed(field, length, floor)
+            needed = numpy.array([table[length] for length in lengths.tolist()])[inverse]
+            masks = self.masks[field][index]
+            shared = sum(POPCOUNT[(masks & numpy.uint64(layer)).view(numpy.uint8)].reshape(-1, 8).sum(axis=1)
+                         for layer in self.layers)
+            kept |= shared >= needed
+        return index[kept].tolist()
+
+def candidate_limit(limit):
+    """Return how many trigram candidates are scored for a search returning ``limit`` results."""
+    return max(MIN_CANDIDATES, CANDIDATES_PER_RESULT * limit)
+
+def rank_candidates(shared, limit):
+    """
+    Keep the entries sharing the most trigrams with a query.
+    
+    Args:
+        shared (dict): Entry position -> number of distinct query trigrams it has
+        limit (int): Number of results the search returns
+    
+    Returns:
+        list: At most candidate_limit(limit) positions, most shared trigrams
+        first and ties in position order
+    """
+    best = heapq.nsmallest(candidate_limit(limit), shared.items(), key=lambda item: (-item[1], item[0]))
+    return [position for position, _ in best]
+
+class TrigramIndex:
+    """
+    Character-trigram inverted index over the normalized slang fields.
+    
+    A query's candidates are the ``candidate_limit(limit)`` entries sharing
+    the most trigrams with it. They are scored before every other entry, so
+    the best matches usually fill the top-k heap early and its bound prunes
+    the rest of the corpus; entries sharing no trigram are still scored if
+    their bound reaches it, since partial_ratio can match scattered
+    characters. Queries too short to have trigrams have no candidates.
+    """
+    
+    __slots__ = ('postings', 'size')
+    
+    def __init__(self, slang_data, fields=None):
+        """
+        Args:
+            slang_data (list): Slang entries (dictionaries or compact records)
+            fields (list): Already normalized field values of each entry, in
+                INDEXED_FIELDS order; by default the lowercased entry fields
+        """
+        if fields is None:
+            fields = [tuple(entry.get(field, '').lower() for field in INDEXED_FIELDS) for entry in slang_data]
+        
+        postings = defaultdict(list)
+        for position, values in enumerate(fields):
+            grams = set()
+            for value in values:
+                grams |= trigrams(value)
+            for gram in grams:
+                postings[gram].append(position)
+        
+        self.postings = {gram: tuple(positions) for gram, positions in postings.items()}
+        self.size = len(slang_data)
+    
+    def __eq__(self, other):
+        return isinstance(other, TrigramIndex) and (self.postings, self.size) == (other.postings, other.size)
+    
+    def candidates(self, query, limit=10):
+        """
+        Pick the entries worth scoring first for a query.
+        
+        Args:
+            query (str): Normalized (stripped, lowercased) query
+            limit (int): Number of results the search returns
+        
+        Returns:
+            list: Entry positions, those sharing the most trigrams with the
+            query first, or None if the query is too short to rank them
+        """
+        if len(query) < MIN_INDEXED_QUERY_LENGTH:
+            return None
+        
+        shared = Counter()
+        for gram in trigrams(query):
+            shared.update(self.postings.get(gram, ()))
+        return rank_candidates(shared, limit)
+
+def raw_cutoff(cutoff, weight):
+    """Lowest unweighted score that reaches a weighted ``cutoff``; 101 if none does."""
+    if cutoff <= 0:
+        return 0
+    if weight == 1.0:
+        return cutoff
+    return next((score for score in range(101) if min(100, int(score * weight + 0.5)) >= cutoff), 101)
+
+def score_columns(query, columns, weights=None, scorer=None, cutoff=0):
+    """
+    Score a query against many entries, one scorer call per field.
+    
+    Args:
+        query (str): Normalized query
+        columns (list): For each field in INDEXED_FIELDS order, the normalized
+            values of that field for every entry
+        weights (dict): Field -> multiplier applied to that field's score
+        scorer: Scorer backend from scoring.get_scorer; the default one if None
+        cutoff (int): Weighted score an entry must reach; the scorer may skip
+            entries that cannot, and they are returned as None
+    
+    Returns:
+        list: (best weighted score, winning field, {field: unweighted score}) per
+        entry, or None for an entry below ``cutoff``
+    """
+    scorer = scorer or get_scorer()
+    cutoffs = [raw_cutoff(cutoff, weights.get(field, 1.0) if weights else 1.0) for field in INDEXED_FIELDS]
+    
+    def score(field, values, score_cutoff):
+        if field == 'term':
+            return scorer.ratio(query, values, score_cutoff=score_cutoff)
+        return scorer.partial_ratio(query, values, score_cutoff=score_cutoff)
+    
+    field_scores = [score(field, values, field_cutoff)
+                    for field, values, field_cutoff in zip(INDEXED_FIELDS, columns, cutoffs)]
+    kept = [any(score >= field_cutoff for score, field_cutoff in zip(entry_scores, cutoffs))
+            for entry_scores in zip(*field_scores)]
+    if cutoff > 0:
+        # A field of a kept entry the scorer skipped is scored again without a cutoff
+        for i, field in enumerate(INDEXED_FIELDS):
+            skipped = [index for index, score in enumerate(field_scores[i]) if kept[index] and score < cutoffs[i]]
+            if skipped:
+                exact = score(field, [columns[i][index] for index in skipped], 0)
+                for index, field_score in zip(skipped, exact):
+                    field_scores[i][index] = field_score
+    
+    rows = []
+    for keep, entry_scores in zip(kept, zip(*field_scores)):
+        if not keep:
+            rows.append(None)
+            continue
+        scores = dict(zip(INDEXED_FIELDS, entry_scores))
+        rows.append((*best_field_score(scores, weights), scores))
+    return rows
+
+def best_field_score(scores, weights=None):
+    """Return (best weighted score, winning field) from per-field scores."""
+    best_score, best_field = -1, None
+    for field, score in scores.items():
+        if weights:
+            score = min(100, int(score * weights.get(field, 1.0) + 0.5))
+        if score > best_score:
+            best_score, best_field = score, field
+    return best_score, best_field
+
+def score_fields(query, fields, weights=None, scorer=None):
+    """
+    Score a query against the fields of one entry in a single pass.
+    
+    Args:
+        query (str): Normalized query
+        fields (tuple): Normalized field values, in INDEXED_FIELDS order
+        weights (dict): Field -> multiplier applied to that field's score
+        scorer: Scorer backend from scoring.get_scorer; the default one if None
+    
+    Returns:
+        tuple: (best weighted score, winning field, {field: unweighted score})
+    """
+    return score_columns(query, [[value] for value in fields], weights, scorer)[0]
+
+def select_top_k(query, fields, positions, threshold, limit, weights=None, scorer=None, bounds=None,
+                 lead=0, stats=None):
+    """
+    Score candidates in large batches, keeping the best ``limit`` in a min-heap.
+    
+    Each batch is scored with one scorer call per field, so a candidate list
+    of up to SCORE_BATCH_SIZE entries costs four scorer calls in all. Before
+    a batch is scored, candidates whose upper bound cannot reach the
+    threshold or, once the heap is full, the k-th best score so far are
+    dropped, and the scorer skips work below that floor too.
+    
+    Args:
+        query (str): Normalized query
+        fields: Position -> normalized field values, in INDEXED_FIELDS order
+        positions (iterable): Candidate positions
+        threshold (int): Minimum (weighted) similarity score (0-100)
+        limit (int): Number of results to keep
+        weights (dict): Field -> multiplier applied to that field's score
+        scorer: Scorer backend from scoring.get_scorer; the default one if None
+        bounds (ScoreBounds): Upper bounds of the candidates' scores; None scores
+            every candidate
+        lead (int): Number of leading positions, the likeliest matches, batched
+            apart from the rest so that their scores prune the rest
+        stats (dict): If given, receives the number of candidates 'scored'
+    
+    Returns:
+        list: (score, position, winning field, {field: score}) tuples, best
+        first and equal scores in position order
+    """
+    heap = []
+    scored = 0
+    
+    if limit > 0:
+        positions = list(positions)
+        lead = min(lead, len(positions))
+        starts = [*range(0, lead, SCORE_BATCH_SIZE), *range(lead, len(positions), SCORE_BATCH_SIZE)]
+        for start in starts:
+            batch = positions[start:min(start + SCORE_BATCH_SIZE, lead if start < lead else len(positions))]
+            floor = max(threshold, heap[0][0]) if len(heap) >= limit else threshold
+            if bounds is not None:
+                batch = bounds.filter(batch, floor)
+            columns = [[fields[position][i] for position in batch] for i in range(len(INDEXED_FIELDS))]
+            for position, row in zip(batch, score_columns(query, columns, weights, scorer, cutoff=floor)):
+                if row is None:
+                    continue
+                score, field, scores = row
+                if score < threshold:
+                    continue
+                # Among equal scores the later position is the smaller item and is dropped first
+                item = (score, -position, field, scores)
+                if len(heap) < limit:
+                    heapq.heappush(heap, item)
+                else:
+                    heapq.heappushpop(heap, item)
+            scored += len(batch)
+    
+    if stats is not None:
+        stats['scored'] = scored
+    heap.sort(key=lambda item: (-item[0], -item[1]))
+    return [(score, -negative_position, field, scores) for score, negative_position, field, scores in heap]
+
+class SearchCorpus:
+    """
+    Slang entries with their search fields prepared once per data version.
+    
+    Fields are folded (accents stripped, lowercased, transliteration variants
+    merged) when the corpus is built, so a query only needs folding itself.
+    A trigram index over the folded fields picks the candidates, so only the
+    entries sharing the most trigrams with a query are scored. Exact terms,
+    translation words and phonetic spellings are looked up in hash maps
+    before any scoring; a phonetic hit scores PHONETIC_SCORE on its own
+    'phonetic' match field unless one of its fields scores higher.
+    """
+    
+    __slots__ = ('entries', 'fields', 'index', 'lengths', 'masks', 'exact', 'phonetic')
+    
+    def __init__(self, slang_data):
+        self.entries = tuple(slang_data)
+        self.fields = tuple(tuple(fold(entry.get(field, '')) for field in INDEXED_FIELDS)
+                            for entry in self.entries)
+        self.index = TrigramIndex(self.entries, fields=self.fields)
+        self.lengths, self.masks = field_shapes(self.fields)
+        # Normalized term, translation and translation word -> (position, field) of the entries having it;
+        # dicts keep the hits of a key unique and in insertion order
+        exact = defaultdict(dict)
+        for position, entry in enumerate(self.entries):
+            term = normalize_key(entry.get('term', ''))
+            translation = normalize_key(entry.get('translation', ''))
+            keys = [(term, 'term'), (translation, 'translation')]
+            keys.extend((word, 'translation') for word in translation.split() if len(word) > 1)
+            for key, field in keys:
+                if key:
+                    exact[key][(position, field)] = None
+        self.exact = {key: tuple(hits) for key, hits in exact.items()}
+        # Phonetic key of every term -> positions of the entries spelt that way
+        phonetic = defaultdict(list)
+        for position, entry in enumerate(self.entries):
+            key = phonetic_key(entry.get('term', ''))
+            if key:
+                phonetic[key].append(position)
+        self.phonetic = {key: tuple(positions) for key, positions in phonetic.items()}
+    
+    def __eq__(self, other):
+        return isinstance(other, SearchCorpus) and (self.entries, self.fields) == (other.entries, other.fields)
+    
+    def __len__(self):
+        return len(self.entries)
+    
+    def search(self, query, threshold=60, limit=10, weights=None, exact=False, scorer=None, candidates=None,
+               stats=None):
+        """
+        Search the corpus using fuzzy matching.
+        
+        Args:
+            query (str): Search query
+            threshold (int): Minimum (weighted) similarity score (0-100)
+            limit (int): Maximum number of results to return
+            weights (dict): Field -> multiplier applied to that field's score,
+                e.g. {'usage': 0.8} to rank usage matches below term matches
+            exact (bool): Skip the exact and phonetic lookups and the trigram
+                ordering, scoring entries in position order
+            scorer: Scorer backend from scoring.get_scorer; the default one if None
+            candidates (list): Positions to fuzzy score first, ranked as
+                TrigramIndex.candidates ranks them but taken from another index;
+                None asks the trigram index
+            stats (dict): If given, receives how many entries were 'scored' and 'pruned',
+                how many were found by 'lookup' and whether the 'fast_path' answered
+                without fuzzy scoring the corpus
+        
+        Returns:
+            list: Matching entries with their score, winning field and per-field scores
+        """
+        raw_query = query or ''
+        key = normalize_key(raw_query)
+        query = fold(raw_query)
+        if not query:
+            # Return all slang terms if query is empty
+            return [{'entry': entry, 'score': 100} for entry in self.entries]
+        
+        try:
+            # Exact terms and translation words are found by hash lookup and count as
+            # exact matches of that field; phonetic spellings of terms are found the same
+            # way but only score PHONETIC_SCORE, as their own 'phonetic' field
+            hits = {}
+            phonetic_hits = ()
+            if not exact:
+                for position, field in self.exact.get(key, ()):
+                    hits.setdefault(position, {})[field] = 100
+                phonetic_hits = self.phonetic.get(phonetic_key(raw_query), ())
+                for position in phonetic_hits:
+                    hits.setdefault(position, {}).setdefault('phonetic', PHONETIC_SCORE)
+            
+            # Unweighted, every exact hit scores 100 and ties go to the earlier position,
+            # so without phonetic hits only the first ``limit`` hits can be returned
+            hit_positions = sorted(hits)
+            if not weights and not phonetic_hits:
+                hit_positions = hit_positions[:max(limit, 0)]
+            columns = [[self.fields[position][i] for position in hit_positions] for i in range(len(INDEXED_FIELDS))]
+            top = []
+            for position, (_, _, scores) in zip(hit_positions, score_columns(query, columns, scorer=scorer)):
+                scores.update(hits[position])
+                score, field = best_field_score(scores, weights)
+                if score >= threshold:
+                    top.append((score, position, field, scores))
+            
+            # A query naming a term, or enough exact matches to fill the limit,
+            # is answered right away; otherwise fuzzy scoring competes for every place
+            exact_hits = sum(1 for _, position, _, _ in top if 100 in hits[position].values())
+            fast_path = bool(top) and (exact_hits >= limit or any(field == 'term' for _, field in
+                                                                  self.exact.get(key, ())))
+            counts = {'scored': len(hit_positions)}
+            if not fast_path and limit > 0:
+                # Trigram candidates go first to raise the bar for the rest of the corpus,
+                # which is still scored wherever an entry's bound reaches that bar
+                ranked = []
+                if not exact:
+                    ranked = (self.index.candidates(query, limit) if candidates is None else candidates) or []
+                    ranked = [position for position in ranked if position not in hits]
+                seen = set(ranked).union(hits)
+                positions = ranked + [position for position in range(len(self.entries)) if position not in seen]
+                
+                # Once the hits fill the limit, only entries scoring at least the last of them can place
+                floor = threshold
+                if len(top) >= limit:
+                    floor = max(threshold, sorted((item[0] for item in top), reverse=True)[limit - 1])
+                bounds = ScoreBounds(query, self.lengths, self.masks, weights)
+                top.extend(select_top_k(query, self.fields, positions, floor, limit, weights=weights,
+                                        scorer=scorer, bounds=bounds, lead=len(ranked), stats=counts))
+                counts['scored'] += len(hit_positions)
+            top.sort(key=lambda item: (-item[0], item[1]))
+            
+            results = [{
+                'entry': self.entries[position],
+                'score': score,
+                'match_field': field,
+                'scores': scores
+            } for score, position, field, scores in top[:limit]]
+            
+            pruned = len(self.entries) - counts['scored']
+            if stats is not None:
+                stats.update(scored=counts['scored'], pruned=pruned, lookup=len(hits), fast_path=fast_path)
+            logger.info(f"Search for '{query}' returned {len(results)} results "
+                        f"({pruned} of {len(self.entries)} entries pruned)")
+            return results
+        
+        except Exception as e:
+            logger.error(f"Error in slang search: {str(e)}")
+            return []
+
+def search_slang(query, slang_data, threshold=60, limit=10, index=None, stats=None):
     """
     Search for slang terms using fuzzy matching.
     
     Args:
         query (str): Search query
-        slang_data (list): List of slang dictionaries
+        slang_data (list): Slang entries (dictionaries or compact records)
         threshold (int): Minimum similarity score (0-100)
         limit (int): Maximum number of results to return
+        index (TrigramIndex): Index over slang_data whose candidates for the
+            query are scored first; None scores entries in position order
+        stats (dict): If given, receives how many entries were 'scored' and 'pruned'
     
     Returns:
         list: List of matching slang entries with similarity scores
@@ -24,41 +645,32 @@ def search_slang(query, slang_data, threshold=60, limit=10):
         return []
     
     query = query.strip().lower()
-    results = []
+    
+    ranked = []
+    if index is not None and index.size == len(slang_data):
+        ranked = index.candidates(query, limit) or []
+    seen = set(ranked)
+    positions = ranked + [position for position in range(len(slang_data)) if position not in seen]
     
     try:
-        # Search in term field
-        for entry in slang_data:
-            term = entry.get('term', '').lower()
-            translation = entry.get('translation', '').lower()
-            category = entry.get('category', '').lower()
-            usage = entry.get('usage', '').lower()
-            
-            # Calculate similarity scores for different fields
-            term_score = fuzz.ratio(query, term)
-            translation_score = fuzz.partial_ratio(query, translation)
-            category_score = fuzz.partial_ratio(query, category)
-            usage_score = fuzz.partial_ratio(query, usage)
-            
-            # Use the highest score among all fields
-            max_score = max(term_score, translation_score, category_score, usage_score)
-            
-            if max_score >= threshold:
-                results.append({
-                    'entry': entry,
-                    'score': max_score,
-                    'match_field': get_best_match_field(query, entry)
-                })
-        
-        # Sort by score (highest first)
-        results.sort(key=lambda x: x['score'], reverse=True)
+        # Score every field of a candidate once; the highest score and its field win
+        fields = {position: tuple(slang_data[position].get(field, '').lower() for field in INDEXED_FIELDS)
+                  for position in positions}
+        counts = {}
+        top = select_top_k(query, fields, positions, threshold, limit, lead=len(ranked), stats=counts)
+        results = [{
+            'entry': slang_data[position],
+            'score': score,
+            'match_field': field
+        } for score, position, field, _ in top]
         
-        # Limit results
-        results = results[:limit]
-        
-        logger.info(f"Search for '{query}' returned {len(results)} results")
+        pruned = len(slang_data) - counts['scored']
+        if stats is not None:
+            stats.update(scored=counts['scored'], pruned=pruned)
+        logger.info(f"Search for '{query}' returned {len(results)} results "
+                    f"({pruned} of {len(slang_data)} entries pruned)")
         return results
-        
+    
     except Exception as e:
         logger.error(f"Error in slang search: {str(e)}")
         return []
@@ -69,29 +681,130 @@ def get_best_match_field(query, entry):
     
     Args:
         query (str): Search query
-        entry (dict): Slang entry
+        entry (dict): Slang entry (dictionary or compact record)
     
     Returns:
         str: Field name with best match
     """
-    query = query.lower()
-    scores = {
-        'term': fuzz.ratio(query, entry.get('term', '').lower()),
-        'translation': fuzz.partial_ratio(query, entry.get('translation', '').lower()),
-        'category': fuzz.partial_ratio(query, entry.get('category', '').lower()),
-        'usage': fuzz.partial_ratio(query, entry.get('usage', '').lower())
-    }
+    fields = tuple(entry.get(field, '').lower() for field in INDEXED_FIELDS)
+    return score_fields(query.lower(), fields)[1]
+
+class BKTree:
+    """
+    Burkhard-Keller tree over folded slang terms, for "did you mean" suggestions.
+    
+    Every node holds one folded term and its children keyed by their edit
+    distance to it. By the triangle inequality a query only has to descend
+    into children whose key is within ``max_distance`` of its own distance
+    to the node, so most of the tree is never compared against.
+    """
+    
+    __slots__ = ('root', 'size')
+    
+    def __init__(self, slang_data):
+        # Nodes are [folded term, original terms, {distance: child}, insertion order]
+        self.root = None
+        self.size = 0
+        scorer = get_scorer()
+        for entry in slang_data:
+            term = entry.get('term', '')
+            if term:
+                self.add(fold(term), term, scorer)
+    
+    def __eq__(self, other):
+        return isinstance(other, BKTree) and (self.root, self.size) == (other.root, other.size)
+    
+    def __len__(self):
+        return self.size
     
-    return max(scores, key=scores.get)
+    def add(self, word, term, scorer=None):
+        """
+        Insert a term under its folded form.
+        
+        Args:
+            word (str): Folded term the distances are measured on
+            term (str): Original term returned as a suggestion
+            scorer: Scorer backend from scoring.get_scorer; the default one if None
+        """
+        if not word:
+            return
+        if self.root is None:
+            self.root = [word, [term], {}, 0]
+            self.size = 1
+            return
+        
+        distance = (scorer or get_scorer()).distance
+        node = self.root
+        while True:
+            gap = distance(word, node[0])
+            if gap == 0:
+                if term not in node[1]:
+                    node[1].append(term)
+                return
+            child = node[2].get(gap)
+            if child is None:
+                node[2][gap] = [word, [term], {}, self.size]
+                self.size += 1
+                return
+            node = child
+    
+    def closest(self, query, limit=5, max_distance=DEFAULT_SUGGESTION_DISTANCE, scorer=None, stats=None):
+        """
+        Find the terms closest to a query within an edit distance.
+        
+        Once ``limit`` terms are found the search radius shrinks to the
+        distance of the worst of them, pruning more of the tree.
+        
+        Args:
+            query (str): Search query (folded before comparing)
+            limit (int): Maximum number of terms
+            max_distance (int): Maximum edit distance between the folded query and a term
+            scorer: Scorer backend from scoring.get_scorer; the default one if None
+            stats (dict): If given, receives how many nodes were 'visited'
+        
+        Returns:
+            list: (distance, term) pairs, closest first, ties in insertion order
+        """
+        query = fold(query or '')
+        if not query or self.root is None or limit <= 0 or max_distance < 0:
+            return []
+        
+        distance = (scorer or get_scorer()).distance
+        # Max-heap of the best nodes so far as (-distance, -order, node)
+        best = []
+        radius = max_distance
+        visited = 0
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            visited += 1
+            gap = distance(query, node[0])
+            if gap <= radius:
+                item = (-gap, -node[3], node)
+                if len(best) < limit:
+                    heapq.heappush(best, item)
+                elif item[:2] > best[0][:2]:
+                    heapq.heapreplace(best, item)
+                if len(best) == limit:
+                    radius = min(radius, -best[0][0])
+            stack.extend(child for key, child in node[2].items() if gap - radius <= key <= gap + radius)
+        
+        if stats is not None:
+            stats['visited'] = visited
+        best.sort(reverse=True)
+        return [(-negative_gap, term) for negative_gap, _, node in best for term in node[1]][:limit]
 
-def get_search_suggestions(query, slang_data, limit=5):
+def get_search_suggestions(query, slang_data, limit=5, tree=None, max_distance=DEFAULT_SUGGESTION_DISTANCE):
     """
     Get search suggestions for when no results are found.
     
     Args:
         query (str): Original search query
-        slang_data (list): List of slang dictionaries
+        slang_data (list): Slang entries (dictionaries or compact records)
         limit (int): Maximum number of suggestions
+        tree (BKTree): Tree over the entries' terms; when given, suggestions are
+            the terms within ``max_distance`` edits of the query, closest first
+        max_distance (int): Maximum edit distance used with ``tree``
     
     Returns:
         list: List of suggested search terms
@@ -100,15 +813,19 @@ def get_search_suggestions(query, slang_data, limit=5):
         return []
     
     try:
+        if tree is not None:
+            return [term for _, term in tree.closest(query, limit=limit, max_distance=max_distance)]
+        
         # Extract all terms for suggestions
         terms = [entry.get('term', '') for entry in slang_data if entry.get('term')]
         
-        # Get closest matches
-        suggestions = process.extract(query, terms, limit=limit, scorer=fuzz.ratio)
+        # Get closest matches, scoring all terms in one call
+        scores = get_scorer().ratio(fold(query), [fold(term) for term in terms])
+        best = heapq.nlargest(limit, range(len(terms)), key=scores.__getitem__)
         
         # Return just the terms (not the scores)
-        return [suggestion[0] for suggestion in suggestions if suggestion[1] > 30]
-        
+        return [terms[i] for i in best if scores[i] > 30]
+    
     except Exception as e:
         logger.error(f"Error getting search suggestions: {str(e)}")
         return []
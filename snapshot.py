@@ -0,0 +1,136 @@
+import os
+import mmap
+import pickle
+import hashlib
+import logging
+
+from parser import parse_product_data, PARSER_VERSION
+
+logger = logging.getLogger(__name__)
+
+# Snapshot file layout: MAGIC | key length (4 bytes, big endian) | key | pickle payload
+SNAPSHOT_MAGIC = b'HYDSNAP1'
+SNAPSHOT_SUFFIX = '.snapshot'
+HASH_CHUNK_SIZE = 1024 * 1024
+
+def snapshot_path(file_path):
+    """Return the snapshot location for a source file (written next to it)."""
+    return file_path + SNAPSHOT_SUFFIX
+
+def source_digest(file_path):
+    """
+    Compute the SHA-256 of a source file without reading it into memory at once.
+    
+    Args:
+        file_path (str): Path to the source file
+    
+    Returns:
+        str: Hex digest of the file contents
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def snapshot_key(digest, compact=False, index_version=0):
+    """Build the cache key from the source digest, parser version, row layout and index version."""
+    layout = 'records' if compact else 'dicts'
+    return f"{digest}:parser-{PARSER_VERSION}:{layout}:indexes-{index_version}".encode('ascii')
+
+def write_snapshot(path, key, payload):
+    """
+    Atomically write a snapshot file.
+    
+    Args:
+        path (str): Snapshot file path
+        key (bytes): Cache key identifying the source and parser version
+        payload (dict): Parsed data and indexes
+    """
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, 'wb') as file:
+            file.write(SNAPSHOT_MAGIC)
+            file.write(len(key).to_bytes(4, 'big'))
+            file.write(key)
+            pickle.dump(payload, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)
+        logger.info(f"Wrote data snapshot {path}")
+    except OSError as e:
+        logger.warning(f"Could not write snapshot {path}: {str(e)}")
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+
+def read_snapshot(path, key):
+    """
+    Load a snapshot with a single memory-mapped read.
+    
+    Args:
+        path (str): Snapshot file path
+        key (bytes): Expected cache key
+    
+    Returns:
+        dict: Snapshot payload, or None if missing, stale or corrupt
+    """
+    if not os.path.exists(path):
+        return None
+    
+    try:
+        with open(path, 'rb') as file:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                header_size = len(SNAPSHOT_MAGIC) + 4
+                if mapped[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+                    logger.warning(f"Ignoring snapshot {path}: bad header")
+                    return None
+                
+                key_size = int.from_bytes(mapped[len(SNAPSHOT_MAGIC):header_size], 'big')
+                if mapped[header_size:header_size + key_size] != key:
+                    logger.info(f"Snapshot {path} is stale")
+                    return None
+                
+                with memoryview(mapped) as view, view[header_size + key_size:] as body:
+                    return pickle.loads(body)
+    except Exception as e:
+        # Besides I/O errors and truncation, a class renamed or moved without an index
+        # version bump fails to unpickle with AttributeError, ImportError or TypeError
+        logger.warning(f"Could not read snapshot {path}, rebuilding it: {str(e)}")
+        return None
+
+def load_compiled_data(file_path='product.md', build_indexes=None, digest=None, compact=False,
+                       index_version=0):
+    """
+    Load parsed product data, using the compiled snapshot when it matches.
+    
+    The snapshot is keyed on the content hash of the source file and the
+    parser version. On a mismatch the source is parsed normally and the
+    snapshot is rebuilt.
+    
+    Args:
+        file_path (str): Path to the product.md file
+        build_indexes (callable): Builds derived indexes from the parsed data
+        digest (str): Precomputed source digest, if the caller already has one
+        compact (bool): Store rows as compact records instead of dictionaries
+        index_version (int): Version of ``build_indexes``, part of the snapshot key
+    
+    Returns:
+        dict: Parsed data for all sections plus an 'indexes' entry
+    """
+    def parse():
+        data = parse_product_data(file_path, compact=compact)
+        data['indexes'] = build_indexes(data) if build_indexes else {}
+        return data
+    
+    if not os.path.exists(file_path):
+        return parse()
+    
+    path = snapshot_path(file_path)
+    key = snapshot_key(digest or source_digest(file_path), compact=compact, index_version=index_version)
+    
+    payload = read_snapshot(path, key)
+    if payload is not None:
+        logger.info(f"Loaded data from snapshot {path}")
+        return payload
+    
+    data = parse()
+    write_snapshot(path, key, data)
+    return data
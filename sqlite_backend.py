@@ -0,0 +1,330 @@
+import os
+import queue
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+from urllib.request import pathname2url
+
+from filters import FACET_FIELDS, SpotQuery
+from parser import PARSER_VERSION
+from search import INDEXED_FIELDS, MIN_INDEXED_QUERY_LENGTH, candidate_limit, fold, trigrams
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 4
+
+SCHEMA = """
+CREATE TABLE meta (key TEXT NOT NULL);
+
+CREATE TABLE slang (
+    id INTEGER PRIMARY KEY,
+    term TEXT NOT NULL,
+    translation TEXT NOT NULL,
+    category TEXT NOT NULL,
+    usage TEXT NOT NULL
+);
+CREATE VIRTUAL TABLE slang_fts USING fts5(
+    term, translation, category, usage, tokenize='trigram'
+);
+CREATE VIRTUAL TABLE slang_trigrams USING fts5vocab(slang_fts, 'instance');
+
+CREATE TABLE biryani (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    area TEXT NOT NULL COLLATE NOCASE,
+    vibe TEXT NOT NULL COLLATE NOCASE,
+    description TEXT NOT NULL,
+    rating REAL
+);
+CREATE INDEX biryani_area ON biryani (area);
+CREATE INDEX biryani_vibe ON biryani (vibe);
+CREATE INDEX biryani_rating ON biryani (rating);
+CREATE VIRTUAL TABLE biryani_fts USING fts5(
+    description, content='biryani', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+"""
+
+SLANG_COLUMNS = ('term', 'translation', 'category', 'usage')
+BIRYANI_COLUMNS = ('name', 'area', 'vibe', 'description', 'rating')
+
+def database_key(digest):
+    """Return the key identifying a compiled database, or None if the source has no digest."""
+    if digest is None:
+        return None
+    return f"{digest}:parser-{PARSER_VERSION}:schema-{SCHEMA_VERSION}"
+
+def read_database_key(db_path):
+    """Return the key a compiled database was built from, or None if it is missing or unreadable."""
+    if not os.path.exists(db_path):
+        return None
+    try:
+        connection = sqlite3.connect(db_path)
+        try:
+            row = connection.execute("SELECT key FROM meta").fetchone()
+        finally:
+            connection.close()
+    except sqlite3.Error:
+        return None
+    return row[0] if row else None
+
+def compile_database(data, db_path, key=None):
+    """
+    Compile parsed product data into an indexed SQLite file.
+    
+    The database is built in a temporary file and moved into place, so
+    readers never see a half-written database.
+    
+    Args:
+        data (DataVersion): Data version to compile
+        db_path (str): Path of the database file
+        key (str): Key stored with the database to detect stale files
+    """
+    temp_path = f"{db_path}.{os.getpid()}.tmp"
+    if os.path.exists(temp_path):
+        os.unlink(temp_path)
+    
+    connection = sqlite3.connect(temp_path)
+    try:
+        connection.executescript(SCHEMA)
+        connection.execute("INSERT INTO meta (key) VALUES (?)", (key or '',))
+        connection.executemany(
+            "INSERT INTO slang (term, translation, category, usage) VALUES (?, ?, ?, ?)",
+            ([entry.get(column, '') for column in SLANG_COLUMNS] for entry in data.slang_data)
+        )
+        connection.executemany(
+            "INSERT INTO biryani (name, area, vibe, description, rating) VALUES (?, ?, ?, ?, ?)",
+            ([spot.get(column, '' if column != 'rating' else None) for column in BIRYANI_COLUMNS]
+             for spot in data.biryani_data)
+        )
+        connection.execute("INSERT INTO biryani_fts (biryani_fts) VALUES ('rebuild')")
+        # The slang FTS table holds the folded fields the search scores against
+        connection.executemany(
+            "INSERT INTO slang_fts (rowid, term, translation, category, usage) VALUES (?, ?, ?, ?, ?)",
+            ((rowid, *(fold(entry.get(field, '')) for field in INDEXED_FIELDS))
+             for rowid, entry in enumerate(data.slang_data, start=1))
+        )
+        connection.commit()
+    finally:
+        connection.close()
+    
+    os.replace(temp_path, db_path)
+    logger.info(f"Compiled data version {data.version} into {db_path}")
+
+def fts_phrase(text):
+    """Quote text as a single FTS5 string token."""
+    return '"' + text.replace('"', '""') + '"'
+
+class ConnectionPool:
+    """
+    Fixed-size pool of read-only connections to one database file.
+    
+    Connections are opened on demand up to ``size`` and reused afterwards.
+    Closing the pool closes idle connections immediately and busy ones when
+    they are returned.
+    """
+    
+    def __init__(self, db_path, size=4):
+        self.db_path = db_path
+        self.size = size
+        self.closed = False
+        self._idle = queue.LifoQueue()
+        self._opened = 0
+        self._lock = threading.Lock()
+    
+    def _connect(self):
+        uri = f"file:{pathname2url(os.path.abspath(self.db_path))}?mode=ro"
+        connection = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        connection.row_factory = sqlite3.Row
+        return connection
+    
+    @contextmanager
+    def connection(self):
+        """Borrow a connection for the duration of a with block."""
+        try:
+            connection = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_open = self._opened < self.size
+                if can_open:
+                    self._opened += 1
+            connection = self._connect() if can_open else self._idle.get()
+        
+        try:
+            yield connection
+        finally:
+            if self.closed:
+                connection.close()
+            else:
+                self._idle.put(connection)
+    
+    def close(self):
+        self.closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+class SQLiteBackend:
+    """
+    Serves slang search and biryani filtering from an indexed SQLite file.
+    
+    The file is compiled from the data version being served and recompiled
+    whenever a newer version is published, from a DataStore publish hook so
+    that requests never wait for it; a database left by an earlier run is
+    reused when it was built from the same source and parser. Requests still
+    holding an older version are served by the newer database meanwhile.
+    
+    Slang search only takes its candidate order from the database; the
+    entries are scored by the data version's in-memory SearchCorpus.
+    """
+    
+    def __init__(self, db_path='product.sqlite', pool_size=4):
+        self.db_path = db_path
+        self.pool_size = pool_size
+        self._pool = None
+        self._version = None
+        self._lock = threading.Lock()
+    
+    def sync(self, data):
+        """
+        Make sure the database is compiled from a data version or a newer one.
+        
+        Args:
+            data (DataVersion): Data version being published or used by a request
+        
+        Returns:
+            ConnectionPool: Pool for the database
+        """
+        pool, version = self._pool, self._version
+        if pool is not None and data.version <= version:
+            return pool
+        
+        with self._lock:
+            if self._pool is None or data.version > self._version:
+                key = database_key(data.digest)
+                if key is None or read_database_key(self.db_path) != key:
+                    compile_database(data, self.db_path, key)
+                else:
+                    logger.info(f"Using compiled database {self.db_path}")
+                
+                if self._pool is not None:
+                    self._pool.close()
+                self._pool = ConnectionPool(self.db_path, self.pool_size)
+                self._version = data.version
+            return self._pool
+    
+    def close(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.close()
+            self._pool = None
+            self._version = None
+    
+    def slang_candidates(self, data, query, limit=10):
+        """
+        Rank slang entries by the trigrams they share with a query, from the FTS index.
+        
+        Applies the same rule as TrigramIndex.candidates: the entries sharing at
+        least one trigram with the folded query, most shared first and ties in
+        source order, capped at candidate_limit(limit).
+        
+        Args:
+            data (DataVersion): Data version the request is using
+            query (str): Search query
+            limit (int): Number of results the search returns
+        
+        Returns:
+            list: Positions in data.slang_data, or None if the query is too
+            short to rank entries by trigrams or the database was compiled
+            from another version
+        """
+        folded = fold(query)
+        if len(folded) < MIN_INDEXED_QUERY_LENGTH:
+            return None
+        grams = sorted(trigrams(folded))
+        
+        pool = self.sync(data)
+        if self._version != data.version:
+            return None
+        with pool.connection() as connection:
+            rows = connection.execute(
+                f"SELECT doc, COUNT(DISTINCT term) AS shared FROM slang_trigrams "
+                f"WHERE term IN ({', '.join('?' * len(grams))}) "
+                f"GROUP BY doc ORDER BY shared DESC, doc LIMIT ?",
+                (*grams, candidate_limit(limit))
+            ).fetchall()
+        # Rowids are numbered from 1 in source order
+        return [row['doc'] - 1 for row in rows]
+    
+    def search_slang(self, data, query, threshold=60, limit=10, weights=None, stats=None):
+        """
+        Search slang terms, fuzzy scoring the candidates the FTS index ranks highest first.
+        
+        The candidates, then the entries whose score bound still reaches the
+        results, are scored by the data version's prepared SearchCorpus, so
+        results are the same as those of the in-memory backend.
+        
+        Args:
+            data (DataVersion): Data version the request is using
+            query (str): Search query
+            threshold (int): Minimum similarity score (0-100)
+            limit (int): Maximum number of results to return
+            weights (dict): Field -> multiplier applied to that field's score
+            stats (dict): If given, receives the search statistics of SearchCorpus.search
+        
+        Returns:
+            list: Matching slang entries with similarity scores, as SearchCorpus.search
+        """
+        try:
+            candidates = self.slang_candidates(data, query or '', limit)
+        except sqlite3.Error as e:
+            logger.error(f"Error querying {self.db_path}: {str(e)}")
+            return []
+        return data.index('slang_corpus').search(query, threshold=threshold, limit=limit, weights=weights,
+                                                 candidates=candidates, stats=stats)
+    
+    def filter_biryani(self, data, area_filter=None, vibe_filter=None, query=None):
+        """
+        Filter biryani spots with an indexed query.
+        
+        Args:
+            data (DataVersion): Data version the request is using
+            area_filter (str or list): Area(s) to filter by (case-insensitive)
+            vibe_filter (str or list): Vibe(s) to filter by (case-insensitive)
+            query (SpotQuery): Full criteria, used instead of area_filter and vibe_filter
+        
+        Returns:
+            list: Matching spots as dictionaries, highest rating first
+        """
+        if query is None:
+            query = SpotQuery(area_filter, vibe_filter)
+        
+        clauses, params = [], []
+        for field in FACET_FIELDS:
+            for values, operator in ((query.include[field], 'IN'), (query.exclude[field], 'NOT IN')):
+                if values:
+                    clauses.append(f"{field} {operator} ({', '.join('?' * len(values))})")
+                    params.extend(sorted(values))
+        if query.min_rating is not None:
+            clauses.append("rating >= ?")
+            params.append(query.min_rating)
+        if query.max_rating is not None:
+            clauses.append("rating <= ?")
+            params.append(query.max_rating)
+        if query.words:
+            clauses.append("id IN (SELECT rowid FROM biryani_fts WHERE biryani_fts MATCH ?)")
+            params.append(' '.join(fts_phrase(word) for word in sorted(query.words)))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        
+        try:
+            with self.sync(data).connection() as connection:
+                rows = connection.execute(
+                    f"SELECT name, area, vibe, description, rating FROM biryani {where} "
+                    f"ORDER BY rating DESC, id", params
+                ).fetchall()
+        except sqlite3.Error as e:
+            logger.error(f"Error querying {self.db_path}: {str(e)}")
+            return []
+        return [dict(row) for row in rows]
@@ -5,15 +5,17 @@ Using hypothesis library for property-based testing
 """
 
 import pytest
-from hypothesis import given, strategies as st, settings
+from hypothesis import given, strategies as st, settings, assume
 import tempfile
 import os
 import json
+import time
+import random
 
 # Import our modules
-from parser import parse_product_data, parse_markdown_table
+from parser import parse_product_data, parse_markdown_table, parse_product_stream, parse_stream, iter_markdown_tables
 from search import search_slang, get_search_suggestions
-from filters import filter_biryani_spots, get_unique_areas, get_unique_vibes
+from filters import filter_biryani_spots, get_unique_areas, get_unique_vibes, FacetIndex, SpotQuery, rating_order
 from time_converter import convert_time_format, get_current_time_context
 
 class TestFlaskStartup:
@@ -45,7 +47,7 @@ class TestFlaskStartup:
             # At least one section should have data (non-empty file)
             total_entries = len(data['slang_data']) + len(data['biryani_data']) + len(data['time_data'])
             assert total_entries > 0, "Valid product.md should contain at least some data"
-
+    
     @given(st.text().filter(lambda x: x.isprintable()))
     def test_startup_handles_invalid_files(self, invalid_content):
         """
@@ -68,7 +70,7 @@ class TestFlaskStartup:
             assert isinstance(data['slang_data'], list)
             assert isinstance(data['biryani_data'], list)
             assert isinstance(data['time_data'], list)
-            
+        
         finally:
             os.unlink(temp_path)
 
@@ -91,7 +93,7 @@ class TestMarkdownParsing:
         # Skip if any entry is empty or has problematic characters
         if not all(entry for entry in data_entries):
             return
-            
+        
         # Create a markdown table from the data
         headers = ['term', 'translation', 'category', 'usage']
         markdown_content = "## Test Section\n\n"
@@ -149,7 +151,7 @@ class TestErrorHandling:
             # Property: Should return valid data structure even on error
             assert isinstance(data, dict)
             assert all(isinstance(data[key], list) for key in ['slang_data', 'biryani_data', 'time_data'])
-            
+        
         except Exception as e:
             # If an exception occurs, it should be logged but not crash the system
             pytest.fail(f"Parser should handle errors gracefully, but raised: {e}")
@@ -175,11 +177,11 @@ class TestFuzzySearch:
         """
         if not slang_data:
             return
-            
+        
         # Use the first term as search query
         if not slang_data[0].get('term'):
             return
-            
+        
         query = slang_data[0]['term'][:5]  # Use partial term for fuzzy matching
         
         try:
@@ -189,15 +191,15 @@ class TestFuzzySearch:
             if len(results) > 1:
                 scores = [result['score'] for result in results]
                 assert scores == sorted(scores, reverse=True), "Results should be sorted by score descending"
-                
+            
             # Property: All scores should be between 0 and 100
             for result in results:
                 assert 0 <= result['score'] <= 100, f"Score {result['score']} should be between 0 and 100"
-                
+        
         except Exception:
             # If fuzzywuzzy is not available, skip this test
             pytest.skip("fuzzywuzzy not available")
-
+    
     @given(st.text(min_size=1, max_size=20))
     def test_search_result_completeness(self, query):
         """
@@ -213,7 +215,7 @@ class TestFuzzySearch:
         
         if not slang_data:
             return
-            
+        
         try:
             results = search_slang(query, slang_data)
             
@@ -228,7 +230,7 @@ class TestFuzzySearch:
                 # Property: Fields should not be empty
                 assert entry['term'], "Term field should not be empty"
                 assert entry['translation'], "Translation field should not be empty"
-                
+        
         except Exception:
             # If fuzzywuzzy is not available, skip this test
             pytest.skip("fuzzywuzzy not available")
@@ -251,7 +253,7 @@ class TestBiryaniFiltering:
         """
         if not biryani_data:
             return
-            
+        
         # Ensure all entries have string values for area and vibe
         cleaned_data = []
         for spot in biryani_data:
@@ -260,7 +262,7 @@ class TestBiryaniFiltering:
         
         if not cleaned_data:
             return
-            
+        
         # Test with first spot's area and vibe as filters
         test_spot = cleaned_data[0]
         area_filter = test_spot.get('area')
@@ -268,7 +270,7 @@ class TestBiryaniFiltering:
         
         if not area_filter or not vibe_filter:
             return
-            
+        
         # Apply filters
         filtered_results = filter_biryani_spots(cleaned_data, area_filter, vibe_filter)
         
@@ -300,7 +302,7 @@ class TestCardRendering:
         """
         if not biryani_spots:
             return
-            
+        
         # Ensure all spots have required fields
         valid_spots = []
         for spot in biryani_spots:
@@ -311,7 +313,7 @@ class TestCardRendering:
         
         if not valid_spots:
             return
-            
+        
         # Property: Each spot should have all required fields for card rendering
         for spot in valid_spots:
             # Required fields for card display
@@ -356,7 +358,7 @@ class TestTimeConversion:
         """
         if not time_data:
             return
-            
+        
         # Test standard mode conversion
         standard_times = convert_time_format(time_data, 'standard')
         hyderabadi_times = convert_time_format(time_data, 'hyderabadi')
@@ -370,7 +372,7 @@ class TestTimeConversion:
             assert 'display_time' in entry, "Standard entry should have display_time"
             assert 'mode' in entry, "Standard entry should have mode"
             assert entry['mode'] == 'standard', "Standard entry should have correct mode"
-            
+        
         for entry in hyderabadi_times:
             assert 'display_time' in entry, "Hyderabadi entry should have display_time"
             assert 'mode' in entry, "Hyderabadi entry should have mode"
@@ -407,7 +409,7 @@ class TestResponsiveLayout:
             expected_columns = 2  # Typically 2 columns for tablet
         else:
             expected_columns = 3  # 3+ columns for desktop
-            
+        
         assert expected_columns >= 1, "Should always have at least 1 column"
         assert expected_columns <= 4, "Should not exceed 4 columns for usability"
 
@@ -485,11 +487,1658 @@ class TestResponseTime:
                 
                 # Property: Function should return a valid result
                 assert result is not None, "Function should return a result"
-                
+            
             except ImportError:
                 # Skip if dependencies not available
                 continue
 
+class TestStreamingParser:
+    """
+    **Feature: hyderabad-culture-navigator, Property 12: Streaming parse equivalence**
+    **Validates: Requirements 5.2**
+    """
+    
+    def test_stream_matches_file_parse(self):
+        """
+        Property: Parsing product.md from any iterable of lines should produce
+        the same data as parsing the file by path
+        """
+        with open('product.md', 'r', encoding='utf-8') as f:
+            streamed = parse_product_stream(line for line in f)
+        
+        assert streamed == parse_product_data('product.md')
+    
+    @given(st.lists(st.text(alphabet='abcxyz ', min_size=1, max_size=10), min_size=1, max_size=20))
+    def test_rows_yielded_in_order(self, terms):
+        """
+        Property: Rows should be yielded one at a time, in file order, to the
+        handler of the section they belong to
+        """
+        lines = ["# Data\n", "## Lingo Section\n", "\n", "| Term |\n", "|---|\n"]
+        lines += [f"|{term}|\n" for term in terms]
+        lines += ["\n", "## Time Tables\n", "\n", "| Context |\n", "|---|\n", "|Late|\n"]
+        
+        received = {'Lingo Section': [], 'Time Tables': []}
+        handlers = {name: rows.append for name, rows in received.items()}
+        counts = parse_stream(iter(lines), handlers)
+        
+        assert [row['term'] for row in received['Lingo Section']] == [t.strip() for t in terms]
+        assert received['Time Tables'] == [{'context': 'Late'}]
+        assert counts == {'Lingo Section': len(terms), 'Time Tables': 1}
+
+class TestSnapshotCache:
+    """
+    **Feature: hyderabad-culture-navigator, Property 13: Snapshot cache consistency**
+    **Validates: Requirements 5.2**
+    """
+    
+    def test_snapshot_round_trip_and_invalidation(self):
+        """
+        Property: A compiled snapshot should reproduce the parsed data exactly,
+        be used while the source is unchanged and be rebuilt once it changes
+        """
+        import shutil
+        import snapshot
+        from dataset import build_indexes
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            source = os.path.join(temp_dir, 'product.md')
+            shutil.copy('product.md', source)
+            
+            first = snapshot.load_compiled_data(source, build_indexes=build_indexes)
+            assert os.path.exists(snapshot.snapshot_path(source))
+            
+            key = snapshot.snapshot_key(snapshot.source_digest(source))
+            cached = snapshot.read_snapshot(snapshot.snapshot_path(source), key)
+            assert cached == first
+            assert cached['slang_data'] == parse_product_data(source)['slang_data']
+            assert cached['indexes']['filter_stats']['total_spots'] == len(first['biryani_data'])
+            
+            # Changing the source must invalidate the old key
+            with open(source, 'a', encoding='utf-8') as f:
+                f.write("\n")
+            new_key = snapshot.snapshot_key(snapshot.source_digest(source))
+            assert snapshot.read_snapshot(snapshot.snapshot_path(source), new_key) is None
+            assert snapshot.load_compiled_data(source)['slang_data'] == first['slang_data']
+            assert snapshot.read_snapshot(snapshot.snapshot_path(source), new_key) is not None
+    
+    def test_unloadable_snapshot_is_rebuilt(self, monkeypatch):
+        """
+        Property: A snapshot whose classes no longer exist should be treated as
+        stale and rebuilt from the source instead of failing the load
+        """
+        import shutil
+        import snapshot
+        
+        class Renamed:
+            pass
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            source = os.path.join(temp_dir, 'product.md')
+            shutil.copy('product.md', source)
+            path = snapshot.snapshot_path(source)
+            key = snapshot.snapshot_key(snapshot.source_digest(source))
+            
+            Renamed.__module__, Renamed.__qualname__ = 'snapshot', 'Renamed'
+            monkeypatch.setattr(snapshot, 'Renamed', Renamed, raising=False)
+            snapshot.write_snapshot(path, key, {'slang_data': [Renamed()]})
+            monkeypatch.delattr(snapshot, 'Renamed')
+            
+            assert snapshot.read_snapshot(path, key) is None
+            data = snapshot.load_compiled_data(source)
+            assert data['slang_data'] == parse_product_data(source)['slang_data']
+            assert snapshot.read_snapshot(path, key) == data
+
+class TestHotReload:
+    """
+    **Feature: hyderabad-culture-navigator, Property 14: Hot reload consistency**
+    **Validates: Requirements 5.2**
+    """
+    
+    def test_reload_reparses_only_changed_sections(self):
+        """
+        Property: Editing one section should publish a new version in which only
+        that section (and its indexes) was rebuilt, while versions already handed
+        out stay unchanged
+        """
+        import shutil
+        from dataset import DataStore
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            source = os.path.join(temp_dir, 'product.md')
+            shutil.copy('product.md', source)
+            
+            store = DataStore(source)
+            old = store.load()
+            assert old.version == 1
+            assert not store.reload_if_changed()
+            
+            with open(source, 'r', encoding='utf-8') as f:
+                content = f.read()
+            content = content.replace("|Paradise|Secunderabad|Traditional|", "|Paradise|Secunderabad|Iconic|")
+            with open(source, 'w', encoding='utf-8') as f:
+                f.write(content)
+            os.utime(source, ns=(0, 0))
+            
+            assert store.reload_if_changed()
+            new = store.current
+            
+            assert new.version == old.version + 1
+            assert new.slang_data is old.slang_data
+            assert new.time_data is old.time_data
+            assert new.biryani_data is not old.biryani_data
+            assert new.biryani_data[0]['vibe'] == 'Iconic'
+            assert old.biryani_data[0]['vibe'] == 'Traditional'
+            assert new.indexes['filter_stats']['vibe_counts'] != old.indexes['filter_stats']['vibe_counts']
+            assert new.biryani_data == tuple(parse_product_data(source)['biryani_data'])
+
+class TestCompactRecords:
+    """
+    **Feature: hyderabad-culture-navigator, Property 15: Compact record equivalence**
+    **Validates: Requirements 1.2, 2.3, 3.3**
+    """
+    
+    def test_records_behave_like_rows(self):
+        """
+        Property: Compact records should hold the same values as row dictionaries,
+        share interned categorical values, and give identical search, filter and
+        time conversion results
+        """
+        from records import Record
+        
+        rows = parse_product_data('product.md')
+        records = parse_product_data('product.md', compact=True)
+        
+        for key in rows:
+            assert all(isinstance(record, Record) for record in records[key])
+            assert [record.to_dict() for record in records[key]] == rows[key]
+        
+        charminar = [spot for spot in records['biryani_data'] if spot['area'] == 'Charminar']
+        assert len(charminar) > 1
+        assert all(spot.area is charminar[0].area for spot in charminar)
+        
+        assert filter_biryani_spots(records['biryani_data'], 'charminar') == \
+            filter_biryani_spots(rows['biryani_data'], 'charminar')
+        assert convert_time_format(records['time_data'], 'hyderabadi') == \
+            convert_time_format(rows['time_data'], 'hyderabadi')
+        
+        compact_results = search_slang('nakko', records['slang_data'])
+        dict_results = search_slang('nakko', rows['slang_data'])
+        assert [(r['entry'].to_dict(), r['score']) for r in compact_results] == \
+            [(r['entry'], r['score']) for r in dict_results]
+
+class TestTableSchemas:
+    """
+    **Feature: hyderabad-culture-navigator, Property 16: Schema typing**
+    **Validates: Requirements 1.1, 2.1, 3.1, 5.3**
+    """
+    
+    def test_declared_columns_are_typed_and_rejections_reported(self):
+        """
+        Property: Declared columns should be converted by their schema, and rows
+        that violate it should be reported with their line numbers
+        """
+        from parser import ParseReport
+        
+        content = (
+            "## Biryani Spots\n"
+            "\n"
+            "| Name | Area | Vibe | Description | Rating |\n"
+            "|---|---|---|---|---|\n"
+            "| 42 | Abids | Local | Numeric name | 4 |\n"
+            "| Bad | Abids | Local | Bad rating | 4-2 |\n"
+            "| | Abids | Local | No name | 4.1 |\n"
+            "| Unrated | Abids | Local | | |\n"
+        )
+        report = ParseReport()
+        rows = [row for _, row in iter_markdown_tables(content.splitlines(True), ['Biryani Spots'], report=report)]
+        
+        assert rows == [
+            {'name': '42', 'area': 'Abids', 'vibe': 'Local', 'description': 'Numeric name', 'rating': 4.0},
+            {'name': 'Unrated', 'area': 'Abids', 'vibe': 'Local', 'description': '', 'rating': None}
+        ]
+        assert [row.line_number for row in report.rejected] == [6, 7]
+        assert filter_biryani_spots(rows, 'abids')[0]['name'] == '42'
+    
+    def test_usage_quotes_are_normalized(self):
+        """
+        Property: Triple-quoted usage examples should be unwrapped to plain quotes
+        """
+        slang = {entry['term']: entry for entry in parse_product_data('product.md')['slang_data']}
+        assert slang['Nakko']['usage'] == '"Nakko re, I don\'t want"'
+        assert slang['Baigan']['usage'] == '"Baigan ka bharta" or "Yeh sab baigan hai"'
+    
+    @given(st.lists(st.integers(min_value=-1000, max_value=1000), min_size=1, max_size=30))
+    def test_undeclared_tables_infer_types(self, numbers):
+        """
+        Property: Tables without a schema should infer column types from a sample
+        """
+        content = "## Scores\n\n| Player | Score |\n|---|---|\n"
+        content += "".join(f"| p{i} | {n} |\n" for i, n in enumerate(numbers))
+        rows = parse_markdown_table(content, "Scores")
+        
+        assert [row['score'] for row in rows] == numbers
+        assert all(isinstance(row['player'], str) for row in rows)
+
+class TestRowTokenizer:
+    """
+    **Feature: hyderabad-culture-navigator, Property 17: Quote-aware row tokenizing**
+    **Validates: Requirements 1.1, 2.1, 5.3**
+    """
+    
+    def test_bundled_data_parses_every_row(self):
+        """
+        Property: Every row of product.md should parse, including quoted cells
+        that contain pipes
+        """
+        from parser import ParseReport
+        
+        report = ParseReport()
+        data = parse_product_data('product.md', report=report)
+        
+        assert report.rejected == []
+        slang = {entry['term']: entry for entry in data['slang_data']}
+        spots = {spot['name']: spot for spot in data['biryani_data']}
+        assert slang['Mamu']['usage'] == '"Kya mamu| party kab hai?"'
+        assert spots['Antera']['description'] == 'Best of Andhra| TG| and Rayalaseema'
+        assert spots['Antera']['rating'] == 4.4
+    
+    @given(st.lists(st.text(alphabet='ab |"\\', max_size=8), min_size=1, max_size=5))
+    def test_quoted_cells_round_trip(self, values):
+        """
+        Property: Any cell text without an escaped pipe, written as a quoted cell
+        (doubled quotes, optionally spaced from its pipes), should tokenize back
+        to the same text
+        """
+        from parser import RowTokenizer
+        
+        assume(not any('\\|' in value for value in values))
+        quoted = ('"' + value.replace('"', '""') + '"' for value in values)
+        tokenizer = RowTokenizer()
+        assert tokenizer.split('|' + '|'.join(quoted) + '|')[:-1] == values
+        
+        quoted = (' "' + value.replace('"', '""') + '"' for value in values)
+        assert tokenizer.split('|' + '|'.join(quoted) + '|')[:-1] == values
+    
+    def test_escaped_pipes_and_fallback(self):
+        """
+        Property: Escaped pipes should stay inside their cell, and an unterminated
+        quote should not swallow the rest of the row
+        """
+        from parser import RowTokenizer
+        
+        tokenizer = RowTokenizer()
+        assert tokenizer.split(r'| a\|b | c |')[:-1] == ['a|b ', 'c ']
+        assert tokenizer.split('|"open| c |')[:-1] == ['"open', ' c ']
+        assert tokenizer.split('| x | y |')[:-1] == ['x ', 'y ']
+    
+    def test_spaced_quotes_and_backslashes(self):
+        """
+        Property: A quoted cell may be spaced from its pipes, and backslashes
+        other than before a pipe are kept as written
+        """
+        from parser import RowTokenizer
+        
+        tokenizer = RowTokenizer()
+        cells = tokenizer.split('| Lite lo | Ignore it | Attitude | "Traffic bahut hai| lite lo" |')
+        assert [cell.strip() for cell in cells[:-1]] == \
+               ['Lite lo', 'Ignore it', 'Attitude', 'Traffic bahut hai| lite lo']
+        assert tokenizer.split(r'| C:\temp\new | "a\b" | x\|y |')[:-1] == ['C:\\temp\\new ', 'a\\b ', 'x|y ']
+        
+        # Quotes that would merge cells of a known-width row are literal
+        assert tokenizer.split('| 0 | " | " |', 3)[:-1] == [' 0 ', ' " ', ' " ']
+        assert tokenizer.split('| 0 | "a | b" |', 2)[:-1] == ['0 ', 'a | b ']
+
+class TestShardedSources:
+    """
+    **Feature: hyderabad-culture-navigator, Property 18: Sharded source merging**
+    **Validates: Requirements 5.2**
+    """
+    
+    def write_shards(self, directory):
+        shards = {
+            'a.md': "## Lingo Section\n\n| Term | Translation | Category | Usage |\n|---|---|---|---|\n"
+                    "|Nakko|No|Expression|x|\n|Hau|Yes|Expression|y|\n",
+            'b.md': "## Lingo Section\n\n| Term | Translation | Category | Usage |\n|---|---|---|---|\n"
+                    "|nakko|No way|Expression|z|\n\n## Biryani Spots\n\n"
+                    "| Name | Area | Vibe | Description | Rating |\n|---|---|---|---|---|\n"
+                    "|Paradise|Secunderabad|Traditional|Classic|4.2|\n",
+            'notes.txt': "## Lingo Section\n\n| Term |\n|---|\n|Ignored|\n"
+        }
+        for name, content in shards.items():
+            with open(os.path.join(directory, name), 'w', encoding='utf-8') as f:
+                f.write(content)
+    
+    def test_parallel_parse_merges_and_dedupes(self):
+        """
+        Property: Parsing a directory of shards in parallel should merge their
+        sections in order, later shards overriding duplicates, and time each shard
+        """
+        from parser import parse_sources
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            self.write_shards(temp_dir)
+            timings = []
+            data = parse_sources(temp_dir, max_workers=2, timings=timings)
+            
+            assert [(e['term'], e['translation']) for e in data['slang_data']] == [('nakko', 'No way'), ('Hau', 'Yes')]
+            assert [spot['name'] for spot in data['biryani_data']] == ['Paradise']
+            assert [os.path.basename(t['path']) for t in timings] == ['a.md', 'b.md']
+            assert all(t['seconds'] >= 0 for t in timings)
+            
+            assert parse_product_data(os.path.join(temp_dir, '*.md')) == data
+            undeduped = parse_sources(temp_dir, max_workers=1, dedupe_keys={})
+            assert len(undeduped['slang_data']) == 3
+    
+    def test_store_reparses_only_changed_shards(self):
+        """
+        Property: Reloading a sharded source should re-parse only changed shards
+        """
+        from dataset import DataStore
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            self.write_shards(temp_dir)
+            store = DataStore(temp_dir, max_workers=1)
+            first = store.load()
+            assert len(first.slang_data) == 2
+            
+            with open(os.path.join(temp_dir, 'c.md'), 'w', encoding='utf-8') as f:
+                f.write("## Time Tables\n\n| Standard Time | Hyderabadi Time | Context |\n|---|---|---|\n"
+                        "| 4:00 PM | \"Chai time\" | Tea time |\n")
+            assert store.reload_if_changed()
+            second = store.current
+            
+            assert len(second.time_data) == 1
+            assert second.slang_data == first.slang_data
+            assert second.shards[:2] == first.shards and second.shards[0] is first.shards[0]
+            assert [os.path.basename(shard['path']) for shard in second.describe()['shards']] == ['a.md', 'b.md', 'c.md']
+            assert not store.reload_if_changed()
+
+class TestLazyLoading:
+    """
+    **Feature: hyderabad-culture-navigator, Property 19: Lazy section loading**
+    **Validates: Requirements 5.2**
+    """
+    
+    def test_sections_parse_on_first_access(self):
+        """
+        Property: A lazy store should parse each section only when first used,
+        and end up with the same data and indexes as an eager store
+        """
+        from dataset import DataStore
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, 'product.md')
+            with open('product.md', encoding='utf-8') as src, open(file_path, 'w', encoding='utf-8') as dst:
+                dst.write(src.read())
+            
+            lazy = DataStore(file_path, lazy=True).load()
+            assert not any(lazy.is_loaded(key) for key in ('slang_data', 'biryani_data', 'time_data'))
+            assert lazy.describe()['sections']['time_data'] is None
+            
+            assert len(lazy.time_data) == 8
+            assert lazy.is_loaded('time_data') and not lazy.is_loaded('slang_data')
+            
+            eager = DataStore(file_path).load()
+            assert lazy.slang_data == eager.slang_data
+            assert lazy.index('filter_stats') == eager.indexes['filter_stats']
+    
+    def test_concurrent_first_access_parses_once(self):
+        """
+        Property: Concurrent first requests for a section should parse it once
+        and all see the same rows
+        """
+        import threading
+        from dataset import DataVersion
+        
+        calls = []
+        
+        def loader(section_key):
+            calls.append(section_key)
+            time.sleep(0.05)
+            return ({'term': 'Nakko'},)
+        
+        version = DataVersion(1, {}, {}, loader=loader)
+        seen = []
+        threads = [threading.Thread(target=lambda: seen.append(version.slang_data)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert calls == ['slang_data']
+        assert len(seen) == 8 and all(rows is seen[0] for rows in seen)
+    
+    def test_reload_keeps_unloaded_sections_lazy(self):
+        """
+        Property: Reloading a lazy store should reuse loaded, unchanged sections
+        and leave the rest to load on first access
+        """
+        from dataset import DataStore
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, 'product.md')
+            with open('product.md', encoding='utf-8') as src:
+                content = src.read()
+            with open(file_path, 'w', encoding='utf-8') as dst:
+                dst.write(content)
+            
+            store = DataStore(file_path, lazy=True)
+            first = store.load()
+            biryani = first.biryani_data
+            
+            with open(file_path, 'w', encoding='utf-8') as dst:
+                dst.write(content.replace('| 9:00 AM | "Subah subah" |', '| 7:00 AM | "Subah subah" |'))
+            os.utime(file_path, ns=(time.time_ns() + 10**9,) * 2)
+            assert store.reload_if_changed()
+            
+            second = store.current
+            assert second.biryani_data is biryani
+            assert not second.is_loaded('time_data')
+            assert second.time_data[0]['standard_time'] == '7:00 AM'
+
+class TestSQLiteBackend:
+    """
+    **Feature: hyderabad-culture-navigator, Property 20: SQLite backend parity**
+    **Validates: Requirements 1.2, 2.2**
+    """
+    
+    @pytest.fixture
+    def store(self):
+        from dataset import DataStore
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, 'product.md')
+            with open('product.md', encoding='utf-8') as src, open(file_path, 'w', encoding='utf-8') as dst:
+                dst.write(src.read())
+            store = DataStore(file_path)
+            store.load()
+            yield store, os.path.join(temp_dir, 'product.sqlite')
+    
+    def test_queries_match_memory_backend(self, store):
+        """
+        Property: Indexed slang search and biryani filtering should return the
+        same results as the in-memory backend
+        """
+        from sqlite_backend import SQLiteBackend
+        from search import fold
+        
+        store, db_path = store
+        data = store.current
+        backend = SQLiteBackend(db_path, pool_size=2)
+        try:
+            corpus = data.index('slang_corpus')
+            rng = random.Random(9)
+            words = [word for entry in data.slang_data for word in entry['usage'].split()]
+            queries = ['chai', 'zabardast', 'ek', 'xyzzy', '', 'de Hand', 'Kaiku?']
+            queries += [' '.join(rng.sample(words, rng.randint(1, 2)))[rng.randint(0, 2):] for _ in range(150)]
+            for query in queries:
+                assert backend.slang_candidates(data, query, limit=10) == \
+                       corpus.index.candidates(fold(query), limit=10)
+                for threshold in (40, 60):
+                    expected = corpus.search(query, threshold=threshold, limit=10)
+                    assert backend.search_slang(data, query, threshold=threshold, limit=10) == expected
+            
+            for area, vibe in [('charminar', None), (None, 'HERITAGE'), ('Abids', 'budget'), (None, None)]:
+                expected = filter_biryani_spots(data.biryani_data, area, vibe)
+                assert [spot['name'] for spot in backend.filter_biryani(data, area, vibe)] == \
+                       [spot['name'] for spot in expected]
+            
+            for query in [SpotQuery(['charminar', 'Abids']), SpotQuery(exclude_areas=['Jubilee Hills'], min_rating=4.3),
+                          SpotQuery(vibes='heritage', max_rating=4.2), SpotQuery(min_rating=4.5, max_rating=4.0)]:
+                expected = filter_biryani_spots(data.biryani_data, query=query)
+                assert [spot['name'] for spot in backend.filter_biryani(data, query=query)] == \
+                       [spot['name'] for spot in expected]
+            
+            # Description words go through the FTS table and must match the in-memory word split
+            words = [word for spot in data.biryani_data for word in spot['description'].split()]
+            texts = ['BIRYANI', 'biryání', 'xyzzy', '"quoted"'] + [' '.join(rng.sample(words, rng.randint(1, 2)))
+                                                                  for _ in range(40)]
+            for text in texts:
+                query = SpotQuery(min_rating=4.0, text=text)
+                expected = filter_biryani_spots(data.biryani_data, query=query)
+                assert [spot['name'] for spot in backend.filter_biryani(data, query=query)] == \
+                       [spot['name'] for spot in expected]
+        finally:
+            backend.close()
+    
+    def test_database_follows_data_version(self, store):
+        """
+        Property: The database should be reused for the same source and
+        recompiled when a new data version is published
+        """
+        from sqlite_backend import SQLiteBackend
+        
+        store, db_path = store
+        backend = SQLiteBackend(db_path)
+        backend.sync(store.current)
+        compiled_at = os.stat(db_path).st_mtime_ns
+        backend.close()
+        
+        backend = SQLiteBackend(db_path)
+        backend.sync(store.current)
+        assert os.stat(db_path).st_mtime_ns == compiled_at
+        previous = store.current
+        store.add_publish_hook(backend.sync)
+        
+        with open(store.file_path, encoding='utf-8') as f:
+            content = f.read()
+        with open(store.file_path, 'w', encoding='utf-8') as f:
+            f.write(content.replace('|Paradise|Secunderabad|', '|Paradise Grand|Secunderabad|'))
+        os.utime(store.file_path, ns=(time.time_ns() + 10**9,) * 2)
+        assert store.reload_if_changed()
+        
+        # The publish hook compiled the new version before any request used it
+        compiled_at = os.stat(db_path).st_mtime_ns
+        names = [spot['name'] for spot in backend.filter_biryani(store.current, 'Secunderabad')]
+        assert 'Paradise Grand' in names
+        # A request still holding the previous version is served without recompiling
+        assert backend.filter_biryani(previous, 'Secunderabad')
+        assert backend.search_slang(previous, 'chai') == previous.index('slang_corpus').search('chai')
+        assert os.stat(db_path).st_mtime_ns == compiled_at
+        backend.close()
+
+class TestTrigramIndex:
+    """
+    **Feature: hyderabad-culture-navigator, Property 21: Trigram candidate pruning**
+    **Validates: Requirements 1.2**
+    """
+    
+    @pytest.fixture(scope='class')
+    def slang_data(self):
+        return parse_product_data('product.md')['slang_data']
+    
+    @given(query=st.text(alphabet='abcdehiklmnorstuyz -', min_size=1, max_size=10),
+           threshold=st.sampled_from([40, 60, 80]),
+           limit=st.integers(min_value=1, max_value=20))
+    @settings(max_examples=40, deadline=None)
+    def test_indexed_search_matches_full_scan(self, slang_data, query, threshold, limit):
+        """
+        Property: Searching through the trigram index should return exactly the
+        results of scoring every entry
+        """
+        from search import TrigramIndex
+        # A blank query returns every entry whatever the limit
+        assume(query.strip())
+        
+        index = TrigramIndex(slang_data)
+        expected = search_slang(query, slang_data, threshold=threshold, limit=len(slang_data))
+        results = search_slang(query, slang_data, threshold=threshold, limit=limit, index=index)
+        assert results == expected[:limit]
+    
+    def test_matches_sharing_no_trigram_are_found(self):
+        """
+        Property: Entries sharing no trigram with the query but scoring above
+        the threshold should still be returned
+        """
+        from search import SearchCorpus
+        
+        corpus = SearchCorpus(parse_product_data('product.md')['slang_data'])
+        for query, term, score in [('abcd', 'Abich', 75), ('ek number', 'Ek-dum', 67), ('hungry', 'Chindi', 67)]:
+            results = corpus.search(query)
+            assert (term, score) in [(r['entry']['term'], r['score']) for r in results]
+            assert results == corpus.search(query, exact=True)
+    
+    def test_candidates_prune_and_short_queries_scan(self, slang_data):
+        """
+        Property: Short queries should have no candidates, while a longer
+        query's candidates should share a trigram with it, the best matches
+        first and no more than the candidate limit
+        """
+        from search import TrigramIndex, candidate_limit, trigrams
+        
+        index = TrigramIndex(slang_data)
+        assert index.candidates('ek') is None
+        
+        positions = index.candidates('bindaas')
+        assert 0 < len(positions) < len(slang_data)
+        assert slang_data[positions[0]]['term'] == 'Bindaas'
+        
+        # Repeating the corpus makes every candidate list longer than the limit
+        many = slang_data * (candidate_limit(1) // len(positions) + 2)
+        index = TrigramIndex(many)
+        positions = index.candidates('bindaas', limit=1)
+        assert len(positions) == candidate_limit(1)
+        shared = [len(trigrams('bindaas') & set().union(*(trigrams(many[p].get(field, '').lower())
+                                                        for field in ('term', 'translation', 'category', 'usage'))))
+                  for p in positions]
+        assert shared == sorted(shared, reverse=True) and shared[-1] > 0
+
+class TestSearchCorpus:
+    """
+    **Feature: hyderabad-culture-navigator, Property 22: Prepared search corpus**
+    **Validates: Requirements 1.2, 1.4**
+    """
+    
+    @pytest.fixture(scope='class')
+    def corpus(self):
+        from search import SearchCorpus
+        return SearchCorpus(parse_product_data('product.md')['slang_data'])
+    
+    @given(query=st.text(alphabet='abcdehiklmnorstuyz -', min_size=1, max_size=10))
+    @settings(max_examples=30, deadline=None)
+    def test_single_pass_breakdown(self, corpus, query):
+        """
+        Property: Each result's score should be its best field score, the match
+        field should be that field, and the index should not change results
+        """
+        from search import fold, normalize_key, phonetic_key
+        assume(fold(query))
+        # Lookup hits are exact matches by design and skip the fuzzy pass
+        assume(normalize_key(query) not in corpus.exact and phonetic_key(query) not in corpus.phonetic)
+        
+        results = corpus.search(query, threshold=50, limit=100)
+        for result in results:
+            assert result['score'] == max(result['scores'].values())
+            assert result['scores'][result['match_field']] == result['score']
+        
+        # The index only orders which entries are scored first, never the results
+        assert results == corpus.search(query, threshold=50, limit=100, exact=True)
+    
+    def test_transliteration_folding(self, corpus):
+        """
+        Property: Common spelling variants should match the same term exactly
+        """
+        for query in ['nako', 'jabardast', 'JHAKAAS', 'zabardast']:
+            best = corpus.search(query, threshold=90, limit=1)[0]
+            assert best['score'] == 100 and best['match_field'] == 'term'
+    
+    def test_field_weights(self, corpus):
+        """
+        Property: Down-weighting a field should lower scores won on that field
+        without another scoring pass changing the raw breakdown
+        """
+        plain = {r['entry']['term']: r for r in corpus.search('chai', threshold=0, limit=100)}
+        weighted = {r['entry']['term']: r for r in corpus.search('chai', threshold=0, limit=100,
+                                                                 weights={'usage': 0.5})}
+        
+        for term, result in weighted.items():
+            assert result['scores'] == plain[term]['scores']
+            assert result['score'] <= plain[term]['score']
+        assert weighted['Maaro']['score'] < plain['Maaro']['score']
+
+class TestScorerBackends:
+    """
+    **Feature: hyderabad-culture-navigator, Property 23: Scorer backend parity**
+    **Validates: Requirements 1.2, 1.4**
+    """
+    
+    PARITY_QUERIES = ['nakko', 'chai', 'biryani', 'bindas', 'cool', 'ustad', 'time', 'hyderabad',
+                      'slowly', 'yes', 'kya', 'xyz', 'mama', 'irani chai', 'dum']
+    
+    @given(query=st.text(min_size=1, max_size=12), choice=st.text(max_size=40))
+    def test_reference_scores_are_bounded(self, query, choice):
+        """
+        Property: Reference scores should be 0-100, symmetric for ratio, and
+        partial_ratio should never be below ratio
+        """
+        from scoring import ratio, partial_ratio
+        
+        assert 0 <= ratio(query, choice) <= partial_ratio(query, choice) <= 100
+        assert ratio(query, choice) == ratio(choice, query)
+        assert ratio(query, query) == 100
+    
+    def test_backends_agree_on_top_k(self):
+        """
+        Property: The reference and accelerated scorers should produce the same
+        top-k results for a fixed query set
+        """
+        pytest.importorskip('rapidfuzz')
+        from scoring import ReferenceScorer, RapidFuzzScorer
+        from search import SearchCorpus
+        
+        corpus = SearchCorpus(parse_product_data('product.md')['slang_data'])
+        for query in self.PARITY_QUERIES:
+            reference = corpus.search(query, threshold=40, limit=10, exact=True, scorer=ReferenceScorer())
+            accelerated = corpus.search(query, threshold=40, limit=10, exact=True, scorer=RapidFuzzScorer())
+            assert [(r['entry']['term'], r['score'], r['scores']) for r in reference] == \
+                   [(r['entry']['term'], r['score'], r['scores']) for r in accelerated]
+    
+    @given(query=st.text(alphabet='abcde ', min_size=1, max_size=8),
+           choices=st.lists(st.text(alphabet='abcde ', max_size=30), max_size=8))
+    def test_backends_agree_on_scores(self, query, choices):
+        """
+        Property: Both scorers should give identical scores for any column
+        """
+        pytest.importorskip('rapidfuzz')
+        from scoring import ReferenceScorer, RapidFuzzScorer
+        
+        reference, accelerated = ReferenceScorer(), RapidFuzzScorer()
+        assert reference.ratio(query, choices) == accelerated.ratio(query, choices)
+        assert reference.partial_ratio(query, choices) == accelerated.partial_ratio(query, choices)
+        
+        # With a cutoff, scores reaching it stay exact and the others may drop to 0
+        for cutoff in (40, 60, 85, 100):
+            for method in ('ratio', 'partial_ratio'):
+                exact = getattr(reference, method)(query, choices)
+                cut = getattr(accelerated, method)(query, choices, score_cutoff=cutoff)
+                assert all(b == a if a >= cutoff else b in (0, a) for a, b in zip(exact, cut))
+
+class TestTopKSelection:
+    """
+    **Feature: hyderabad-culture-navigator, Property 24: Bounded top-k selection**
+    **Validates: Requirements 1.2, 1.4**
+    """
+    
+    @pytest.fixture(scope='class')
+    def corpus(self):
+        from search import SearchCorpus
+        return SearchCorpus(parse_product_data('product.md')['slang_data'])
+    
+    @given(query=st.text(alphabet='abcdehiklmnorstuyz -', min_size=1, max_size=10),
+           threshold=st.sampled_from([0, 40, 70]),
+           limit=st.integers(min_value=0, max_value=60))
+    @settings(max_examples=40, deadline=None)
+    def test_top_k_matches_full_sort(self, corpus, query, threshold, limit):
+        """
+        Property: Heap selection should return exactly the first ``limit``
+        results of scoring every candidate and sorting, and account for every
+        entry as either scored or pruned
+        """
+        from search import fold, normalize_key, phonetic_key, score_columns
+        assume(fold(query))
+        # Exact and phonetic lookup hits are exact matches rather than fuzzy ones
+        assume(normalize_key(query) not in corpus.exact and phonetic_key(query) not in corpus.phonetic)
+        
+        rows = score_columns(fold(query), [list(column) for column in zip(*corpus.fields)])
+        expected = [(score, position) for position, (score, _, _) in enumerate(rows) if score >= threshold]
+        expected.sort(key=lambda item: -item[0])
+        
+        stats = {}
+        results = corpus.search(query, threshold=threshold, limit=limit, stats=stats)
+        assert [(r['score'], corpus.entries.index(r['entry'])) for r in results] == expected[:limit]
+        assert stats['scored'] + stats['pruned'] == len(corpus)
+    
+    @given(query=st.text(alphabet='abcdehiklmnorstuyz -', min_size=1, max_size=10),
+           entry=st.fixed_dictionaries({field: st.text(alphabet='abcdehiklmnorstuyz -', max_size=30)
+                                        for field in ('term', 'translation', 'category', 'usage')}),
+           weights=st.none() | st.fixed_dictionaries({'term': st.sampled_from([0.5, 1.0, 2.0]),
+                                                      'usage': st.sampled_from([0.0, 0.8, 1.5])}))
+    @settings(max_examples=100, deadline=None)
+    def test_bounds_never_below_scores(self, query, entry, weights):
+        """
+        Property: An entry's score bound should never be below its real
+        weighted score, with or without NumPy
+        """
+        import search
+        from scoring import ReferenceScorer
+        from search import INDEXED_FIELDS, ScoreBounds, field_shapes, fold, score_columns
+        assume(fold(query))
+        
+        fields = [tuple(fold(entry[field]) for field in INDEXED_FIELDS)]
+        [(score, _, _)] = score_columns(fold(query), [list(column) for column in zip(*fields)],
+                                        weights, ReferenceScorer())
+        shapes = field_shapes(fields)
+        assert ScoreBounds(fold(query), *shapes, weights).filter([0], score) == [0]
+        
+        numpy, search.numpy = search.numpy, None
+        try:
+            assert ScoreBounds(fold(query), *shapes, weights).filter([0], score) == [0]
+        finally:
+            search.numpy = numpy
+    
+    def test_bounds_prune_without_losing_results(self, corpus):
+        """
+        Property: Entries whose bound cannot reach the threshold should be
+        pruned without scoring, and the results should match scoring every entry
+        """
+        from search import fold, normalize_key, score_columns
+        query = 'jazz'
+        assert normalize_key(query) not in corpus.exact
+        
+        rows = score_columns(fold(query), [list(column) for column in zip(*corpus.fields)])
+        expected = sorted(((score, position) for position, (score, _, _) in enumerate(rows) if score >= 60),
+                          key=lambda item: -item[0])
+        
+        stats = {}
+        results = corpus.search(query, threshold=60, limit=3, exact=True, stats=stats)
+        assert [(r['score'], corpus.entries.index(r['entry'])) for r in results] == expected[:3]
+        assert stats['pruned'] > 0
+
+class TestBKTreeSuggestions:
+    """
+    **Feature: hyderabad-culture-navigator, Property 25: Edit-distance suggestions**
+    **Validates: Requirements 1.3**
+    """
+    
+    @pytest.fixture(scope='class')
+    def slang_data(self):
+        return parse_product_data('product.md')['slang_data']
+    
+    @given(a=st.text(alphabet='abcd', max_size=12), b=st.text(alphabet='abcde', max_size=12))
+    @settings(max_examples=100, deadline=None)
+    def test_levenshtein_matches_dynamic_programming(self, a, b):
+        """
+        Property: The bit-parallel edit distance should equal the textbook
+        dynamic programming distance
+        """
+        from scoring import levenshtein
+        previous = list(range(len(b) + 1))
+        for i, char_a in enumerate(a, 1):
+            current = [i]
+            for j, char_b in enumerate(b, 1):
+                current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+            previous = current
+        assert levenshtein(a, b) == previous[-1]
+    
+    @given(query=st.text(alphabet='abdeiklmnorstuy', min_size=1, max_size=10),
+           limit=st.integers(min_value=1, max_value=8),
+           max_distance=st.integers(min_value=0, max_value=5))
+    @settings(max_examples=50, deadline=None)
+    def test_tree_matches_linear_scan(self, slang_data, query, limit, max_distance):
+        """
+        Property: The BK-tree should return the same closest terms as measuring
+        the distance to every term, closest first and ties in source order
+        """
+        from search import BKTree, fold
+        from scoring import levenshtein
+        assume(fold(query))
+        
+        tree = BKTree(slang_data)
+        words, terms = [], {}
+        for entry in slang_data:
+            word = fold(entry['term'])
+            if word not in terms:
+                words.append(word)
+                terms[word] = []
+            if entry['term'] not in terms[word]:
+                terms[word].append(entry['term'])
+        
+        ranked = sorted((levenshtein(fold(query), word), order, word) for order, word in enumerate(words))
+        expected = [(distance, term) for distance, _, word in ranked if distance <= max_distance
+                    for term in terms[word]][:limit]
+        assert tree.closest(query, limit=limit, max_distance=max_distance) == expected
+    
+    def test_suggestions_use_tree(self, slang_data):
+        """
+        Property: A misspelt term should be suggested without visiting every
+        node, and nothing should be suggested beyond the maximum distance
+        """
+        from search import BKTree
+        tree = BKTree(slang_data)
+        
+        stats = {}
+        assert tree.closest('zabrdast', limit=1, max_distance=2, stats=stats) == [(1, 'Zabardast')]
+        assert stats['visited'] < len(tree)
+        assert get_search_suggestions('zabrdast', slang_data, tree=tree, max_distance=0) == []
+        assert 'Zabardast' in get_search_suggestions('zabrdast', slang_data, tree=tree)
+
+class TestAutocomplete:
+    """
+    **Feature: hyderabad-culture-navigator, Property 26: Prefix autocomplete**
+    **Validates: Requirements 1.1, 1.2**
+    """
+    
+    @pytest.fixture(scope='class')
+    def slang_data(self):
+        return parse_product_data('product.md')['slang_data']
+    
+    @given(data=st.data(), limit=st.integers(min_value=0, max_value=12))
+    @settings(max_examples=50, deadline=None)
+    def test_completions_match_key_scan(self, slang_data, data, limit):
+        """
+        Property: Completing a folded prefix should return the same entries as
+        scanning every key for the prefix, ranked by score then source order
+        """
+        from autocomplete import SlangAutocomplete, MAX_COMPLETIONS, completion_keys, completion_score
+        trie = SlangAutocomplete(slang_data)
+        
+        keys = [(key, completion_score(entry, field), position)
+                for position, entry in enumerate(slang_data) for key, field in completion_keys(entry)]
+        key = data.draw(st.sampled_from([key for key, _, _ in keys]))
+        prefix = key[:data.draw(st.integers(min_value=1, max_value=len(key)))]
+        # Skip prefixes ending halfway through a transliteration pair, which also match the whole pair
+        assume(prefix[-1] not in 'epo')
+        
+        best = {}
+        for candidate, score, position in keys:
+            if candidate.startswith(prefix):
+                best[position] = max(score, best.get(position, -1))
+        expected = sorted(best.items(), key=lambda item: (-item[1], item[0]))[:min(limit, MAX_COMPLETIONS)]
+        
+        completions = trie.complete(prefix, limit=limit)
+        assert [(slang_data.index(c['entry']), c['score']) for c in completions] == expected
+    
+    def test_folded_and_partial_prefixes(self, slang_data):
+        """
+        Property: Prefixes should complete regardless of case, transliteration
+        variant or stopping halfway through a folded pair
+        """
+        from autocomplete import SlangAutocomplete
+        trie = SlangAutocomplete(slang_data)
+        
+        for prefix in ('Nak', 'nako', 'NAKKO', 'jabar'):
+            assert trie.complete(prefix, limit=1)[0]['entry']['term'] in ('Nakko', 'Zabardast')
+        assert trie.complete('', limit=5) == []
+        assert trie.complete('xq', limit=5) == []
+
+class TestPhoneticIndex:
+    """
+    **Feature: hyderabad-culture-navigator, Property 27: Phonetic spelling variants**
+    **Validates: Requirements 1.2, 1.3**
+    """
+    
+    @pytest.fixture(scope='class')
+    def corpus(self):
+        from search import SearchCorpus
+        return SearchCorpus(parse_product_data('product.md')['slang_data'])
+    
+    @pytest.mark.parametrize('spellings', [
+        ('nako', 'naako', 'nakko', 'NAKKO'),
+        ('kaiku', 'kayku', 'kaikoo', 'Kaiku?'),
+        ('khali peeli', 'kali-pili', 'Khali-peeli'),
+        ('jhakaas', 'jakas', 'Jhakaas'),
+    ])
+    def test_variants_share_a_key(self, spellings):
+        """
+        Property: Common romanized spellings of one word should encode to the
+        same phonetic key
+        """
+        from search import phonetic_key
+        assert len({phonetic_key(spelling) for spelling in spellings}) == 1
+    
+    @pytest.mark.parametrize('query,term', [('kayku', 'Kaiku?'), ('jakas', 'Jhakaas'), ('kali pili', 'Khali-peeli')])
+    def test_variant_ranks_first_as_phonetic_match(self, corpus, query, term):
+        """
+        Property: A phonetic variant of a term should be found by lookup and
+        ranked first, scoring at least PHONETIC_SCORE but never as an exact match
+        """
+        from search import PHONETIC_SCORE
+        
+        stats = {}
+        results = corpus.search(query, threshold=60, limit=1, stats=stats)
+        assert results[0]['entry']['term'] == term
+        assert PHONETIC_SCORE <= results[0]['score'] < 100
+        assert results[0]['scores']['phonetic'] == PHONETIC_SCORE
+        assert stats['lookup'] >= 1 and not stats['fast_path']
+        
+        assert corpus.search(query, limit=5)[0]['entry']['term'] == term
+    
+    def test_phonetic_collisions_rank_below_exact_matches(self, corpus):
+        """
+        Property: An English word sharing a term's phonetic key should report
+        that term as a phonetic match, below the exact translation matches
+        """
+        from search import PHONETIC_SCORE
+        
+        for query, term in [('what', 'Waat'), ('cat', 'Katt')]:
+            results = corpus.search(query, threshold=60, limit=10)
+            match = next(result for result in results if result['entry']['term'] == term)
+            assert (match['score'], match['match_field']) == (PHONETIC_SCORE, 'phonetic')
+            assert all(result['score'] == 100 for result in results[:results.index(match)])
+
+class TestExactLookup:
+    """
+    **Feature: hyderabad-culture-navigator, Property 28: Exact lookup fast path**
+    **Validates: Requirements 1.1, 1.2**
+    """
+    
+    @pytest.fixture(scope='class')
+    def corpus(self):
+        from search import SearchCorpus
+        return SearchCorpus(parse_product_data('product.md')['slang_data'])
+    
+    @given(index=st.integers(min_value=0, max_value=49),
+           decorate=st.sampled_from(['{}', '{}!', ' {} ', '"{}"', '{}?']),
+           upper=st.booleans())
+    @settings(max_examples=50, deadline=None)
+    def test_known_term_skips_fuzzy_scoring(self, corpus, index, decorate, upper):
+        """
+        Property: A known term pasted with any case or surrounding punctuation
+        should be answered by the fast path, with that term scoring 100
+        """
+        term = corpus.entries[index]['term']
+        query = decorate.format(term.upper() if upper else term)
+        
+        stats = {}
+        results = corpus.search(query, threshold=60, limit=10, stats=stats)
+        assert stats['fast_path']
+        assert stats['scored'] == stats['lookup'] == len(results)
+        assert any(r['entry'] is corpus.entries[index] and r['score'] == 100 for r in results)
+    
+    def test_translation_words_merge_ahead_of_fuzzy(self, corpus):
+        """
+        Property: A translation word should rank its entry first at 100 and
+        leave the remaining places to fuzzy results
+        """
+        stats = {}
+        results = corpus.search('eggplant', threshold=50, limit=5, stats=stats)
+        assert not stats['fast_path'] and stats['lookup'] == 1
+        assert (results[0]['entry']['term'], results[0]['score']) == ('Baigan', 100)
+        assert results[0]['match_field'] == 'translation' and len(results) == 5
+        
+        stats = {}
+        assert corpus.search('eggplant', threshold=50, limit=1, stats=stats)[0]['entry']['term'] == 'Baigan'
+        assert stats['fast_path']
+    
+    def test_shared_translation_word_scores_only_returned_hits(self):
+        """
+        Property: A translation word many entries share should be indexed once
+        per entry, and only the hits that can be returned should be scored
+        """
+        from search import SearchCorpus
+        
+        rows = [{'term': f'term{i}', 'translation': 'friend / friend', 'category': 'x', 'usage': str(i)}
+                for i in range(300)]
+        corpus = SearchCorpus(rows)
+        assert len(corpus.exact['friend']) == 300
+        
+        stats = {}
+        results = corpus.search('friend', threshold=60, limit=5, stats=stats)
+        assert stats['fast_path'] and stats['lookup'] == 300 and stats['scored'] == 5
+        assert [r['entry']['term'] for r in results] == [f'term{i}' for i in range(5)]
+        
+        # Weights can lift another field above a hit, so then every hit is scored
+        weighted = corpus.search('friend', threshold=60, limit=5, weights={'usage': 0.9}, stats=stats)
+        assert stats['scored'] == 300 and weighted == results
+
+class TestBatchSearch:
+    """
+    **Feature: hyderabad-culture-navigator, Property 29: Batch slang search**
+    **Validates: Requirements 1.1, 1.2**
+    """
+    
+    @pytest.fixture(scope='class')
+    def client(self):
+        import app
+        app.data_store.load()
+        return app.app.test_client()
+    
+    @given(queries=st.lists(st.sampled_from(['bindaas', 'nakko', 'chai', 'Kaiku?', 'xyzzy', 'biryani', 'ek']),
+                            max_size=12),
+           limit=st.integers(min_value=1, max_value=5))
+    @settings(max_examples=20, deadline=None)
+    def test_batch_matches_single_searches(self, client, queries, limit):
+        """
+        Property: A batch should answer every query in input order exactly as
+        the single-query endpoint would, searching duplicates once
+        """
+        response = client.post('/api/search/slang/batch', json={'queries': queries, 'limit': limit})
+        body = response.get_json()
+        assert response.status_code == 200 and body['success']
+        assert [result['query'] for result in body['results']] == queries
+        assert body['unique'] == len(set(queries)) and body['timed_out'] == 0
+        
+        for query, result in zip(queries, body['results']):
+            single = client.get('/api/search/slang', query_string={'q': query, 'limit': limit}).get_json()
+            assert result['results'] == single['results']
+            assert result['suggestions'] == single['suggestions']
+            assert result['elapsed_ms'] >= 0
+    
+    def test_per_query_overrides_and_deadline(self, client):
+        """
+        Property: Per-query limits should override the batch default, and
+        queries not finished by the deadline should be reported as timed out
+        """
+        body = client.post('/api/search/slang/batch', json={
+            'queries': ['chai', {'q': 'chai', 'limit': 1}], 'limit': 3, 'threshold': 50
+        }).get_json()
+        assert [result['total'] for result in body['results']] == [3, 1]
+        assert body['unique'] == 2
+        
+        # Fast queries may still beat a zero deadline, so only the accounting is checked
+        body = client.post('/api/search/slang/batch', json={'queries': ['chai', 'nakko'], 'deadline_ms': 0}).get_json()
+        assert body['timed_out'] == sum(result['timed_out'] for result in body['results'])
+        assert all(result['success'] != result['timed_out'] for result in body['results'])
+        
+        assert client.post('/api/search/slang/batch', json={'queries': 'chai'}).status_code == 400
+    
+    def test_invalid_items_rejected(self, client):
+        """
+        Property: A non-integer threshold or limit, for the batch or any one
+        query, should reject the batch with a 400 naming the bad query
+        """
+        response = client.post('/api/search/slang/batch', json={'queries': ['bindaas', {'q': 'chai', 'threshold': 'abc'}]})
+        assert response.status_code == 400 and 'query 1' in response.get_json()['error']
+        assert client.post('/api/search/slang/batch', json={'queries': [{'q': 'chai', 'limit': None}]}).status_code == 400
+        assert client.post('/api/search/slang/batch', json={'queries': ['chai'], 'limit': 'ten'}).status_code == 400
+        assert client.post('/api/search/slang/batch', json={'queries': ['chai'], 'deadline_ms': 'soon'}).status_code == 400
+    
+    def test_pool_starts_lazily_and_replacement_keeps_queued_searches(self):
+        """
+        Property: The pool should only start with the first batch, a newer
+        version should replace it through the publish hook, and searches queued
+        in the old pool should still complete rather than be cancelled
+        """
+        from batch import SearchPool
+        from dataset import DataStore
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, 'product.md')
+            with open('product.md', encoding='utf-8') as src, open(file_path, 'w', encoding='utf-8') as dst:
+                dst.write(src.read())
+            store = DataStore(file_path)
+            pool = SearchPool(workers=1)
+            store.add_publish_hook(pool.replace)
+            try:
+                first = store.load()
+                assert pool._executor is None
+                
+                deadline = time.time() + 60
+                futures = [pool.submit(first, query, 60, 5, 'fuzzy', None, deadline)
+                           for query in ('chai', 'nakko', 'bindaas', 'biryani')]
+                old = pool._executor
+                
+                with open(file_path, 'a', encoding='utf-8') as f:
+                    f.write('\n')
+                os.utime(file_path, ns=(time.time_ns() + 10**9,) * 2)
+                assert store.reload_if_changed()
+                assert pool._executor is not old and pool._version == store.current.version
+                
+                corpus = first.index('slang_corpus')
+                for query, future in zip(('chai', 'nakko', 'bindaas', 'biryani'), futures):
+                    results, _, _, _ = future.result()
+                    assert results == corpus.search(query, threshold=60, limit=5)
+                assert pool.submit(store.current, 'chai', 60, 5, 'fuzzy', None, deadline).result() is not None
+            finally:
+                pool.close()
+
+class TestReverseIndex:
+    """
+    **Feature: hyderabad-culture-navigator, Property 30: English-to-slang lookup**
+    **Validates: Requirements 1.2**
+    """
+    
+    @pytest.fixture(scope='class')
+    def slang_data(self):
+        return parse_product_data('product.md')['slang_data']
+    
+    @given(words=st.lists(st.sampled_from(['cool', 'friends', 'the', 'worried', 'slowly', 'tea', 'dude',
+                                           'stupid', 'eating', 'xyzzy', 'it']), max_size=4),
+           limit=st.integers(min_value=0, max_value=10))
+    @settings(max_examples=50, deadline=None)
+    def test_postings_match_linear_scan(self, slang_data, words, limit):
+        """
+        Property: Ranking the postings of the query tokens should give the same
+        entries and scores as computing TF-IDF against every translation
+        """
+        import math
+        from reverse import ReverseIndex, tokenize
+        index = ReverseIndex(slang_data)
+        query = ' '.join(words)
+        
+        documents = [tokenize(entry['translation']) for entry in slang_data]
+        expected = []
+        for position, tokens in enumerate(documents):
+            score = 0.0
+            for token in dict.fromkeys(tokenize(query)):
+                if token in tokens:
+                    df = sum(token in document for document in documents)
+                    idf = math.log((1 + len(documents)) / (1 + df)) + 1
+                    score += tokens.count(token) / len(tokens) * idf
+            if score:
+                expected.append((-round(score, 4), position))
+        expected.sort()
+        
+        results = index.search(query, limit=limit)
+        assert [(-r['score'], slang_data.index(r['entry'])) for r in results] == expected[:limit]
+    
+    def test_inflections_and_separators(self, slang_data):
+        """
+        Property: Inflected English words should find translations split on
+        '/' and punctuation, and stop words alone should find nothing
+        """
+        from reverse import ReverseIndex
+        index = ReverseIndex(slang_data)
+        
+        assert {r['entry']['term'] for r in index.search('friends')} == {'Ustaad', 'Miyaan', 'Chicha'}
+        assert index.search('worrying')[0]['entry']['term'] == 'Pareshaan'
+        assert {r['entry']['term'] for r in index.search('COOL')} == {'Bindaas', 'Kirrak'}
+        assert index.search('the it to') == []
+
+class TestVectorSearch:
+    """
+    **Feature: hyderabad-culture-navigator, Property 31: N-gram vector search**
+    **Validates: Requirements 1.2**
+    """
+    
+    @pytest.fixture(scope='class')
+    def index(self):
+        from vectors import VectorIndex
+        return VectorIndex(parse_product_data('product.md')['slang_data'])
+    
+    @given(query=st.text(alphabet='abdeghiklmnorstuy ', min_size=1, max_size=40))
+    @settings(max_examples=50, deadline=None)
+    def test_similarities_are_cosines(self, index, query):
+        """
+        Property: Scoring all rows at once should give the cosine similarity of
+        the query vector with each entry's vector
+        """
+        import math
+        from search import fold
+        from vectors import char_ngrams, entry_ngrams, tfidf_vector
+        
+        vector = dict(tfidf_vector(char_ngrams(fold(query)), index.vocabulary, index.idf))
+        similarities = index.similarities(query)
+        rows = [tfidf_vector(entry_ngrams(entry), index.vocabulary, index.idf) for entry in index.entries]
+        for row, similarity in zip(rows, similarities):
+            expected = sum(weight * vector.get(column, 0.0) for column, weight in row)
+            assert math.isclose(similarity, expected, abs_tol=1e-9)
+            assert -1e-9 <= similarity <= 1 + 1e-9
+        
+        results = index.search(query, threshold=0, limit=5)
+        ranked = sorted((-s, position) for position, s in enumerate(similarities) if s > 0)[:5]
+        assert [index.entries.index(r['entry']) for r in results] == [position for _, position in ranked]
+    
+    def test_sentence_queries_rank_usage(self, index):
+        """
+        Property: A sentence quoting an entry's usage should rank that entry
+        first, and the index should survive pickling
+        """
+        import pickle
+        assert index.search('yeh sab baigan hai', limit=1)[0]['entry']['term'] == 'Baigan'
+        assert index.search('bindaas raho yaar', limit=1)[0]['entry']['term'] == 'Bindaas'
+        assert index.search('', limit=5) == []
+        
+        copy = pickle.loads(pickle.dumps(index))
+        assert copy == index
+        assert copy.similarities('apni basti') == index.similarities('apni basti')
+    
+    def test_numpy_matches_postings(self, index, monkeypatch):
+        """
+        Property: The NumPy matrix-vector product should score like the pure
+        Python postings walk, each index keeping only the form it scores with,
+        and postings pickled without NumPy should load as arrays with it
+        """
+        import math
+        import pickle
+        import vectors
+        pytest.importorskip('numpy')
+        from vectors import VectorIndex
+        
+        queries = ('yeh sab baigan hai', 'chai', 'xyz')
+        with monkeypatch.context() as patch:
+            patch.setattr(vectors, 'numpy', None)
+            slow = VectorIndex(index.entries)
+            expected = {query: slow.similarities(query) for query in queries}
+            pickled = pickle.dumps(slow)
+        assert slow.cells is None and slow.postings
+        
+        fast = VectorIndex(index.entries)
+        loaded = pickle.loads(pickled)
+        assert fast.postings is None and loaded.postings is None and loaded.cells is not None
+        for query in queries:
+            assert all(math.isclose(a, b, abs_tol=1e-9) for a, b in zip(fast.similarities(query), expected[query]))
+            assert all(math.isclose(a, b, abs_tol=1e-9) for a, b in zip(loaded.similarities(query), expected[query]))
+
+class TestResultCache:
+    """
+    **Feature: hyderabad-culture-navigator, Property 32: Versioned result cache**
+    **Validates: Requirements 1.2, 5.2**
+    """
+    
+    @given(operations=st.lists(st.tuples(st.integers(min_value=0, max_value=9),
+                                         st.integers(min_value=0, max_value=200)), max_size=60),
+           budget=st.integers(min_value=200, max_value=3000))
+    @settings(max_examples=50, deadline=None)
+    def test_memory_bounded_lru(self, operations, budget):
+        """
+        Property: The cache should hold exactly what a byte-bounded LRU would,
+        never more estimated bytes than its budget, and hits should return
+        the value last stored under that key
+        """
+        from collections import OrderedDict
+        from cache import ResultCache, estimate_size
+        cache = ResultCache(max_bytes=budget, ttl=0)
+        model = OrderedDict()
+        
+        for key, length in operations:
+            value = 'x' * length
+            size = estimate_size(key) + estimate_size(value)
+            if size <= budget:
+                model.pop(key, None)
+                while model and sum(model.values()) + size > budget:
+                    model.popitem(last=False)
+                model[key] = size
+            cache.put(1, key, value)
+            
+            assert list(cache._items) == list(model)
+            assert cache.stats()['bytes'] == sum(model.values()) <= budget
+        
+        for key in model:
+            assert cache.get(1, key) == cache._items[key][0]
+    
+    def test_version_switch_and_ttl(self, monkeypatch):
+        """
+        Property: A newer data version should clear the cache, results for an
+        older version should be ignored, and expired results should miss
+        """
+        import cache as cache_module
+        from cache import ResultCache
+        now = [1000.0]
+        monkeypatch.setattr(cache_module.time, 'monotonic', lambda: now[0])
+        
+        cache = ResultCache(max_bytes=10000, ttl=60)
+        cache.put(1, 'chai', ['Irani chai'])
+        assert cache.get(1, 'chai') == ['Irani chai']
+        
+        assert cache.get(2, 'chai') is None
+        cache.put(1, 'chai', ['stale'])
+        assert cache.get(2, 'chai') is None and cache.stats()['entries'] == 0
+        
+        cache.put(2, 'chai', ['fresh'])
+        now[0] += 61
+        assert cache.get(2, 'chai') is None
+        stats = cache.stats()
+        assert stats['expirations'] == 1 and stats['entries'] == 0 and stats['bytes'] == 0
+        assert stats['hits'] == 1 and stats['misses'] == 3
+    
+    def test_endpoint_serves_cached_results(self):
+        """
+        Property: Repeating a search, even spelt differently, should be served
+        from the cache with the same response, and be reported in cache stats
+        """
+        import app
+        app.data_store.load()
+        client = app.app.test_client()
+        
+        first = client.get('/api/search/slang', query_string={'q': 'zabardast', 'limit': 3}).get_json()
+        second = client.get('/api/search/slang', query_string={'q': 'Jabardast', 'limit': 3}).get_json()
+        assert second['cached'] and second['results'] == first['results']
+        
+        stats = client.get('/api/cache/stats').get_json()
+        assert stats['success'] and stats['hits'] >= 1 and 0 < stats['bytes'] <= stats['max_bytes']
+
+class TestSingleFlight:
+    """
+    **Feature: hyderabad-culture-navigator, Property 33: Request coalescing**
+    **Validates: Requirements 1.2**
+    """
+    
+    def run_concurrently(self, flights, key, compute, callers):
+        import threading
+        outcomes = [None] * callers
+        
+        def call(index):
+            try:
+                outcomes[index] = flights.do(key, compute)
+            except Exception as e:
+                outcomes[index] = e
+        
+        threads = [threading.Thread(target=call, args=(index,)) for index in range(callers)]
+        for thread in threads:
+            thread.start()
+        return threads, outcomes
+    
+    @given(callers=st.integers(min_value=1, max_value=12))
+    @settings(max_examples=10, deadline=None)
+    def test_concurrent_duplicates_share_one_computation(self, callers):
+        """
+        Property: Identical calls arriving while the first is running should
+        wait for it and share its result, each counted as coalesced
+        """
+        import threading
+        from cache import SingleFlight
+        flights = SingleFlight()
+        release, runs = threading.Event(), []
+        
+        def compute():
+            runs.append(1)
+            release.wait(5)
+            return ['Zabardast']
+        
+        threads, outcomes = self.run_concurrently(flights, ('search', 'zabardast'), compute, callers)
+        deadline = time.time() + 5
+        while flights.stats()['coalesced'] < callers - 1 and time.time() < deadline:
+            time.sleep(0.001)
+        release.set()
+        for thread in threads:
+            thread.join()
+        
+        assert len(runs) == 1
+        assert all(value == ['Zabardast'] for value, _ in outcomes)
+        assert sorted(shared for _, shared in outcomes) == [False] + [True] * (callers - 1)
+        assert flights.stats() == {'calls': 1, 'coalesced': callers - 1, 'in_flight': 0}
+        
+        # Once finished, the same key is computed again
+        assert flights.do(('search', 'zabardast'), lambda: ['again']) == (['again'], False)
+    
+    def test_errors_are_shared(self):
+        """
+        Property: A failing computation should raise in every waiting caller and
+        leave nothing in flight
+        """
+        import threading
+        from cache import SingleFlight
+        flights = SingleFlight()
+        release = threading.Event()
+        
+        def compute():
+            release.wait(5)
+            raise ValueError('boom')
+        
+        threads, outcomes = self.run_concurrently(flights, 'key', compute, 3)
+        deadline = time.time() + 5
+        while flights.stats()['coalesced'] < 2 and time.time() < deadline:
+            time.sleep(0.001)
+        release.set()
+        for thread in threads:
+            thread.join()
+        
+        assert all(isinstance(outcome, ValueError) for outcome in outcomes)
+        assert flights.stats()['in_flight'] == 0
+
+class TestQueryLogWarmUp:
+    """
+    **Feature: hyderabad-culture-navigator, Property 34: Query log and cache warm-up**
+    **Validates: Requirements 1.2, 5.2**
+    """
+    
+    @given(queries=st.lists(st.sampled_from(['chai', 'nakko', 'biryani', 'kaiku']), max_size=30))
+    @settings(max_examples=20, deadline=None)
+    def test_log_round_trip_ranks_by_frequency(self, queries):
+        """
+        Property: Every recorded query should reach the log file once the log
+        is closed, and the top queries should come back most frequent first
+        """
+        from collections import Counter
+        from querylog import QueryLog, top_queries
+        
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'queries.log')
+            log = QueryLog(path, flush_interval=60)
+            for query in queries:
+                log.record('slang', {'q': query, 'limit': 10})
+            log.close()
+            
+            top = top_queries(path, limit=10)
+            counts = Counter(queries)
+            assert sorted(params['q'] for _, params in top) == sorted(counts)
+            frequencies = [counts[params['q']] for _, params in top]
+            assert frequencies == sorted(frequencies, reverse=True)
+            assert all(endpoint == 'slang' and params['limit'] == 10 for endpoint, params in top)
+    
+    def test_sampling_and_bad_lines(self):
+        """
+        Property: A zero sample rate should log nothing, and unreadable log
+        lines or a missing log should not break reading top queries
+        """
+        from querylog import QueryLog, top_queries
+        
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'queries.log')
+            log = QueryLog(path, sample_rate=0)
+            log.record('slang', {'q': 'chai'})
+            log.close()
+            assert log.recorded == 0 and not os.path.exists(path)
+            assert top_queries(path) == []
+            
+            with open(path, 'w', encoding='utf-8') as file:
+                file.write('not json\n{"endpoint": "biryani", "params": {"area": "Old City"}}\n{}\n')
+            assert top_queries(path) == [('biryani', {'area': 'Old City'})]
+    
+    def test_rotation_bounds_log_size(self):
+        """
+        Property: The log should be rotated once it reaches its size cap, and
+        top queries should count only the tails of the log and its predecessor
+        """
+        from querylog import QueryLog, top_queries
+        
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'queries.log')
+            log = QueryLog(path, flush_interval=60, max_bytes=2000)
+            for batch in range(10):
+                for _ in range(10):
+                    log.record('slang', {'q': f'query {batch}'})
+                log.flush()
+            log.close()
+            
+            assert os.path.getsize(path) < 2000 and os.path.getsize(path + '.1') < 4000
+            top = top_queries(path, limit=20, max_bytes=2000)
+            assert ('slang', {'q': 'query 9'}) in top
+            assert ('slang', {'q': 'query 0'}) not in top
+            
+            # A tail that starts mid-line skips the cut line
+            os.remove(path + '.1')
+            top = top_queries(path, limit=20, max_bytes=100)
+            assert top and all(endpoint == 'slang' for endpoint, _ in top)
+    
+    def test_warm_up_fills_cache_before_ready(self, monkeypatch):
+        """
+        Property: Startup warm-up should replay logged queries into the result
+        cache for the served data version and only then report ready
+        """
+        import app
+        from querylog import QueryLog
+        
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'queries.log')
+            log = QueryLog(path)
+            log.record('slang', {'q': 'zabardast', 'threshold': 60, 'limit': 3, 'exact': False,
+                                 'max_distance': 3, 'mode': 'fuzzy'})
+            log.record('biryani', {'area': 'Old City', 'vibe': ''})
+            log.close()
+            
+            monkeypatch.setattr(app, 'QUERY_LOG_FILE', path)
+            data = app.data_store.load()
+            app.result_cache.clear()
+            app.start_warm_up(data)
+            assert app.ready.wait(10)
+            
+            client = app.app.test_client()
+            assert client.get('/api/ready').status_code == 200
+            assert client.get('/api/search/slang', query_string={'q': 'zabardast', 'limit': 3}).get_json()['cached']
+            assert app.result_cache.get(data.version, ('biryani',) + SpotQuery('Old City').key()) is not None
+
+class TestFacetIndex:
+    """
+    **Feature: hyderabad-culture-navigator, Property 35: Facet bitmap filtering**
+    **Validates: Requirements 2.3, 2.4, 2.5**
+    """
+    
+    spot = st.fixed_dictionaries({
+        'name': st.text(max_size=5),
+        'area': st.sampled_from(['Charminar', 'Abids', 'Banjara Hills', 'abids']),
+        'vibe': st.sampled_from(['Iconic', 'Traditional', 'Family']),
+        'rating': st.one_of(st.none(), st.sampled_from([3.5, 4.0, 4.5]))
+    })
+    
+    @given(st.lists(spot, max_size=30),
+           st.sampled_from([None, '', 'abids', ' CHARMINAR ', 'Banjara Hills', 'Old City']),
+           st.sampled_from([None, 'iconic', 'Family ', 'Trendy']))
+    def test_index_matches_scan(self, spots, area_filter, vibe_filter):
+        """
+        Property: Intersecting facet bitmaps returns the same spots, in the same
+        rating order, as scanning and sorting the list
+        """
+        index = FacetIndex(spots)
+        expected = filter_biryani_spots(spots, area_filter, vibe_filter)
+        assert index.filter(SpotQuery(area_filter, vibe_filter)) == expected
+        assert filter_biryani_spots(spots, area_filter, vibe_filter, index=index) == expected
+    
+    def test_bitmaps_follow_rating_order(self):
+        """Bit i of every bitmap stands for the i-th best rated spot"""
+        index = FacetIndex([
+            {'name': 'a', 'area': 'Abids', 'vibe': 'Family', 'rating': 3.5},
+            {'name': 'b', 'area': 'ABIDS', 'vibe': 'Iconic', 'rating': 4.5},
+            {'name': 'c', 'area': 'Charminar', 'vibe': 'Family', 'rating': None}
+        ])
+        assert [spot['name'] for spot in index.spots] == ['b', 'a', 'c']
+        assert index.bitmap('area', 'abids') == 0b011
+        assert index.bitmap('vibe', 'family') == 0b110
+        assert index.bitmap('area', 'old city') == 0
+        assert [spot['name'] for spot in index.filter(SpotQuery('Abids', 'family'))] == ['a']
+
+class TestSpotQueryPlanner:
+    """
+    **Feature: hyderabad-culture-navigator, Property 36: Compound biryani filters**
+    **Validates: Requirements 2.3, 2.4, 2.5**
+    """
+    
+    spot = st.fixed_dictionaries({
+        'name': st.text(max_size=5),
+        'area': st.sampled_from(['Charminar', 'Abids', 'Banjara Hills', 'abids']),
+        'vibe': st.sampled_from(['Iconic', 'Traditional', 'Family']),
+        'rating': st.one_of(st.none(), st.sampled_from([0, 3.5, 4.0, 4.5])),
+        'description': st.sampled_from(['Spicy dum biryani', 'Crispy kebabs, SPICY!', 'Café culture', ''])
+    })
+    areas = st.lists(st.sampled_from(['abids', ' CHARMINAR ', 'Banjara Hills', 'Old City']), max_size=3)
+    vibes = st.lists(st.sampled_from(['iconic', 'Family ', 'Trendy']), max_size=2)
+    bound = st.one_of(st.none(), st.sampled_from([0, 3.5, 3.9, 4.0, 5]))
+    text = st.one_of(st.none(), st.sampled_from(['spicy', 'Spicy DUM', 'cafe', 'kebabs biryani', '  ']))
+    
+    @pytest.fixture(scope='class')
+    def client(self):
+        import app
+        app.data_store.load()
+        return app.app.test_client()
+    
+    @given(st.lists(spot, max_size=30), areas, vibes, areas, vibes, bound, bound, text)
+    def test_planned_filter_matches_scan(self, spots, areas, vibes, exclude_areas, exclude_vibes,
+                                         min_rating, max_rating, text):
+        """
+        Property: Evaluating the planned predicates over the facet index returns
+        the spots a linear scan keeps, in the same rating order
+        """
+        query = SpotQuery(areas, vibes, exclude_areas, exclude_vibes, min_rating, max_rating, text)
+        index = FacetIndex(spots)
+        stats = {}
+        results = index.filter(query, stats=stats)
+        
+        expected = rating_order(spot for spot in spots if query.matches(spot))
+        assert results == expected
+        assert filter_biryani_spots(spots, query=query) == expected
+        
+        estimates = [estimate for estimate, _, _ in index.plan(query)]
+        assert estimates == sorted(estimates)
+        assert stats['evaluated'] <= len(stats['plan'])
+    
+    def test_most_selective_predicate_first(self):
+        """The rarest value is intersected first and evaluation stops once nothing is left"""
+        spots = [{'name': str(i), 'area': 'Abids' if i else 'Charminar', 'vibe': 'Family', 'rating': 4.0}
+                 for i in range(10)]
+        index = FacetIndex(spots)
+        
+        stats = {}
+        assert [spot['name'] for spot in index.filter(SpotQuery('charminar', 'family', min_rating=3.5),
+                                                      stats=stats)] == ['0']
+        assert stats['plan'] == ['area', 'vibe', 'rating']
+        
+        stats = {}
+        assert index.filter(SpotQuery('Old City', 'family', exclude_areas='abids'), stats=stats) == []
+        assert stats['plan'][0] == 'area' and stats['evaluated'] == 1
+    
+    def test_multi_value_and_range_parameters(self, client):
+        """Repeated parameters select several values; ranges and exclusions narrow them"""
+        body = client.get('/api/biryani/filter?area=Charminar&area=abids&exclude_vibe=heritage'
+                          '&min_rating=4.2').get_json()
+        assert body['success'] and body['total'] > 0
+        assert body['filters']['area'] == ['Charminar', 'abids']
+        assert body['filters']['min_rating'] == 4.2
+        for spot in body['results']:
+            assert spot['area'] in ('Charminar', 'Abids')
+            assert spot['vibe'] != 'Heritage' and spot['rating'] >= 4.2
+        ratings = [spot['rating'] for spot in body['results']]
+        assert ratings == sorted(ratings, reverse=True)
+        
+        single = client.get('/api/biryani/filter?area=Abids').get_json()
+        assert single['filters']['area'] == 'Abids'
+        assert client.get('/api/biryani/filter?max_rating=high').status_code == 400
+        
+        described = client.get('/api/biryani/filter?q=Biryani').get_json()
+        assert described['filters']['q'] == 'Biryani' and described['total'] > 0
+        assert all('biryani' in spot['description'].lower() for spot in described['results'])
+
 if __name__ == "__main__":
     # Run the tests
     pytest.main([__file__, "-v"])
\ No newline at end of file
@@ -8,7 +8,7 @@ def convert_time_format(time_data, mode='standard'):
     Convert time data between standard and Hyderabadi formats.
     
     Args:
-        time_data (list): List of time mapping dictionaries
+        time_data (list): Time mappings (dictionaries or compact records)
         mode (str): 'standard' or 'hyderabadi'
     
     Returns:
@@ -118,7 +118,7 @@ def get_current_time_context(time_data):
     Get the current time context based on the current hour.
     
     Args:
-        time_data (list): List of time mapping dictionaries
+        time_data (list): Time mappings (dictionaries or compact records)
     
     Returns:
         dict: Current time context or None if not found
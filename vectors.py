@@ -0,0 +1,166 @@
+import math
+import heapq
+import logging
+from collections import Counter, defaultdict
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from search import INDEXED_FIELDS, fold
+
+logger = logging.getLogger(__name__)
+
+# Character n-grams are taken inside words padded with one space on each side
+NGRAM_SIZE = 3
+
+def char_ngrams(text):
+    """
+    Count the character n-grams of the words of a folded text.
+    
+    Args:
+        text (str): Folded text
+    
+    Returns:
+        Counter: n-gram -> number of occurrences
+    """
+    grams = Counter()
+    for word in text.split():
+        padded = f" {word} "
+        grams.update(padded[i:i + NGRAM_SIZE] for i in range(max(1, len(padded) - NGRAM_SIZE + 1)))
+    return grams
+
+def tfidf_vector(grams, vocabulary, idf):
+    """
+    Weigh n-gram counts by TF-IDF and scale them to unit length.
+    
+    N-grams missing from the vocabulary are dropped.
+    
+    Args:
+        grams (Counter): n-gram -> count
+        vocabulary (dict): n-gram -> column
+        idf (tuple): Inverse document frequency per column
+    
+    Returns:
+        list: (column, weight) pairs sorted by column
+    """
+    weights = []
+    for gram, count in grams.items():
+        column = vocabulary.get(gram)
+        if column is not None:
+            weights.append((column, (1 + math.log(count)) * idf[column]))
+    norm = math.sqrt(sum(weight * weight for _, weight in weights))
+    return sorted((column, weight / norm) for column, weight in weights) if norm else []
+
+def entry_ngrams(entry):
+    """Count the character n-grams of an entry's folded term, translation, category and usage."""
+    return char_ngrams(fold(' '.join(entry.get(field, '') for field in INDEXED_FIELDS)))
+
+class VectorIndex:
+    """
+    Character n-gram TF-IDF vectors of the slang entries, one row per entry.
+    
+    Built once per data version from the folded term, translation, category
+    and usage of every entry. A query is turned into a vector the same way
+    and scored against all rows at once: with NumPy installed as a single
+    sparse matrix-vector product over the row, column and value arrays of
+    the matrix, otherwise by walking the postings of the query's n-grams.
+    Only the form the scorer uses is built and kept. Rows are unit length,
+    so the products are cosine similarities.
+    """
+    
+    __slots__ = ('entries', 'vocabulary', 'idf', 'cells', 'postings')
+    
+    def __init__(self, slang_data):
+        self.entries = tuple(slang_data)
+        documents = [entry_ngrams(entry) for entry in self.entries]
+        
+        frequencies = Counter(gram for grams in documents for gram in grams)
+        self.vocabulary = {gram: column for column, gram in enumerate(sorted(frequencies))}
+        total = len(documents)
+        self.idf = tuple(math.log((1 + total) / (1 + frequencies[gram])) + 1 for gram in sorted(frequencies))
+        
+        postings = defaultdict(list)
+        for row, grams in enumerate(documents):
+            for column, weight in tfidf_vector(grams, self.vocabulary, self.idf):
+                postings[column].append((row, weight))
+        self._set_matrix(postings)
+    
+    def _set_matrix(self, postings):
+        """Keep column -> [(row, weight)] postings in the form the scorer multiplies"""
+        if numpy is not None:
+            cells = [(row, column, weight) for column, pairs in postings.items() for row, weight in pairs]
+            rows, columns, values = zip(*cells) if cells else ((), (), ())
+            self.cells = (numpy.array(rows, dtype=numpy.intp), numpy.array(columns, dtype=numpy.intp),
+                          numpy.array(values, dtype=float))
+            self.postings = None
+        else:
+            self.cells = None
+            self.postings = {column: tuple(pairs) for column, pairs in postings.items()}
+    
+    def __eq__(self, other):
+        return isinstance(other, VectorIndex) and \
+               (self.entries, self.vocabulary, self.idf) == (other.entries, other.vocabulary, other.idf)
+    
+    def __len__(self):
+        return len(self.entries)
+    
+    def __getstate__(self):
+        return self.entries, self.vocabulary, self.idf, self.cells, self.postings
+    
+    def __setstate__(self, state):
+        self.entries, self.vocabulary, self.idf, self.cells, self.postings = state
+        # A snapshot written without NumPy holds postings; convert them once at load
+        if numpy is not None and self.cells is None:
+            self._set_matrix(self.postings)
+    
+    def similarities(self, query):
+        """
+        Cosine similarity of a query with every entry.
+        
+        Args:
+            query (str): Search query
+        
+        Returns:
+            list: Similarity (0-1) per entry, in entry order
+        """
+        vector = tfidf_vector(char_ngrams(fold(query or '')), self.vocabulary, self.idf)
+        if self.cells is not None:
+            rows, columns, values = self.cells
+            dense = numpy.zeros(len(self.idf))
+            for column, weight in vector:
+                dense[column] = weight
+            return numpy.bincount(rows, weights=values * dense[columns], minlength=len(self.entries)).tolist()
+        
+        scores = [0.0] * len(self.entries)
+        for column, weight in vector:
+            for row, value in self.postings.get(column, ()):
+                scores[row] += value * weight
+        return scores
+    
+    def search(self, query, threshold=0, limit=10):
+        """
+        Search the corpus by n-gram vector similarity.
+        
+        Args:
+            query (str): Search query, typically a phrase or sentence
+            threshold (int): Minimum similarity (0-100)
+            limit (int): Maximum number of results to return
+        
+        Returns:
+            list: Matching entries with their similarity as 0-100 'score', best first
+        """
+        if not fold(query or ''):
+            return []
+        
+        similarities = self.similarities(query)
+        positions = (position for position, similarity in enumerate(similarities)
+                     if similarity > 0 and similarity * 100 >= threshold)
+        best = heapq.nsmallest(max(limit, 0), positions, key=lambda position: (-similarities[position], position))
+        logger.info(f"Vector search for '{query}' returned {len(best)} results")
+        return [{
+            'entry': self.entries[position],
+            'score': round(similarities[position] * 100),
+            'similarity': round(similarities[position], 4)
+        } for position in best]